@@ -0,0 +1,47 @@
+import argparse
+import sys
+import time
+
+from benchmarks.core import compare, load, load_suites, run, save
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Seeded benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="run benchmarks and write a JSON results file")
+    p_run.add_argument("groups", nargs="*", help="groups to run (default: all), e.g. selection interpreter.subleq")
+    p_run.add_argument("--quick", action="store_true", help="smaller workloads and fewer repeats")
+    p_run.add_argument("--out", default="outputs/benchmarks/" + time.strftime("%Y%m%d_%H%M%S") + ".json")
+
+    p_cmp = sub.add_parser("compare", help="flag regressions of a results file against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    p_cmp.add_argument("--metric", default="median_s", choices=["median_s", "min_s", "mean_s"])
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        known = load_suites()
+        unknown = set(args.groups) - set(known)
+        if unknown:
+            print(f"Unknown groups: {', '.join(sorted(unknown))} (known: {', '.join(known)})")
+            return 2
+        doc = run(args.groups or None, quick=args.quick)
+        save(doc, args.out)
+        print(f"Results written to {args.out}")
+        return 0
+
+    rows = compare(load(args.baseline), load(args.current), args.tolerance, args.metric)
+    for row in rows:
+        if "ratio" in row:
+            print(f"{row['status']:<12} {row['case']:<60} {row['baseline'] * 1e3:10.3f} -> {row['current'] * 1e3:10.3f} ms  x{row['ratio']:.2f}")
+        else:
+            print(f"{row['status']:<12} {row['case']}")
+    n_regressions = sum(row["status"] == "regression" for row in rows)
+    print(f"{n_regressions} regression(s) over {len(rows)} cases (tolerance {args.tolerance:.0%})")
+    return 1 if n_regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
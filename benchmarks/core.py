@@ -0,0 +1,160 @@
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# A benchmark yields cases: (case name, params, thunk). Setup happens in the
+# generator before each yield, so only the thunk is timed. params may hold
+# "items" (work units per call) to report a throughput.
+Case = Tuple[str, Dict[str, Any], Callable[[], Any]]
+
+BENCHMARKS: Dict[str, Callable[[bool], Iterator[Case]]] = {}
+
+SEED = 0
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose backend is not available here (e.g. an unbuilt extension)."""
+
+
+def benchmark(group: str):
+    """Register fn(quick) -> iterator of cases under group."""
+    def register(fn):
+        BENCHMARKS[group] = fn
+        return fn
+    return register
+
+
+def seed_everything(seed: int = SEED) -> np.random.Generator:
+    """Seed `random` and numpy's global RNG; return a fresh Generator on the same seed."""
+    random.seed(seed)
+    np.random.seed(seed)
+    return np.random.default_rng(seed)
+
+
+def measure(thunk: Callable[[], Any], repeat: int = 5, min_time: float = 0.2, max_runs: int = 1_000) -> Dict[str, float]:
+    """
+    Time thunk after one warm-up call: at least `repeat` runs and at least
+    min_time seconds in total (capped at max_runs).
+    """
+    thunk()
+    times: List[float] = []
+    total = 0.0
+    while (len(times) < repeat or total < min_time) and len(times) < max_runs:
+        t0 = time.perf_counter()
+        thunk()
+        dt = time.perf_counter() - t0
+        times.append(dt)
+        total += dt
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "mean_s": statistics.fmean(times),
+        "n_runs": len(times),
+    }
+
+
+def load_suites() -> Dict[str, Callable[[bool], Iterator[Case]]]:
+    """Import every suite module (which registers its benchmarks); returns BENCHMARKS."""
+    from benchmarks import interpreters, payoff, rewards, selection, sides  # noqa: F401
+    return BENCHMARKS
+
+
+def run(groups: Optional[List[str]] = None, quick: bool = False, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """Run the registered benchmarks (all groups by default); returns the results document."""
+    load_suites()
+    results: Dict[str, Any] = {}
+    skipped: Dict[str, str] = {}
+    repeat, min_time = (3, 0.05) if quick else (5, 0.2)
+    for group, fn in BENCHMARKS.items():
+        if groups and group not in groups:
+            continue
+        cases = fn(quick)
+        while True:
+            try:
+                name, params, thunk = next(cases)
+            except StopIteration:
+                break
+            except Skip as e:
+                skipped[group] = str(e)
+                log(f"{group}: skipped ({e})")
+                break
+            key = f"{group}/{name}"
+            stats = measure(thunk, repeat=repeat, min_time=min_time)
+            if "items" in params:
+                stats["items_per_s"] = params["items"] / stats["median_s"]
+            results[key] = {"params": params, **stats}
+            log(f"{key:<60} {stats['median_s'] * 1e3:10.3f} ms")
+    return {"meta": _meta(quick), "results": results, "skipped": skipped}
+
+
+def _meta(quick: bool) -> Dict[str, Any]:
+    try:
+        git_hash = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        git_hash = "unknown"
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_hash": git_hash,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": quick,
+        "seed": SEED,
+    }
+
+
+def save(doc: Dict[str, Any], path) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+
+
+def load(path) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float = 0.2,
+    metric: str = "median_s",
+) -> List[Dict[str, Any]]:
+    """
+    Compare two results documents case by case.
+
+    A case regresses when current / baseline > 1 + tolerance on metric (a
+    time, lower is better) and improves when it is < 1 / (1 + tolerance).
+    Cases missing from either side are reported as "new" / "missing".
+    """
+    base, cur = baseline["results"], current["results"]
+    rows = []
+    for key in sorted(set(base) | set(cur)):
+        if key not in base:
+            rows.append({"case": key, "status": "new", "current": cur[key][metric]})
+            continue
+        if key not in cur:
+            rows.append({"case": key, "status": "missing", "baseline": base[key][metric]})
+            continue
+        ratio = cur[key][metric] / base[key][metric]
+        if ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 / (1 + tolerance):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "case": key, "status": status, "ratio": ratio,
+            "baseline": base[key][metric], "current": cur[key][metric],
+        })
+    return rows
@@ -0,0 +1,80 @@
+from dataclasses import replace
+
+from benchmarks.core import Skip, benchmark, seed_everything
+from config import ExperimentConfig
+
+
+def _interpreter(cfg: ExperimentConfig):
+    try:
+        from interpreters.wrapper import make_interpreter
+        return make_interpreter(cfg)
+    except (ImportError, OSError) as e:
+        raise Skip(f"{cfg.interpreter} interpreter unavailable: {e}")
+
+
+def _programs(cfg: ExperimentConfig, length: int, n: int = 32):
+    """n seeded random programs of the given length (tree size for treemo)."""
+    rng = seed_everything()
+    if cfg.interpreter == "treemo":
+        from creation.treemo import gen_tree
+        return [gen_tree(length) for _ in range(n)]
+    from creation.genetics import random_code_batch
+    code = replace(cfg.code, code_length=length)
+    return random_code_batch(n, replace(cfg, code=code), rng).to_lists()
+
+
+def _run_all(interp, programs):
+    # Each program runs on the next one as input, like a matchup
+    def thunk():
+        for k, code in enumerate(programs):
+            interp.run(code, programs[k - 1])
+    return thunk
+
+
+@benchmark("interpreter.subleq")
+def subleq(quick: bool):
+    lengths = [50, 500] if quick else [50, 200, 500, 2_000]
+    max_iters = [1_000, 20_000] if quick else [1_000, 5_000, 20_000, 100_000]
+    for length in lengths:
+        for max_iter in max_iters:
+            cfg = ExperimentConfig(interpreter="subleq")
+            cfg.subleq.max_iter = max_iter
+            programs = _programs(cfg, length)
+            yield (
+                f"len{length}_iter{max_iter}",
+                {"length": length, "max_iter": max_iter, "items": len(programs)},
+                _run_all(_interpreter(cfg), programs),
+            )
+
+
+@benchmark("interpreter.iconfractran")
+def iconfractran(quick: bool):
+    lengths = [20, 50] if quick else [10, 20, 50, 100]
+    max_steps = [50, 200] if quick else [50, 200, 1_000]
+    for length in lengths:
+        for max_step in max_steps:
+            cfg = ExperimentConfig(interpreter="iconfractran")
+            cfg.iconfractran.max_step = max_step
+            cfg.code = replace(cfg.code, min_val=0, max_val=100)
+            programs = _programs(cfg, length, n=8)
+            yield (
+                f"len{length}_step{max_step}",
+                {"length": length, "max_step": max_step, "items": len(programs)},
+                _run_all(_interpreter(cfg), programs),
+            )
+
+
+@benchmark("interpreter.treemo")
+def treemo(quick: bool):
+    sizes = [20, 100] if quick else [20, 50, 100, 200]
+    max_steps = [10, 50] if quick else [10, 50, 200]
+    for size in sizes:
+        for max_step in max_steps:
+            cfg = ExperimentConfig(interpreter="treemo")
+            cfg.treemo.max_step = max_step
+            programs = _programs(cfg, size)
+            yield (
+                f"size{size}_step{max_step}",
+                {"tree_size": size, "max_step": max_step, "items": len(programs)},
+                _run_all(_interpreter(cfg), programs),
+            )
@@ -0,0 +1,25 @@
+from benchmarks.core import benchmark
+from benchmarks.interpreters import _interpreter, _programs
+from config import ExperimentConfig
+
+
+@benchmark("payoff.matrix")
+def matrix(quick: bool):
+    """compute_payoff_matrix (fresh pool per call) vs PayoffEngine (persistent pool) over n x n_workers."""
+    from rewards.payoff import PayoffEngine, compute_payoff_matrix
+    from rewards.wrapper import make_reward
+
+    sizes = [10, 20] if quick else [10, 20, 40, 80]
+    workers = [1, 2] if quick else [1, 2, 4, 8]
+    for n_workers in workers:
+        cfg = ExperimentConfig()
+        cfg.payoff.n_workers = n_workers
+        _interpreter(cfg)
+        reward_fn = make_reward(cfg)
+        engine = PayoffEngine(cfg, reward_fn)
+        for n in sizes:
+            pop = _programs(cfg, cfg.code.code_length, n=n)
+            params = {"n": n, "n_workers": n_workers, "items": n * n}
+            yield f"fresh_n{n}_w{n_workers}", params, lambda pop=pop, cfg=cfg: compute_payoff_matrix(cfg, pop, pop, reward_fn)
+            yield f"engine_n{n}_w{n_workers}", params, lambda pop=pop: engine.compute(pop, pop)
+        engine.close()
@@ -0,0 +1,36 @@
+from benchmarks.core import Skip, benchmark, seed_everything
+from benchmarks.interpreters import _interpreter, _programs
+from config import ExperimentConfig
+
+
+@benchmark("reward.lcs")
+def lcs(quick: bool):
+    from rewards.quine_pressure_reward import _lcs_length
+
+    rng = seed_everything()
+    for length in ([50, 500] if quick else [50, 200, 500, 2_000]):
+        a, b = rng.integers(0, 16, size=(2, length)).tolist()
+        yield f"len{length}", {"length": length, "items": 1}, lambda a=a, b=b: _lcs_length(a, b)
+
+
+@benchmark("reward.matchup")
+def matchup(quick: bool):
+    """Latency of one reward(interp, a, b) call per interpreter x reward."""
+    for interpreter in ("subleq", "iconfractran", "treemo"):
+        for reward in ("placeholder", "quine_pressure", "blind"):
+            cfg = ExperimentConfig(interpreter=interpreter, reward=reward)
+            try:
+                from rewards.wrapper import make_reward
+                reward_fn = make_reward(cfg)
+                interp = _interpreter(cfg)
+            except (ImportError, Skip):
+                continue
+            length = 20 if interpreter == "iconfractran" else 100
+            programs = _programs(cfg, length, n=16)
+            pairs = list(zip(programs, programs[1:] + programs[:1]))
+
+            def thunk(reward_fn=reward_fn, interp=interp, pairs=pairs):
+                for a, b in pairs:
+                    reward_fn(interp, a, b)
+
+            yield f"{interpreter}_{reward}", {"interpreter": interpreter, "reward": reward, "items": len(pairs)}, thunk
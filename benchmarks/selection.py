@@ -0,0 +1,48 @@
+import numpy as np
+
+from benchmarks.core import benchmark, seed_everything
+
+
+def ternary_game(n: int, rng: np.random.Generator) -> np.ndarray:
+    """Seeded antisymmetric n x n payoff matrix with entries in {-1, 0, 1}."""
+    upper = np.triu(rng.integers(-1, 2, size=(n, n)), k=1)
+    return (upper - upper.T).astype(int)
+
+
+class _Dense:
+    """Dense matrix behind the rows / cols / len interface double_oracle expects."""
+
+    def __init__(self, payoff: np.ndarray):
+        self.payoff = payoff
+
+    def __len__(self) -> int:
+        return len(self.payoff)
+
+    def rows(self, indices):
+        return self.payoff[np.asarray(indices, dtype=int)]
+
+    def cols(self, indices):
+        return self.payoff[:, np.asarray(indices, dtype=int)]
+
+
+@benchmark("selection")
+def selection(quick: bool):
+    from selection.double_oracle import double_oracle
+    from selection.nash_set import compute_nash_approx, nash_subset_and_strategy
+    from selection.skim import (
+        iterated_elimination_strictly_dominated_rows,
+        iterated_elimination_strictly_dominated_rows_fast,
+    )
+
+    rng = seed_everything()
+    sizes = [50, 200] if quick else [50, 200, 800, 2_000]
+    for n in sizes:
+        payoff = ternary_game(n, rng)
+        params = {"n": n}
+        if n <= 200:
+            yield f"skim_slow_n{n}", params, lambda p=payoff: iterated_elimination_strictly_dominated_rows(p)
+        yield f"skim_fast_n{n}", params, lambda p=payoff: iterated_elimination_strictly_dominated_rows_fast(p)
+        if n <= 800:
+            yield f"nash_subset_n{n}", params, lambda p=payoff: nash_subset_and_strategy(p)
+        yield f"nash_approx_n{n}", params, lambda p=payoff: compute_nash_approx(p)
+        yield f"double_oracle_n{n}", params, lambda p=payoff: double_oracle(_Dense(p))
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import replace
+
+from benchmarks.core import SEED, benchmark, seed_everything
+from benchmarks.interpreters import _interpreter, _programs
+from config import (
+    EvolutionConfig,
+    ExperimentConfig,
+    IslandConfig,
+    PayoffConfig,
+    RandomBaselineConfig,
+    RandomSkimmedConfig,
+)
+
+
+def _experiment() -> ExperimentConfig:
+    # Sequential payoffs: measures the loop itself, not pool startup
+    cfg = ExperimentConfig(payoff=PayoffConfig(n_workers=1))
+    _interpreter(cfg)
+    return cfg
+
+
+def _in_tmp(run, make_cfg):
+    """Thunk running run(cfg) in a fresh output directory with stdout silenced."""
+    def thunk():
+        out_dir = tempfile.mkdtemp(prefix="jam_bench_")
+        try:
+            seed_everything()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run(make_cfg(os.path.join(out_dir, "run")))
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    return thunk
+
+
+@benchmark("sides")
+def sides(quick: bool):
+    """A few generations of each side script end to end; items = generations."""
+    from sides import evolution, homoiconic, islands, random_baseline, random_skimmed
+
+    n_iter = 3 if quick else 10
+    exp = _experiment()
+    evo = EvolutionConfig(n_init=20, n_offspring=10, n_iter=n_iter, pop_cap=60, seed=SEED, experiment=exp)
+
+    for name, cfg in [
+        ("evolution_skim_fast", evo),
+        ("evolution_pipelined", replace(evo, pipeline=True)),
+        ("evolution_nash_approx", replace(evo, selection="nash_approx")),
+        ("evolution_sampled", replace(evo, evaluation="sampled", selection="rating", n_opponents=8)),
+    ]:
+        yield name, {"generations": n_iter, "items": n_iter}, _in_tmp(
+            evolution.main, lambda out, cfg=cfg: replace(cfg, out_dir=out),
+        )
+
+    skimmed = RandomSkimmedConfig(n_pop=20, n_iter=n_iter, max_pop=60, experiment=exp)
+    yield "random_skimmed", {"generations": n_iter, "items": n_iter}, _in_tmp(
+        random_skimmed.main, lambda out: replace(skimmed, out_dir=out),
+    )
+
+    baseline = RandomBaselineConfig(n_ref=5, n_tested=n_iter, n_grain=20, seed=SEED, experiment=exp)
+    for mode in ("pool", "stream"):
+        yield f"random_baseline_{mode}", {"iterations": n_iter, "items": n_iter}, _in_tmp(
+            random_baseline.main, lambda out, mode=mode: replace(baseline, mode=mode, out_path=out),
+        )
+
+    island = IslandConfig(n_islands=2, migration_interval=2, seed=SEED, evolution=evo)
+    yield "islands", {"n_islands": 2, "generations": n_iter, "items": 2 * n_iter}, _in_tmp(
+        islands.main, lambda out: replace(island, out_dir=out),
+    )
+
+    # Homoiconic scan of a small seeded population: items = rounds
+    n_pop = 4 if quick else 8
+    pop_dir = tempfile.mkdtemp(prefix="jam_bench_")
+    pop_path = os.path.join(pop_dir, "pop.json")
+    with open(pop_path, "w") as f:
+        json.dump(_programs(exp, exp.code.code_length, n=n_pop), f)
+    yield "homoiconic", {"n_pop": n_pop, "items": n_pop * n_pop}, _in_tmp(
+        lambda out: homoiconic.main(pop_path, out, block_rounds=16), lambda out: out,
+    )
+    shutil.rmtree(pop_dir, ignore_errors=True)
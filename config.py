@@ -1,7 +1,7 @@
 
 import time
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 # --- Code generation config ---
 
@@ -27,6 +27,8 @@ class IconfractranConfig:
 class TreemoConfig:
     max_step: int = 50
     tree_size: int = 100
+    # Entries of the interpreter's memos, keyed by canonical rule set (0 = off)
+    cache_size: int = 100_000
 
 @dataclass
 class SubleqConfig:
@@ -40,6 +42,27 @@ class SubleqConfig:
 class PayoffConfig:
     # 1 = sequential, >1 = use ProcessPoolExecutor
     n_workers: int = 6
+    # If set, the growing payoff matrix of evolution / random_skimmed lives in this file (memmap)
+    memmap_path: Optional[str] = None
+    # Share payoffs between equivalent programs (evolution, dense evaluation):
+    # "none" | "exact" (same probe outputs when the reward only looks at those, else same code)
+    # | "probe" (same outputs on n_probes random inputs; approximate for other rewards)
+    dedup: str = "none"
+    n_probes: int = 4
+    # Per-worker LRU cache of interpreter runs, reused e.g. by homoiconic offspring (0 = off)
+    run_cache_size: int = 10_000
+    # Where payoff tiles run: "local" (process pool) | "tcp" (remote worker daemons pulling
+    # from a coordinator at address; start them with python -m rewards.distributed)
+    # | "shared" (the process's SharedPool or SharedPoolClient, set up by sides/sweep.py).
+    # With "tcp" / "shared", n_workers only sets how finely matrices are tiled.
+    backend: str = "local"
+    address: str = "127.0.0.1:7780"
+    # Shared secret of the coordinator and its workers (--authkey); required with "tcp"
+    authkey: str = ""
+    # A busy worker silent for this long is dropped and its tile reassigned
+    heartbeat_timeout: float = 30.0
+    # Retries of a tile that raised on a worker
+    max_retries: int = 2
 
 
 # --- Genetics / operator config ---
@@ -60,6 +83,40 @@ class GeneticsConfig:
     # ("depth1" | "random_depth")
     tree_crossover_op: str = "depth1"
 
+    # Hard cap on offspring length (None = uncapped)
+    max_length: Optional[int] = None
+    # What to do with a child over max_length:
+    # "truncate" (keep its first max_length genes; creators that can't trim fall back to "reject")
+    # | "reject" (replace it by a mutant of its first parent that fits, else drop it).
+    # Initial populations and migrants over max_length are trimmed or dropped the same way.
+    length_policy: str = "truncate"
+
+
+# --- Logging config ---
+
+@dataclass
+class LoggingConfig:
+    # Write metrics / populations on a background thread (log() only enqueues)
+    async_write: bool = True
+    # Records waiting for the writer before log() blocks
+    queue_size: int = 256
+    # Metrics are flushed to disk at least every flush_every records (and when the queue drains)
+    flush_every: int = 64
+    # Population snapshot every snapshot_every log() calls (0 = never)
+    snapshot_every: int = 1
+    # "full" (whole population per snapshot) | "delta" (added programs and removed fingerprints)
+    # | "archive" (binary PopulationArchive per kind, see loggers/archive.py)
+    snapshot_mode: str = "full"
+    # In delta mode, every full_every-th snapshot is full
+    full_every: int = 100
+    # Hot-path counters (interpreter calls/steps, cache hits, LCS cells, worker busy time,
+    # IPC bytes) merged into every metrics record; see loggers/counters.py
+    counters: bool = False
+    # Set by `main.py --profile`: pool workers and islands write their profiles here
+    profile_dir: Optional[str] = None
+    # "cprofile" | "sample" (stack sampling)
+    profile_mode: str = "cprofile"
+
 
 # --- Experiment config ---
 
@@ -78,6 +135,7 @@ class ExperimentConfig:
 
     payoff: PayoffConfig = field(default_factory=PayoffConfig)
     genetics: GeneticsConfig = field(default_factory=GeneticsConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
 
     code: CodeConfig = field(default_factory=CodeConfig)
     # code: RuleConfig = field(default_factory=RuleConfig)
@@ -90,6 +148,13 @@ class RandomBaselineConfig:
     n_ref: int = 10**1
     n_tested: int = 10**7
     n_grain: int = 500
+    # "pool": candidates generated in the parent, full payoff matrix per iteration
+    # "stream": workers generate seeded candidates and return only those above threshold
+    mode: str = "pool"
+    # A candidate is kept when its mean reward against the reference population exceeds this
+    threshold: float = 0.7
+    # Seed of the candidate streams in "stream" mode (None = random)
+    seed: Optional[int] = None
     out_path: str = "outputs/random_baseline/" + time.strftime("%Y%m%d_%H%M%S")
     out_name: str = "results.json"
     experiment: ExperimentConfig = field(default_factory=ExperimentConfig)
@@ -105,6 +170,7 @@ class RandomSkimmedConfig:
     skim_fraction: float = 0.9  # fraction of dominated individuals removed per skim (0 = keep all, 1 = remove all)
     n_accepted: Optional[int] = 2_000
     max_pop: Optional[int] = None  # if set, randomly downsample to this size after each generation
+    checkpoint_every: int = 0  # generations between checkpoints in out_dir (0 = never)
     out_dir: str = "outputs/random_skimmed/" + time.strftime("%Y%m%d_%H%M%S")
     experiment: ExperimentConfig = field(default_factory=ExperimentConfig)
 
@@ -119,13 +185,126 @@ class EvolutionConfig:
     n_offspring: int = 20
     # Number of generations
     n_iter: int = 1000
-    # Selection method: "skim_fast" | "skim_slow" | "nash_subset" | "none"
+    # Payoff evaluation: "dense" (full square matrix) | "sampled" (k opponents per program, rated)
+    evaluation: str = "dense"
+    # Sampled evaluation: opponents drawn for each new program
+    n_opponents: int = 16
+    # Sampled evaluation: extra rounds for programs near the selection cutoff
+    n_adaptive_rounds: int = 2
+    n_adaptive_opponents: int = 4
+    # Selection method: "skim_fast" | "skim_slow" | "nash_subset" | "double_oracle" | "nash_approx" | "none"
+    # ("rating" | "none" with evaluation="sampled")
     selection: str = "skim_fast"
     # Skim rounds applied per generation (only for skim_* methods)
     n_skim: int = 2
+    # Approximate Nash solver (only for nash_approx):
+    # "regret_matching" | "mwu" | "fictitious_play"
+    nash_method: str = "regret_matching"
+    # Target exploitability and per-generation iteration budget
+    nash_tol: float = 1e-2
+    nash_max_iter: int = 2_000
     # Hard cap on population size after selection (None = uncapped)
     pop_cap: Optional[int] = 500
+    # Which survivors pop_cap keeps: "age" (oldest first) | "length" (shortest first,
+    # after equilibrium weight for Nash methods)
+    pop_cap_tiebreak: str = "age"
+    # Pipelined dense loop: breed and start evaluating the next offspring from the last
+    # Nash support (or last survivors) while selection runs; children of pruned parents
+    # are discarded and replaced (not with double_oracle)
+    pipeline: bool = False
+    # Seed for the batched genetic operators (None = random)
+    seed: Optional[int] = None
+    # Generations between checkpoints in out_dir (0 = never); resume with --resume out_dir
+    checkpoint_every: int = 0
     # Output directory
     out_dir: str = "outputs/evolution/" + time.strftime("%Y%m%d_%H%M%S")
     # Underlying experiment config (interpreter, reward, genetics, …)
-    experiment: ExperimentConfig = field(default_factory=ExperimentConfig)
\ No newline at end of file
+    experiment: ExperimentConfig = field(default_factory=ExperimentConfig)
+
+# --- Island-model evolution config ---
+
+@dataclass
+class IslandConfig:
+    # Number of sub-populations, each evolving in its own process
+    n_islands: int = 4
+    # Migration topology: "ring" | "full" | "random" (one random partner per event)
+    topology: str = "ring"
+    # Generations between migrations
+    migration_interval: int = 10
+    # Programs sent by each island per destination
+    n_migrants: int = 2
+    # Migrant choice: "top" (best mean payoff) | "nash" (highest equilibrium weight)
+    migrant_selection: str = "top"
+    # Base seed (None = random); island k uses seed + k
+    seed: Optional[int] = None
+    # Output directory
+    out_dir: str = "outputs/islands/" + time.strftime("%Y%m%d_%H%M%S")
+    # Per-island evolution settings (n_workers is per island: keep it small; dense evaluation,
+    # and no double_oracle selection)
+    evolution: EvolutionConfig = field(default_factory=lambda: EvolutionConfig(
+        experiment=ExperimentConfig(payoff=PayoffConfig(n_workers=1)),
+    ))
+
+# --- Homoiconic scan config ---
+
+@dataclass
+class HomoiconicConfig:
+    # Population to scan: JSON list of programs, or a PopulationArchive directory (last generation)
+    pop_path: str = "outputs/random_skimmed/20251209_161419/pop.json"
+    # Output file (one JSON record per candidate)
+    out_path: str = "outputs/homoiconic/" + time.strftime("%Y%m%d_%H%M%S")
+    # Rounds whose candidates are scored in one batched payoff call
+    block_rounds: int = 64
+    experiment: ExperimentConfig = field(default_factory=ExperimentConfig)
+
+
+# --- Evaluation server config ---
+
+@dataclass
+class ServerConfig:
+    # "host:port" (HTTP on localhost) or "unix:/path/to.sock" (HTTP on a Unix socket)
+    address: str = "127.0.0.1:8765"
+    # Reference population served as "default": JSON list of programs or PopulationArchive
+    # directory (None = upload one later with PUT /refs/default)
+    ref_path: Optional[str] = None
+    # A batch closes at max_batch programs or max_wait_ms after its first request
+    max_batch: int = 256
+    max_wait_ms: float = 5.0
+    # Batches computed at the same time (the next batch forms while one is computed)
+    max_inflight: int = 2
+    # Entries of the (reference, program) -> payoff column cache (0 = off)
+    score_cache_size: int = 100_000
+    # Most recent requests over which latency percentiles are reported
+    latency_window: int = 10_000
+    # Seconds between metrics records in out_dir/metrics.jsonl
+    metrics_every: float = 60.0
+    out_dir: str = "outputs/server/" + time.strftime("%Y%m%d_%H%M%S")
+    experiment: ExperimentConfig = field(default_factory=ExperimentConfig)
+
+
+# --- Parameter sweep config ---
+
+@dataclass
+class SweepConfig:
+    # Side script every run executes: "evolution" | "random_skimmed" | "random_baseline" (pool mode)
+    side: str = "evolution"
+    # Overrides applied to every run, "dotted.path=value" as with main.py --set
+    base: List[str] = field(default_factory=list)
+    # Swept fields: dotted path -> list of values, or {"low": .., "high": .., "log": bool}
+    # (random search only; ints when both bounds are ints)
+    space: Dict[str, Any] = field(default_factory=lambda: {
+        "experiment.genetics.mutation_rate": [0.01, 0.05, 0.1],
+        "selection": ["skim_fast", "nash_subset"],
+    })
+    # "grid" (every combination of the listed values) | "random" (n_samples draws)
+    search: str = "grid"
+    n_samples: int = 8
+    seed: Optional[int] = None
+    # Runs executed at the same time, each in its own process
+    n_concurrent: int = 4
+    # Core budget: worker processes of the pool shared by every run
+    n_workers: int = 6
+    # Entries of each payoff cache shared by runs with the same interpreter + reward config (0 = off)
+    payoff_cache_size: int = 1_000_000
+    # Each run writes to out_dir/run_XXX; out_dir/sweep.json lists runs, overrides and status
+    out_dir: str = "outputs/sweep/" + time.strftime("%Y%m%d_%H%M%S")
@@ -1,6 +1,11 @@
+import random
 from abc import ABC, abstractmethod
 from typing import Optional
 
+import numpy as np
+
+from creation.population import Population
+
 Program = list  # list[int] for all current interpreters
 
 
@@ -17,3 +22,34 @@ class Creator(ABC):
 
     @abstractmethod
     def homoiconic(self, interp, prog_a: Program, prog_b: Program) -> Optional[Program]: ...
+
+    def trim(self, prog: Program, max_length: int) -> Optional[Program]:
+        """Shorten prog to at most max_length genes, or None if it can't be cut."""
+        return prog[:max_length]
+
+    # Batched operators. These defaults fall back on the per-program
+    # operators; creators with array-friendly programs override them.
+
+    def random_batch(self, n: int, rng: np.random.Generator) -> Population:
+        return Population.from_programs(self.random() for _ in range(n))
+
+    def mutate_batch(self, pop: Population, parents: np.ndarray, rng: np.random.Generator) -> Population:
+        return Population.from_programs(self.mutate(pop[int(i)]) for i in parents)
+
+    def seeded_batch(self, n: int, seed) -> Population:
+        """
+        random_batch drawn from its own RNG stream: the same seed (an int or a
+        sequence of ints) always gives the same programs, in any process.
+        Creators that draw from the `random` module are seeded from the same
+        stream; the module's global state is left untouched.
+        """
+        rng = np.random.default_rng(seed)
+        state = random.getstate()
+        random.seed(int(rng.integers(2**63)))
+        try:
+            return self.random_batch(n, rng)
+        finally:
+            random.setstate(state)
+
+    def crossover_batch(self, pop: Population, pairs: np.ndarray, rng: np.random.Generator) -> Population:
+        return Population.from_programs(self.crossover(pop[int(a)], pop[int(b)]) for a, b in pairs)
@@ -2,6 +2,10 @@
 import random
 from typing import Callable, Dict, List
 
+import numpy as np
+
+from creation.population import Population, gather_segments
+
 MutateFn = Callable[[List[int], float], List[int]]
 CrossoverFn = Callable[[List[int], List[int]], List[int]]
 
@@ -58,6 +62,104 @@ def crossover_code_uniform(code_a: List[int], code_b: List[int]) -> List[int]:
     return child + code_a[min_len:]
 
 
+# ── Batched integer-program operators ─────────────────────────────────────────
+# Same semantics as the per-program operators above, applied to many children
+# at once on a Population with a numpy Generator.
+
+def random_code_batch(n: int, cfg, rng: np.random.Generator) -> Population:
+    """n random programs of cfg.code.code_length genes in [min_val, max_val]."""
+    length = cfg.code.code_length
+    genes = rng.integers(cfg.code.min_val, cfg.code.max_val + 1, size=n * length, dtype=np.int32)
+    return Population.from_lengths(genes, np.full(n, length, dtype=np.int64))
+
+
+def mutate_code_uniform_batch(pop: Population, parents: np.ndarray, cfg, rate: float, rng: np.random.Generator) -> Population:
+    """Copy pop[parents] and replace each gene with probability rate."""
+    children = pop.take(parents)
+    hit = rng.random(len(children.genes)) < rate
+    children.genes[hit] = rng.integers(cfg.code.min_val, cfg.code.max_val + 1, size=int(hit.sum()), dtype=np.int32)
+    children._fingerprints = None
+    return children
+
+
+def mutate_code_creep_batch(
+    pop: Population, parents: np.ndarray, cfg, rate: float, rng: np.random.Generator, delta: int = 5,
+) -> Population:
+    """Copy pop[parents] and nudge each gene by ±delta with probability rate, clamped."""
+    children = pop.take(parents)
+    hit = rng.random(len(children.genes)) < rate
+    nudged = children.genes[hit] + rng.integers(-delta, delta + 1, size=int(hit.sum()), dtype=np.int32)
+    children.genes[hit] = np.clip(nudged, cfg.code.min_val, cfg.code.max_val)
+    children._fingerprints = None
+    return children
+
+
+def _segments_population(pop: Population, segments: List[tuple]) -> Population:
+    """
+    Build children from per-child segment lists. segments is a list of
+    (source_index, start_in_program, length) arrays, one triple per segment
+    slot; child k is the concatenation of slot 0, slot 1, ... for row k.
+    """
+    n = len(segments[0][0])
+    n_slots = len(segments)
+    src = np.stack([s[0] for s in segments], axis=1).ravel()
+    start = np.stack([s[1] for s in segments], axis=1).ravel()
+    length = np.stack([s[2] for s in segments], axis=1).ravel()
+    genes = gather_segments(pop.genes, pop.offsets[src] + start, length)
+    return Population.from_lengths(genes, length.reshape(n, n_slots).sum(axis=1))
+
+
+def crossover_code_single_batch(pop: Population, pairs: np.ndarray, rng: np.random.Generator) -> Population:
+    """Single-point crossover for each (a, b) row of pairs; empty parents copy a."""
+    a, b = pairs[:, 0], pairs[:, 1]
+    len_a, len_b = pop.lengths[a], pop.lengths[b]
+    cut_a = rng.integers(0, len_a + 1)
+    cut_b = rng.integers(0, len_b + 1)
+    degenerate = (len_a == 0) | (len_b == 0)
+    cut_a = np.where(degenerate, len_a, cut_a)
+    cut_b = np.where(degenerate, len_b, cut_b)
+    return _segments_population(pop, [(a, np.zeros_like(cut_a), cut_a), (b, cut_b, len_b - cut_b)])
+
+
+def crossover_code_two_point_batch(pop: Population, pairs: np.ndarray, rng: np.random.Generator) -> Population:
+    """Two-point crossover on the aligned segment; tail kept from a."""
+    a, b = pairs[:, 0], pairs[:, 1]
+    len_a, len_b = pop.lengths[a], pop.lengths[b]
+    min_len = np.minimum(len_a, len_b)
+    short = min_len < 2
+    # Two distinct points in [0, min_len], sorted
+    p1 = rng.integers(0, np.maximum(min_len, 1) + 1)
+    p2 = rng.integers(0, np.maximum(min_len, 1))
+    p2 = p2 + (p2 >= p1)
+    p1, p2 = np.minimum(p1, p2), np.maximum(p1, p2)
+    p1 = np.where(short, 0, p1)
+    p2 = np.where(short, 0, p2)
+    children = _segments_population(pop, [
+        (a, np.zeros_like(p1), p1),
+        (b, p1, p2 - p1),
+        (a, p2, len_a - p2),
+    ])
+    if short.any():
+        fallback = crossover_code_single_batch(pop, pairs[short], rng)
+        order = np.concatenate([np.flatnonzero(~short), np.flatnonzero(short)])
+        merged = Population.concat([children.take(np.flatnonzero(~short)), fallback])
+        children = merged.take(np.argsort(order, kind="stable"))
+    return children
+
+
+def crossover_code_uniform_batch(pop: Population, pairs: np.ndarray, rng: np.random.Generator) -> Population:
+    """Gene-wise coin-flip crossover over the aligned segment; tail kept from a."""
+    a, b = pairs[:, 0], pairs[:, 1]
+    children = pop.take(a)
+    min_len = np.minimum(pop.lengths[a], pop.lengths[b])
+    position = np.arange(len(children.genes), dtype=np.int64) - np.repeat(children.offsets[:-1], children.lengths)
+    owner = np.repeat(np.arange(len(children)), children.lengths)
+    swap = (position < min_len[owner]) & (rng.random(len(children.genes)) < 0.5)
+    children.genes[swap] = pop.genes[pop.offsets[b][owner[swap]] + position[swap]]
+    children._fingerprints = None
+    return children
+
+
 # ── Tree helpers ───────────────────────────────────────────────────────────────
 
 def _is_balanced(s: List[int]) -> bool:
@@ -202,3 +304,14 @@ TREE_CROSSOVER_OPS: Dict[str, CrossoverFn] = {
     "random_depth": crossover_tree_random_depth,
 }
 
+
+CODE_MUTATION_BATCH_OPS: Dict[str, Callable] = {
+    "uniform": mutate_code_uniform_batch,
+    "creep":   mutate_code_creep_batch,
+}
+
+CODE_CROSSOVER_BATCH_OPS: Dict[str, Callable] = {
+    "single_point": crossover_code_single_batch,
+    "two_point":    crossover_code_two_point_batch,
+    "uniform":      crossover_code_uniform_batch,
+}
@@ -1,8 +1,17 @@
 import random
 
+import numpy as np
+
 from config import ExperimentConfig
 from creation.base import Creator, Program
-from creation.genetics import CODE_MUTATION_OPS, CODE_CROSSOVER_OPS
+from creation.genetics import (
+    CODE_CROSSOVER_BATCH_OPS,
+    CODE_CROSSOVER_OPS,
+    CODE_MUTATION_BATCH_OPS,
+    CODE_MUTATION_OPS,
+    random_code_batch,
+)
+from creation.population import Population
 from creation.homoiconic import HOMOICONIC_OPS
 
 
@@ -17,6 +26,8 @@ class IconfractranCreator(Creator):
         gc = cfg.genetics
         self._mutate_fn = CODE_MUTATION_OPS[gc.code_mutation_op]
         self._crossover_fn = CODE_CROSSOVER_OPS[gc.code_crossover_op]
+        self._mutate_batch_fn = CODE_MUTATION_BATCH_OPS[gc.code_mutation_op]
+        self._crossover_batch_fn = CODE_CROSSOVER_BATCH_OPS[gc.code_crossover_op]
         self._homoiconic_fn = HOMOICONIC_OPS["output"]
 
     def random(self) -> Program:
@@ -30,3 +41,12 @@ class IconfractranCreator(Creator):
 
     def homoiconic(self, interp, prog_a: Program, prog_b: Program) -> Program:
         return self._homoiconic_fn(interp, prog_a, prog_b)
+
+    def random_batch(self, n: int, rng: np.random.Generator) -> Population:
+        return random_code_batch(n, self._cfg, rng)
+
+    def mutate_batch(self, pop: Population, parents: np.ndarray, rng: np.random.Generator) -> Population:
+        return self._mutate_batch_fn(pop, parents, self._cfg, self._rate, rng)
+
+    def crossover_batch(self, pop: Population, pairs: np.ndarray, rng: np.random.Generator) -> Population:
+        return self._crossover_batch_fn(pop, pairs, rng)
@@ -1,7 +1,65 @@
 import random
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
 
 from config import GeneticsConfig
 from creation.base import Creator
+from creation.population import Population
+
+# Mutants drawn for a rejected child before dropping it
+_REJECT_TRIES = 8
+
+
+def _fit(creator: Creator, child: list, max_length: int) -> Optional[list]:
+    """child if it fits in max_length, else its trimmed version, else None."""
+    if len(child) <= max_length:
+        return child
+    return creator.trim(child, max_length)
+
+
+def _limit_length(creator: Creator, child: list, parent: list, gc: GeneticsConfig) -> Optional[list]:
+    """Apply gc.max_length / gc.length_policy to one child of parent (None: dropped)."""
+    if gc.max_length is None or len(child) <= gc.max_length:
+        return child
+    if gc.length_policy == "truncate":
+        trimmed = creator.trim(child, gc.max_length)
+        if trimmed is not None:
+            return trimmed
+    elif gc.length_policy != "reject":
+        raise ValueError(f"Unknown length policy: {gc.length_policy}")
+    # Rejected: a mutant of the parent that fits (trimmed if possible), else nothing
+    # (the parent itself may be over the cap, e.g. one admitted before it was set)
+    for _ in range(_REJECT_TRIES):
+        child = _fit(creator, creator.mutate(parent), gc.max_length)
+        if child is not None:
+            return child
+    return None
+
+
+def limit_lengths(creator: Creator, pop, gc: GeneticsConfig):
+    """
+    pop (list or Population) within gc.max_length, for programs that did not
+    come from make_offspring (initial populations, migrants): over-long
+    programs are trimmed under "truncate" when the creator can, else dropped.
+    """
+    if gc.max_length is None:
+        return pop
+    lengths = pop.lengths if isinstance(pop, Population) else np.array([len(p) for p in pop])
+    if not (lengths > gc.max_length).any():
+        return pop
+    if gc.length_policy not in ("truncate", "reject"):
+        raise ValueError(f"Unknown length policy: {gc.length_policy}")
+    kept = []
+    for program in pop:
+        if len(program) > gc.max_length:
+            program = creator.trim(program, gc.max_length) if gc.length_policy == "truncate" else None
+        if program is not None:
+            kept.append(program)
+    if not kept:
+        raise ValueError(f"No program fits genetics.max_length={gc.max_length} (length_policy={gc.length_policy!r})")
+    return Population.from_programs(kept) if isinstance(pop, Population) else kept
 
 
 def make_offspring(
@@ -23,7 +81,170 @@ def make_offspring(
             if child is None:
                 child = creator.crossover(pa, pb)
         else:
-            parent = random.choice(survivors)
-            child = creator.mutate(parent)
-        offspring.append(child)
+            pa = random.choice(survivors)
+            child = creator.mutate(pa)
+        child = _limit_length(creator, child, pa, gc)
+        if child is not None:
+            offspring.append(child)
     return offspring
+
+
+@dataclass
+class OffspringPlan:
+    """
+    What each child of a batch will be, drawn before anything runs.
+
+    pairs[k] are child k's parents (pairs[k, 0] alone for a mutant); cross
+    and homo flag crossover and homoiconic children (homo implies cross).
+    """
+    pairs: np.ndarray
+    cross: np.ndarray
+    homo: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    @property
+    def homoiconic_pairs(self) -> np.ndarray:
+        return self.pairs[self.homo]
+
+
+def plan_offspring(
+    n_pop: int,
+    n_offspring: int,
+    gc: GeneticsConfig,
+    rng: np.random.Generator,
+    homoiconic: bool = True,
+) -> OffspringPlan:
+    """Draw operators and parents for n_offspring children of n_pop survivors."""
+    cross = (rng.random(n_offspring) < gc.crossover_prob) & (n_pop >= 2)
+    homo = cross & (rng.random(n_offspring) < gc.homoiconic_prob) & homoiconic
+    # Two distinct parents per crossover child
+    pa = rng.integers(0, n_pop, size=n_offspring)
+    pb = rng.integers(0, max(n_pop - 1, 1), size=n_offspring)
+    pb = pb + (pb >= pa)
+    return OffspringPlan(np.stack([pa, pb], axis=1), cross, homo)
+
+
+def realize_offspring(
+    creator: Creator,
+    survivors: Population,
+    plan: OffspringPlan,
+    homo_children: List[Optional[list]],
+    gc: GeneticsConfig,
+    rng: np.random.Generator,
+    return_parents: bool = False,
+):
+    """
+    Build the children of a plan, given the homoiconic children (one per
+    plan.homoiconic_pairs row, None where the interpreter produced nothing:
+    those become ordinary crossovers).
+
+    With return_parents, returns (offspring, parents): parents[k] are the
+    survivor indices offspring[k] was built from (both columns equal for a
+    mutant).
+    """
+    homo_idx = np.flatnonzero(plan.homo)
+    produced = np.array([c is not None for c in homo_children], dtype=bool)
+    homo = np.zeros(len(plan), dtype=bool)
+    homo[homo_idx[produced]] = True
+
+    cross_idx = np.flatnonzero(plan.cross & ~homo)
+    mut_idx = np.flatnonzero(~plan.cross)
+    parts = [
+        creator.crossover_batch(survivors, plan.pairs[cross_idx], rng),
+        creator.mutate_batch(survivors, plan.pairs[mut_idx, 0], rng),
+        Population.from_programs(c for c in homo_children if c is not None),
+    ]
+    order = np.concatenate([cross_idx, mut_idx, homo_idx[produced]])
+    offspring = Population.concat(parts).take(np.argsort(order, kind="stable"))
+    offspring, kept = _limit_length_batch(creator, offspring, survivors, plan.pairs[:, 0], gc, rng)
+    if not return_parents:
+        return offspring
+    parents = np.where(plan.cross[:, None], plan.pairs, plan.pairs[:, :1])
+    return offspring, parents[kept]
+
+
+def make_offspring_batch(
+    creator: Creator,
+    survivors: Population,
+    n_offspring: int,
+    gc: GeneticsConfig,
+    rng: np.random.Generator,
+    interp=None,
+    engine=None,
+    return_parents: bool = False,
+):
+    """
+    Batched make_offspring: same operator probabilities, but the plan for
+    every child is drawn up front and crossovers / mutations run as one
+    vectorised call each. Homoiconic children run on the workers of a
+    PayoffEngine when one is given, else one by one on interp; they fall
+    back to crossover when they produce nothing.
+    gc.max_length / gc.length_policy apply as in make_offspring.
+    return_parents: also return each child's parents (see realize_offspring).
+    """
+    n_pop = len(survivors)
+    if not n_pop or n_offspring == 0:
+        empty = Population.concat([])
+        return (empty, np.zeros((0, 2), dtype=int)) if return_parents else empty
+
+    plan = plan_offspring(n_pop, n_offspring, gc, rng, homoiconic=engine is not None or interp is not None)
+    homo_pairs = plan.homoiconic_pairs
+    if engine is not None:
+        homo_children = engine.homoiconic(survivors.take(homo_pairs[:, 0]), survivors.take(homo_pairs[:, 1]))
+    else:
+        homo_children = [creator.homoiconic(interp, survivors[int(a)], survivors[int(b)]) for a, b in homo_pairs]
+    return realize_offspring(creator, survivors, plan, homo_children, gc, rng, return_parents=return_parents)
+
+
+def _limit_length_batch(
+    creator: Creator,
+    offspring: Population,
+    survivors: Population,
+    parents: np.ndarray,
+    gc: GeneticsConfig,
+    rng: np.random.Generator,
+) -> Population:
+    """
+    Batched _limit_length; parents[k] is the first parent of offspring[k].
+    Returns (offspring, kept): kept are the indices of the input children left.
+    """
+    kept = np.arange(len(offspring))
+    if gc.max_length is None:
+        return offspring, kept
+    too_long = np.flatnonzero(offspring.lengths > gc.max_length)
+    if not len(too_long):
+        return offspring, kept
+    if gc.length_policy not in ("truncate", "reject"):
+        raise ValueError(f"Unknown length policy: {gc.length_policy}")
+    if gc.length_policy == "truncate" and type(creator).trim is Creator.trim:
+        # Plain prefix cut: one vectorised pass
+        return offspring.truncate(gc.max_length), kept
+
+    replaced = [None] * len(too_long)
+    if gc.length_policy == "truncate":
+        replaced = [creator.trim(offspring[k], gc.max_length) for k in too_long.tolist()]
+    rejected = [k for k, child in enumerate(replaced) if child is None]
+    for _ in range(_REJECT_TRIES):
+        if not rejected:
+            break
+        mutants = creator.mutate_batch(survivors, parents[too_long[rejected]], rng)
+        for k, child in zip(rejected, mutants):
+            replaced[k] = _fit(creator, child, gc.max_length)
+        rejected = [k for k in rejected if replaced[k] is None]
+    fitted = [k for k, child in enumerate(replaced) if child is not None]
+    if fitted:
+        offspring = _replace(offspring, too_long[fitted], Population.from_programs(replaced[k] for k in fitted))
+    if rejected:
+        # Dropped, as in _limit_length: the batch has fewer children
+        kept = np.setdiff1d(kept, too_long[rejected])
+        offspring = offspring.take(kept)
+    return offspring, kept
+
+
+def _replace(pop: Population, indices: np.ndarray, new: Population) -> Population:
+    """pop with pop[indices[k]] replaced by new[k]."""
+    kept = np.setdiff1d(np.arange(len(pop)), indices)
+    order = np.concatenate([kept, indices])
+    return Population.concat([pop.take(kept), new]).take(np.argsort(order, kind="stable"))
@@ -0,0 +1,147 @@
+from typing import Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+_FP_PRIME = np.uint64(0x100000001B3)
+_FP_SEED = np.uint64(0xCBF29CE484222325)
+
+
+def _mix64(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser, vectorised (uint64 arithmetic wraps mod 2^64)."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+# Gene dtypes kept as they are; anything else is stored as int32
+_WIDE_DTYPES = (np.dtype(np.int64), np.dtype(object))
+
+
+def _as_uint64(genes: np.ndarray) -> np.ndarray:
+    """Genes mod 2^64 (two's complement), the same for a value whatever the dtype holding it."""
+    if genes.dtype == object:
+        return np.fromiter((int(g) & 0xFFFFFFFFFFFFFFFF for g in genes), dtype=np.uint64, count=len(genes))
+    return genes.astype(np.int64).astype(np.uint64)
+
+
+def gather_segments(genes: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenate genes[starts[k]: starts[k] + lengths[k]] for every k, without a Python loop."""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=genes.dtype)
+    seg_offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    index = np.arange(total, dtype=np.int64) - np.repeat(seg_offsets - np.asarray(starts, dtype=np.int64), lengths)
+    return genes[index]
+
+
+class Population:
+    """
+    Array-backed population of integer programs.
+
+    All genes live in one flat int32 buffer, widened when some gene does not
+    fit (int64, or Python ints in an object array for the arbitrary-size
+    genes of e.g. iconfractran homoiconic children); program k is
+    genes[offsets[k]:offsets[k + 1]]. 64-bit fingerprints are computed for
+    every program at once with a vectorised polynomial hash.
+
+    Indexing with an int returns the program as a plain list, so a
+    Population can be used anywhere a list of programs is expected (payoff
+    engine, rewards, logger). Slicing and `take` return Populations, which
+    pickle as two arrays instead of millions of Python ints.
+    """
+
+    def __init__(self, genes: np.ndarray, offsets: np.ndarray):
+        genes = np.asarray(genes)
+        self.genes = np.ascontiguousarray(genes, dtype=genes.dtype if genes.dtype in _WIDE_DTYPES else np.int32)
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        self._fingerprints: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_programs(cls, programs: Iterable[List[int]]) -> "Population":
+        programs = list(programs)
+        lengths = np.fromiter((len(p) for p in programs), dtype=np.int64, count=len(programs))
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        for dtype in (np.int32, np.int64, object):
+            try:
+                genes = np.fromiter((g for p in programs for g in p), dtype=dtype, count=int(offsets[-1]))
+                break
+            except OverflowError:
+                continue
+        return cls(genes, offsets)
+
+    @classmethod
+    def from_lengths(cls, genes: np.ndarray, lengths: np.ndarray) -> "Population":
+        return cls(genes, np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]))
+
+    @classmethod
+    def concat(cls, pops: Iterable["Population"]) -> "Population":
+        pops = [p for p in pops]
+        if not pops:
+            return cls(np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int64))
+        genes = np.concatenate([p.genes for p in pops])
+        lengths = np.concatenate([p.lengths for p in pops])
+        return cls.from_lengths(genes, lengths)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[List[int], "Population"]:
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self))[key])
+        if key < 0:
+            key += len(self)
+        return self.genes[self.offsets[key]:self.offsets[key + 1]].tolist()
+
+    def __iter__(self) -> Iterator[List[int]]:
+        for k in range(len(self)):
+            yield self[k]
+
+    def __add__(self, other) -> "Population":
+        if not isinstance(other, Population):
+            other = Population.from_programs(other)
+        return Population.concat([self, other])
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def array(self, k: int) -> np.ndarray:
+        """Program k as a zero-copy int32 view."""
+        return self.genes[self.offsets[k]:self.offsets[k + 1]]
+
+    def to_lists(self) -> List[List[int]]:
+        return [self[k] for k in range(len(self))]
+
+    def truncate(self, max_length: int) -> "Population":
+        """Every program cut to its first max_length genes."""
+        lengths = np.minimum(self.lengths, max_length)
+        return Population.from_lengths(gather_segments(self.genes, self.offsets[:-1], lengths), lengths)
+
+    def take(self, indices) -> "Population":
+        """Sub-population of the given programs (any order, repeats allowed)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        lengths = self.lengths[indices]
+        pop = Population.from_lengths(gather_segments(self.genes, self.offsets[indices], lengths), lengths)
+        if self._fingerprints is not None:
+            pop._fingerprints = self._fingerprints[indices]
+        return pop
+
+    @property
+    def fingerprints(self) -> np.ndarray:
+        """uint64 content hash per program (equal programs share a fingerprint)."""
+        if self._fingerprints is None:
+            n = len(self)
+            lengths = self.lengths
+            fp = np.full(n, _FP_SEED, dtype=np.uint64) ^ lengths.astype(np.uint64)
+            if len(self.genes):
+                max_len = int(lengths.max())
+                powers = np.cumprod(np.full(max_len, _FP_PRIME, dtype=np.uint64), dtype=np.uint64)
+                position = np.arange(len(self.genes), dtype=np.int64) - np.repeat(self.offsets[:-1], lengths)
+                terms = _mix64(_as_uint64(self.genes)) * powers[position]
+                nonempty = lengths > 0
+                fp[nonempty] += np.add.reduceat(terms, self.offsets[:-1][nonempty])
+            self._fingerprints = _mix64(fp)
+        return self._fingerprints
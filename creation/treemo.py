@@ -1,4 +1,5 @@
 from random import randint
+from typing import Optional
 
 from config import ExperimentConfig
 from creation.base import Creator, Program
@@ -40,3 +41,7 @@ class TreemoCreator(Creator):
 
     def homoiconic(self, interp, prog_a: Program, prog_b: Program) -> Program:
         return self._homoiconic_fn(interp, prog_a, prog_b)
+
+    def trim(self, prog: Program, max_length: int) -> Optional[Program]:
+        # A cut tree is no longer balanced
+        return None
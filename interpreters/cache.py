@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+from loggers import counters
+
+
+class CachedInterpreter:
+    """
+    LRU cache of run(code, inp) results in front of any interpreter.
+
+    Interpreters are deterministic, so a (code, input) pair that was already
+    run (e.g. by a reward during payoff computation) can be answered from the
+    cache, e.g. when the same pair is then used for homoiconic offspring.
+    Calls with extra arguments bypass the cache. Cached lists are copied on
+    the way out, so callers may mutate what they get.
+    """
+
+    def __init__(self, interp, maxsize: int):
+        self.interp = interp
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+
+    def __getattr__(self, name):
+        return getattr(self.interp, name)
+
+    def run(self, code, inp, *args, **kwargs):
+        if args or kwargs:
+            return self.interp.run(code, inp, *args, **kwargs)
+        key = (tuple(code), tuple(inp) if inp is not None else None)
+        result = self._cache.get(key)
+        if result is None:
+            self.misses += 1
+            counters.add("run_cache.misses")
+            result = self.interp.run(code, inp)
+            self._cache[key] = result
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            counters.add("run_cache.hits")
+            self._cache.move_to_end(key)
+        return tuple(list(r) if isinstance(r, list) else r for r in result)
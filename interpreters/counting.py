@@ -0,0 +1,26 @@
+import time
+
+from loggers import counters
+
+
+class CountingInterpreter:
+    """
+    Counts run() calls and their wall time (interp.calls, interp.run_s) and
+    the length of what they return (interp.output_len) in loggers.counters.
+    Interpreter-specific counters (steps, limit hits) are added by the
+    interpreters themselves.
+    """
+
+    def __init__(self, interp):
+        self.interp = interp
+
+    def __getattr__(self, name):
+        return getattr(self.interp, name)
+
+    def run(self, code, inp, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = self.interp.run(code, inp, *args, **kwargs)
+        counters.add("interp.run_s", time.perf_counter() - t0)
+        counters.add("interp.calls")
+        counters.add("interp.output_len", len(result[0]))
+        return result
@@ -1,6 +1,8 @@
 # This is an unfinished (maybe derelict) piece of code
 
-from typing import List, Iterator, Tuple
+from typing import List, Iterator, Optional, Tuple
+
+from loggers import counters
 
 def code_rules(code: List[int]) -> Iterator[Tuple[int, int]]:
     # Pair up (a,b) from code[1:]
@@ -19,24 +21,46 @@ def check(code: List[int], mem: List[int]) -> bool:
                 return True
     return False
 
-def step(code: List[int], mem: List[int]) -> Tuple[List[int], List[int]]:
+def _fire(code: List[int], mem: List[int]) -> Optional[bool]:
+    # check(), returning None if no rule applies, else whether the cell changed
+    for a, b in code_rules(code):
+        if a == 0:
+            continue
+        for i in range(len(mem)):
+            if mem[i] % a == 0:
+                old, mem[i] = mem[i], (mem[i] // a) * b
+                return mem[i] != old
+    return None
+
+def _apply(code: List[int], mem: List[int]) -> bool:
+    # One step in place; False when it changed nothing (every later step is then a no-op too)
     # If code[0] is meant to be a special register, try it first
     # We check it as a one-item memory, then write it back if it changed.
     if len(code) > 0:
         reg = [code[0]]
-        if check(code=code, mem=reg):
+        fired = _fire(code, reg)
+        if fired is not None:
             code[0] = reg[0]
-            return code, mem
+            return fired
 
     # Otherwise (or next), operate on normal memory
-    check(code=code, mem=mem)
+    return bool(_fire(code, mem))
+
+def step(code: List[int], mem: List[int]) -> Tuple[List[int], List[int]]:
+    _apply(code, mem)
     return code, mem
 
-def ift(program: List[int], inp: List[int], max_step: int = 2000) -> Tuple[List[int], List[int]]:
+def _run(program: List[int], inp: List[int], max_step: int) -> Tuple[List[int], List[int], int]:
+    # ift, plus the number of steps that changed something
     code = program.copy()
     res = inp.copy()
-    for _ in range(max_step):
-        code, res = step(code=code, mem=res)
+    for n in range(max_step):
+        if not _apply(code, res):
+            return res, code, n
+    return res, code, max_step
+
+def ift(program: List[int], inp: List[int], max_step: int = 2000) -> Tuple[List[int], List[int]]:
+    res, code, _ = _run(program, inp, max_step)
     return res, code
 
 class IconfractranInterpreter:
@@ -44,4 +68,6 @@ class IconfractranInterpreter:
         self.max_step = max_step
 
     def run(self, program: List[int], inp: List[int]):
-        return ift(program=program, inp=inp, max_step=self.max_step)
+        res, code, steps = _run(program, inp, self.max_step)
+        counters.add("interp.steps", steps)
+        return res, code
@@ -30,6 +30,13 @@ void free_final_mem(long *ptr) {
    - final_mem_len_out: pointer to size_t that will be set to code_length.
  Returns a dynamically allocated array of output longs (shrunk to the real output size).
 */
+// Iterations executed by the last subleq_interpreter call of this thread (diagnostics).
+static _Thread_local size_t last_iterations = 0;
+
+size_t subleq_last_iterations(void) {
+    return last_iterations;
+}
+
 long* subleq_interpreter(const long *code, size_t code_length,
                             const long *input, size_t input_length,
                             size_t max_output_length, size_t max_iter,
@@ -141,5 +148,6 @@ long* subleq_interpreter(const long *code, size_t code_length,
         }
     }
     *output_count = out_size;
+    last_iterations = iterations;
     return output;
 }
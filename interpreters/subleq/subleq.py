@@ -1,9 +1,55 @@
 
 import ctypes
+import functools
 import os
 from typing import List, Tuple, Optional
 
 from config import SubleqConfig
+from loggers import counters
+
+
+@functools.lru_cache(maxsize=None)
+def _load_library(library_path: str) -> ctypes.CDLL:
+    """
+    Load the SUBLEQ library and declare its signatures, once per process and
+    path: every interpreter built afterwards reuses it.
+    """
+    lib = ctypes.CDLL(library_path)
+    
+    # Define the function signature
+    # long* subleq_interpreter(const long *code, size_t code_length,
+    #                          const long *input, size_t input_length,
+    #                          size_t max_output_length, size_t max_iter,
+    #                          size_t *output_count, int *interp_status,
+    #                          long **final_mem_out, size_t *final_mem_len_out)
+    lib.subleq_interpreter.argtypes = [
+        ctypes.POINTER(ctypes.c_long),     # code
+        ctypes.c_size_t,                   # code_length
+        ctypes.POINTER(ctypes.c_long),     # input
+        ctypes.c_size_t,                   # input_length
+        ctypes.c_size_t,                   # max_output_length
+        ctypes.c_size_t,                   # max_iter
+        ctypes.POINTER(ctypes.c_size_t),   # output_count
+        ctypes.POINTER(ctypes.c_int),      # interp_status
+        ctypes.POINTER(ctypes.POINTER(ctypes.c_long)),  # final_mem_out
+        ctypes.POINTER(ctypes.c_size_t)    # final_mem_len_out
+    ]
+    lib.subleq_interpreter.restype = ctypes.POINTER(ctypes.c_long)
+    
+    # Define free helpers
+    lib.free_output.argtypes = [ctypes.POINTER(ctypes.c_long)]
+    lib.free_output.restype = None
+
+    lib.free_final_mem.argtypes = [ctypes.POINTER(ctypes.c_long)]
+    lib.free_final_mem.restype = None
+
+    # Iteration count of the last run (absent from libraries built before it was added)
+    last_iterations = getattr(lib, "subleq_last_iterations", None)
+    if last_iterations is not None:
+        last_iterations.argtypes = []
+        last_iterations.restype = ctypes.c_size_t
+    return lib
+
 
 class SubleqInterpreter:
     """Python wrapper for the SUBLEQ interpreter C library."""
@@ -31,34 +77,8 @@ class SubleqInterpreter:
         self.max_output_length = max_output_length
         self.max_iter = max_iter
 
-        self.lib = ctypes.CDLL(library_path)
-        
-        # Define the function signature
-        # long* subleq_interpreter(const long *code, size_t code_length,
-        #                          const long *input, size_t input_length,
-        #                          size_t max_output_length, size_t max_iter,
-        #                          size_t *output_count, int *interp_status,
-        #                          long **final_mem_out, size_t *final_mem_len_out)
-        self.lib.subleq_interpreter.argtypes = [
-            ctypes.POINTER(ctypes.c_long),     # code
-            ctypes.c_size_t,                   # code_length
-            ctypes.POINTER(ctypes.c_long),     # input
-            ctypes.c_size_t,                   # input_length
-            ctypes.c_size_t,                   # max_output_length
-            ctypes.c_size_t,                   # max_iter
-            ctypes.POINTER(ctypes.c_size_t),   # output_count
-            ctypes.POINTER(ctypes.c_int),      # interp_status
-            ctypes.POINTER(ctypes.POINTER(ctypes.c_long)),  # final_mem_out
-            ctypes.POINTER(ctypes.c_size_t)    # final_mem_len_out
-        ]
-        self.lib.subleq_interpreter.restype = ctypes.POINTER(ctypes.c_long)
-        
-        # Define free helpers
-        self.lib.free_output.argtypes = [ctypes.POINTER(ctypes.c_long)]
-        self.lib.free_output.restype = None
-
-        self.lib.free_final_mem.argtypes = [ctypes.POINTER(ctypes.c_long)]
-        self.lib.free_final_mem.restype = None
+        self.lib = _load_library(os.path.abspath(library_path))
+        self._last_iterations = getattr(self.lib, "subleq_last_iterations", None)
     
     def run(
             self, 
@@ -133,10 +153,25 @@ class SubleqInterpreter:
             self.lib.free_output(output_ptr)
         if bool(final_mem_ptr):
             self.lib.free_final_mem(final_mem_ptr)
+
+        if counters.ENABLED:
+            self._count(output_count.value, interp_status.value, max_output_length, max_iter)
         
         # return output_list, final_mem_list, interp_status.value
         return output_list, final_mem_list
 
+    def _count(self, n_output: int, status: int, max_output_length: int, max_iter: int) -> None:
+        """Record the last run in loggers.counters (steps and which limit stopped it)."""
+        if status != 0:
+            counters.add("interp.errors")
+        if n_output >= max_output_length:
+            counters.add("interp.max_output_hits")
+        if self._last_iterations is not None:
+            iterations = self._last_iterations()
+            counters.add("interp.steps", iterations)
+            if status != 0 and iterations >= max_iter:
+                counters.add("interp.max_iter_hits")
+
 
 # def subleq(code: List[int], 
 #            input_data: List[int],
@@ -1,5 +1,9 @@
+import sys
+from collections import OrderedDict
 from typing import List, Tuple
 
+from loggers import counters
+
 try:
     from treemo_rs import treemo as _treemo_rs
 except ImportError as e:
@@ -9,15 +13,159 @@ except ImportError as e:
         "  cd interpreters/treemo/treemo_rs && VIRTUAL_ENV=../../.venv maturin develop --release"
     ) from e
 
+# Canonical rule sets (absent from extensions built before it was added)
+try:
+    from treemo_rs import compile_program as _compile_rs
+except ImportError:
+    _compile_rs = None
+
 
 def treemo(code: List[int], inp: List[int], max_step: int = 5) -> List[int]:
     return list(_treemo_rs(code, inp, max_step))
 
 
+# --- Python port of the crate's canonical rule lists (see treemo_rs/src/rules.rs) ---
+
+def _parent_list(code: List[int]) -> List[int]:
+    parent = [-1]  # root sentinel
+    current = 0
+    for bit in code:
+        if bit == 1:
+            parent.append(current)
+            current = len(parent) - 1
+        else:
+            current = parent[current]
+            parent.append(current)
+    return parent
+
+
+def _greedy_pairs(parent: List[int]) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    # Same node range as the crate: every node below the largest parent index
+    nodes = [x for x in parent if x >= 0]
+    if not nodes:
+        return []
+    pairs = []
+    offset = 0
+    for node in range(max(nodes)):
+        inds = [i for i, x in enumerate(parent) if x == node]
+        if len(inds) == 4:
+            pairs.append(((offset + inds[0] - 1, offset + inds[1]), (offset + inds[2] - 1, offset + inds[3])))
+            del parent[inds[0]:inds[3] + 1]
+            offset += inds[3] + 1 - inds[0]
+    return pairs
+
+
+def canonical_rules(code: List[int]) -> List[Tuple[bytes, bytes]]:
+    """(pattern, replacement) rules of code, minus those an earlier rule always preempts."""
+    kept: List[Tuple[bytes, bytes]] = []
+    for (m0, m1), (r0, r1) in _greedy_pairs(_parent_list(code)):
+        pattern = bytes(code[m0:m1])
+        if not any(k in pattern for k, _ in kept):
+            kept.append((pattern, bytes(code[r0:r1])))
+    return kept
+
+
+def rules_key(rules: List[Tuple[bytes, bytes]]) -> bytes:
+    """The crate's key: per rule, u32 LE length + pattern, u32 LE length + replacement."""
+    return b"".join(len(part).to_bytes(4, "little") + part for rule in rules for part in rule)
+
+
+class _PyProgram:
+    """Stand-in for compile_program's result when the extension lacks it (same key, runs the code)."""
+
+    def __init__(self, code: List[int]):
+        self.code = list(code)
+        self.key = rules_key(canonical_rules(self.code))
+
+    def run(self, inp: List[int], max_step: int) -> List[int]:
+        return _treemo_rs(self.code, inp, max_step)
+
+
+def _lru_get(cache: OrderedDict, key, name: str):
+    value = cache.get(key)
+    if value is None:
+        counters.add(f"{name}.misses")
+    else:
+        counters.add(f"{name}.hits")
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache: OrderedDict, key, value, maxsize: int) -> None:
+    cache[key] = value
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
 class TreemoInterpreter:
-    def __init__(self, max_step: int = 50):
+    """
+    Only the rules greedy_pairs extracts from a tree matter, so programs are
+    compiled to their canonical rule list (see compile_program in the Rust
+    crate) and memoized under its key: syntactically different trees with
+    the same rules share one compiled program and one result per input.
+    With an extension built before compile_program, the rule list is
+    computed by the Python port below instead.
+
+    Args:
+        max_step: Rewrite steps per run.
+        cache_size: Entries of each memo (code -> program, key -> program,
+            (key, input) -> output); 0 compiles and runs every call.
+    """
+
+    def __init__(self, max_step: int = 50, cache_size: int = 100_000):
         self.max_step = max_step
+        self.cache_size = cache_size
+        self._compiled: OrderedDict = OrderedDict()  # code -> program
+        self._programs: OrderedDict = OrderedDict()  # rule key -> program
+        self._results: OrderedDict = OrderedDict()   # (rule key, input) -> output
+
+    def compile(self, code: List[int]):
+        """Compiled program of code; .key identifies its rule set."""
+        code_key = tuple(code)
+        program = _lru_get(self._compiled, code_key, "treemo_compile")
+        if program is None:
+            program = _compile_rs(code) if _compile_rs is not None else _PyProgram(code)
+            # Keep one program object per rule set
+            shared = self._programs.get(program.key)
+            if shared is None:
+                _lru_put(self._programs, program.key, program, self.cache_size)
+            else:
+                program = shared
+            _lru_put(self._compiled, code_key, program, self.cache_size)
+        return program
+
+    def program_key(self, code: List[int]) -> bytes:
+        """Rule set key: programs with equal keys give the same output on every input."""
+        return self.compile(code).key
 
     def run(self, code: List[int], inp: List[int]) -> Tuple[List[int], List[int]]:
-        result = treemo(code, inp, max_step=self.max_step)
-        return result, code
+        if self.cache_size <= 0:
+            return treemo(code, inp, max_step=self.max_step), code
+        program = self.compile(code)
+        key = (program.key, tuple(inp))
+        result = _lru_get(self._results, key, "treemo_results")
+        if result is None:
+            result = tuple(program.run(inp, self.max_step))
+            _lru_put(self._results, key, result, self.cache_size)
+        return list(result), code
+
+
+if __name__ == "__main__":
+    # Check the extension's compile_program against the Python port:
+    #   python -m interpreters.treemo.treemo
+    import random
+
+    from creation.treemo import gen_tree
+
+    if _compile_rs is None:
+        sys.exit("treemo_rs was built without compile_program")
+    random.seed(0)
+    n_checked, mismatches = 2000, []
+    for _ in range(n_checked):
+        code = gen_tree(random.randint(1, 80))
+        if _compile_rs(code).key != _PyProgram(code).key:
+            mismatches.append(code)
+    print(f"{n_checked - len(mismatches)}/{n_checked} rule set keys match")
+    if mismatches:
+        print(f"first mismatch: {mismatches[0]}")
+        sys.exit(1)
@@ -0,0 +1,122 @@
+// Rule extraction, canonical rule lists and the rewriting loop. No Python
+// types here, so this module also builds without pyo3.
+use memchr::memmem;
+
+pub fn build_parent_list(code: &[u8]) -> Vec<i32> {
+    let mut parent = Vec::with_capacity(code.len() + 1);
+    parent.push(-1i32); // root sentinel
+    let mut current: i32 = 0;
+    for &bit in code {
+        if bit == 1 {
+            parent.push(current);
+            current = (parent.len() - 1) as i32;
+        } else {
+            current = parent[current as usize];
+            parent.push(current);
+        }
+    }
+    parent
+}
+
+// Replicates greedy_pairs: finds nodes with exactly 4 children, extracts
+// (lhs, rhs) code span pairs, consuming matched entries from the parent list.
+pub fn greedy_pairs(mut parent: Vec<i32>) -> Vec<([usize; 2], [usize; 2])> {
+    let mut rules = Vec::new();
+    let max_node = match parent.iter().filter(|&&x| x >= 0).max() {
+        Some(&m) => m as usize,
+        None => return rules,
+    };
+    let mut offset = 0usize;
+
+    for node in 0..max_node {
+        let inds: Vec<usize> = parent
+            .iter()
+            .enumerate()
+            .filter(|(_, &x)| x == node as i32)
+            .map(|(i, _)| i)
+            .collect();
+
+        if inds.len() == 4 {
+            let lhs = [offset + inds[0] - 1, offset + inds[1]];
+            let rhs = [offset + inds[2] - 1, offset + inds[3]];
+            rules.push((lhs, rhs));
+
+            let remove_start = inds[0];
+            let remove_end = inds[3] + 1;
+            parent.drain(remove_start..remove_end);
+            offset += remove_end - remove_start;
+        }
+    }
+    rules
+}
+
+pub struct Rule {
+    pub pattern: Vec<u8>,
+    pub replacement: Vec<u8>,
+    pub is_identity: bool,
+}
+
+pub fn extract_rules(code: &[u8]) -> Vec<Rule> {
+    let parent = build_parent_list(code);
+    greedy_pairs(parent)
+        .into_iter()
+        .map(|(m, r)| {
+            let pattern = code[m[0]..m[1]].to_vec();
+            let replacement = code[r[0]..r[1]].to_vec();
+            let is_identity = pattern == replacement;
+            Rule { pattern, replacement, is_identity }
+        })
+        .collect()
+}
+
+// Drops the rules that can never fire: rules are tried in order, so a rule
+// whose pattern contains the pattern of an earlier rule is always preempted
+// by it (in particular, nothing after an empty pattern is ever reached).
+// What is left only depends on the program's behaviour, not its tree shape.
+pub fn canonical_rules(rules: Vec<Rule>) -> Vec<Rule> {
+    let mut kept: Vec<Rule> = Vec::with_capacity(rules.len());
+    for rule in rules {
+        if !kept.iter().any(|k| memmem::find(&rule.pattern, &k.pattern).is_some()) {
+            kept.push(rule);
+        }
+    }
+    kept
+}
+
+// Injective byte encoding of a rule list: per rule, u32 LE pattern length,
+// pattern, u32 LE replacement length, replacement.
+pub fn rules_key(rules: &[Rule]) -> Vec<u8> {
+    let mut key = Vec::new();
+    for rule in rules {
+        for part in [&rule.pattern, &rule.replacement] {
+            key.extend_from_slice(&(part.len() as u32).to_le_bytes());
+            key.extend_from_slice(part);
+        }
+    }
+    key
+}
+
+pub fn interpret_rules(rules: &[Rule], input: &[u8], max_step: usize) -> Vec<u8> {
+    // Build Finders once per interpret call; they borrow `rules` which outlives the loop.
+    let finders: Vec<memmem::Finder<'_>> =
+        rules.iter().map(|r| memmem::Finder::new(&r.pattern)).collect();
+
+    let mut tape = input.to_vec();
+
+    'steps: for _ in 0..max_step {
+        for (rule, finder) in rules.iter().zip(&finders) {
+            if let Some(idx) = finder.find(&tape) {
+                if rule.is_identity {
+                    break 'steps;
+                }
+                tape.splice(
+                    idx..idx + rule.pattern.len(),
+                    rule.replacement.iter().copied(),
+                );
+                continue 'steps;
+            }
+        }
+        break;
+    }
+    tape
+}
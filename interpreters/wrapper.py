@@ -1,15 +1,29 @@
 # interpreters/wrappers.py
 
+from typing import Callable, Dict
+
 from config import ExperimentConfig, SubleqConfig, IconfractranConfig, TreemoConfig
-from interpreters.subleq.subleq import SubleqInterpreter
-from interpreters.iconfractran.iconfractran import IconfractranInterpreter
-from interpreters.treemo.treemo import TreemoInterpreter
+from interpreters.counting import CountingInterpreter
+
+# Interpreters are registered by name and only imported when first built, so
+# a process (e.g. a pool worker) never loads an interpreter it does not use,
+# nor fails on one that is not built (e.g. the treemo Rust extension).
+INTERPRETERS: Dict[str, Callable[[ExperimentConfig], object]] = {}
+
+
+def register_interpreter(name: str):
+    """Register builder(cfg: ExperimentConfig) -> interpreter under name."""
+    def register(builder):
+        INTERPRETERS[name] = builder
+        return builder
+    return register
 
 
-def make_subleq_interpreter(cfg: SubleqConfig) -> SubleqInterpreter:
+def make_subleq_interpreter(cfg: SubleqConfig):
     """
     Build a SubleqInterpreter from its specific config.
     """
+    from interpreters.subleq.subleq import SubleqInterpreter
     return SubleqInterpreter(
         library_path=cfg.library_path,
         max_output_length=cfg.max_output_length,
@@ -20,24 +34,33 @@ def make_iconfractran_interpreter(cfg: IconfractranConfig):
     """
     Build a IconfractranInterpreter from its specific config.
     """
+    from interpreters.iconfractran.iconfractran import IconfractranInterpreter
     return IconfractranInterpreter(max_step=cfg.max_step)
 
-def make_treemo_interpreter(cfg: TreemoConfig) -> TreemoInterpreter:
+def make_treemo_interpreter(cfg: TreemoConfig):
     """
     Build a TreemoInterpreter from its specific config.
     """
-    return TreemoInterpreter(max_step=cfg.max_step)
+    from interpreters.treemo.treemo import TreemoInterpreter
+    return TreemoInterpreter(max_step=cfg.max_step, cache_size=cfg.cache_size)
+
+
+register_interpreter("subleq")(lambda cfg: make_subleq_interpreter(cfg.subleq))
+register_interpreter("iconfractran")(lambda cfg: make_iconfractran_interpreter(cfg.iconfractran))
+register_interpreter("treemo")(lambda cfg: make_treemo_interpreter(cfg.treemo))
+
 
 def make_interpreter(cfg: ExperimentConfig):
     """
     Top-level interpreter factory.
     Decides which interpreter to build based on cfg.interpreter.
+    With cfg.logging.counters, runs are counted (see CountingInterpreter).
     """
-    if cfg.interpreter == "subleq":
-        return make_subleq_interpreter(cfg.subleq)
-    if cfg.interpreter == "iconfractran":
-        return make_iconfractran_interpreter(cfg.iconfractran)
-    if cfg.interpreter == "treemo":
-        return make_treemo_interpreter(cfg.treemo)
+    builder = INTERPRETERS.get(cfg.interpreter)
+    if builder is None:
+        raise ValueError(f"Unknown interpreter: {cfg.interpreter}")
+    interp = builder(cfg)
 
-    raise ValueError(f"Unknown interpreter: {cfg.interpreter}")
+    if cfg.logging.counters:
+        interp = CountingInterpreter(interp)
+    return interp
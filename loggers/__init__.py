@@ -1,3 +1,14 @@
-from .experiment_logger import ExperimentLogger
+from .archive import PopulationArchive, convert_run
+from .checkpoint import CHECKPOINT_NAME, load_checkpoint, load_config, save_checkpoint
+from .experiment_logger import ExperimentLogger, load_snapshot
 
-__all__ = ["ExperimentLogger"]
+__all__ = [
+    "CHECKPOINT_NAME",
+    "ExperimentLogger",
+    "PopulationArchive",
+    "convert_run",
+    "load_checkpoint",
+    "load_config",
+    "load_snapshot",
+    "save_checkpoint",
+]
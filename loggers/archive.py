@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from creation.population import Population
+
+_HEADER = "header.json"
+# Per-program metadata columns: name -> dtype (-1 = unknown)
+METADATA_COLUMNS: Dict[str, str] = {
+    "birth": "int32",     # generation the program was born in
+    "parent_a": "int64",  # archive-wide index of each parent program
+    "parent_b": "int64",
+}
+
+
+def _grow(buf: np.ndarray, n: int, values) -> np.ndarray:
+    """buf with values written after its first n entries, reallocated (doubling) when full."""
+    values = np.asarray(values, dtype=buf.dtype)
+    end = n + len(values)
+    if end > len(buf):
+        new = np.empty(max(end, 2 * len(buf)), dtype=buf.dtype)
+        new[:n] = buf[:n]
+        buf = new
+    buf[n:end] = values
+    return buf
+
+
+class PopulationArchive:
+    """
+    Appendable columnar archive of populations, one entry per generation.
+
+    The archive is a directory of raw little-endian arrays:
+      genes.bin         flat genes of every stored program (int32, widened
+                        to int64 the first time a gene does not fit)
+      lengths.i64       length of each program
+      fingerprints.u64  64-bit content hash of each program
+      <column>.bin      optional per-program metadata (see METADATA_COLUMNS)
+      generations.i64   number of programs stored so far after each generation
+      labels.i64        a label per generation (e.g. the logger step)
+      header.json       dtypes and metadata columns
+
+    `append` writes the program data first and the generation entry last,
+    so a crash mid-append leaves the archive at its last complete generation.
+    The index (program lengths and offsets, generation ends) is held in
+    memory and extended by each append. Genes, fingerprints and metadata are
+    read through np.memmap: a generation or a single program is sliced out
+    without touching the rest of the file.
+    """
+
+    def __init__(self, path, mode: str = "r", columns: Sequence[str] = (), genes_dtype="int32", durable: bool = False):
+        """
+        Args:
+            path: Archive directory.
+            mode: "r" (read), "a" (append, creating the archive if needed) or
+                "w" (create, replacing any previous archive).
+            columns: Metadata columns to store (new archives only).
+            genes_dtype: Initial gene dtype (new archives only).
+            durable: fsync every file on each append, so that appended
+                generations also survive an OS crash (a process crash never
+                leaves a partial generation either way).
+        """
+        self.path = Path(path)
+        header_path = self.path / _HEADER
+        if mode == "w" or (mode == "a" and not header_path.exists()):
+            unknown = set(columns) - set(METADATA_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown metadata columns: {sorted(unknown)}")
+            self.path.mkdir(parents=True, exist_ok=True)
+            for f in self.path.iterdir():
+                if f.suffix in (".bin", ".i64", ".u64"):
+                    f.unlink()
+            header = {"version": 1, "genes_dtype": np.dtype(genes_dtype).name, "columns": list(columns)}
+            with open(header_path, "w") as f:
+                json.dump(header, f, indent=2)
+            for name in self._files(header):
+                open(self.path / name, "ab").close()
+        elif mode not in ("r", "a"):
+            raise ValueError(f"Unknown archive mode: {mode!r}")
+        with open(header_path) as f:
+            self.header = json.load(f)
+        self.mode = mode
+        self.durable = durable
+        self.columns: List[str] = self.header["columns"]
+        self._genes_dtype = np.dtype(self.header["genes_dtype"])
+        self._load_index()
+
+    @staticmethod
+    def _files(header: dict) -> List[str]:
+        return ["genes.bin", "lengths.i64", "fingerprints.u64", "generations.i64", "labels.i64"] + [
+            f"{c}.bin" for c in header["columns"]
+        ]
+
+    def _map(self, name: str, dtype, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self.path / name, dtype=dtype, mode="r", shape=(count,))
+
+    def _load_index(self) -> None:
+        """(Re)read the index, bounded by the last complete generation, and map the files."""
+        gen_path = self.path / "generations.i64"
+        n_gen = os.path.getsize(gen_path) // 8
+        # The index (generation ends, labels, program lengths and offsets) is
+        # small next to the genes: keep it in memory, in buffers that append grows
+        self._gen_buf = np.array(self._map("generations.i64", np.int64, n_gen))
+        self._label_buf = np.array(self._map("labels.i64", np.int64, n_gen))
+        n_prog = int(self._gen_buf[-1]) if n_gen else 0
+        self._length_buf = np.array(self._map("lengths.i64", np.int64, n_prog))
+        self._offset_buf = np.concatenate([[0], np.cumsum(self._length_buf, dtype=np.int64)])
+        self._set_views(n_gen, n_prog)
+
+    def _set_views(self, n_gen: int, n_prog: int) -> None:
+        self._gen_ends = self._gen_buf[:n_gen]
+        self.labels = self._label_buf[:n_gen]
+        self._lengths = self._length_buf[:n_prog]
+        self._offsets = self._offset_buf[:n_prog + 1]
+        self._genes = self._map("genes.bin", self._genes_dtype, int(self._offsets[-1]))
+        self._fingerprints = self._map("fingerprints.u64", np.uint64, n_prog)
+        self._metadata = {
+            c: self._map(f"{c}.bin", np.dtype(METADATA_COLUMNS[c]), n_prog) for c in self.columns
+        }
+
+    # --- Writing ---
+
+    def append(self, pop, label: Optional[int] = None, **metadata: np.ndarray) -> int:
+        """
+        Append one generation. Returns its generation number.
+
+        Args:
+            pop: Population (or list of programs).
+            label: Label of the generation (default: its generation number).
+            **metadata: One array per metadata column of the archive, with one
+                entry per program (columns left out are filled with -1).
+        """
+        if self.mode == "r":
+            raise ValueError("Archive opened read-only")
+        pop = pop if isinstance(pop, Population) else Population.from_programs(pop)
+        n = len(pop)
+        unknown = set(metadata) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Archive has no metadata columns {sorted(unknown)}")
+
+        genes = pop.genes
+        if genes.size and genes.dtype != self._genes_dtype:
+            lo, hi = genes.min(), genes.max()
+            wide = np.iinfo(np.int64)
+            if lo < wide.min or hi > wide.max:
+                raise ValueError(f"PopulationArchive stores genes up to int64, got genes in [{lo}, {hi}]")
+            info = np.iinfo(self._genes_dtype)
+            if lo < info.min or hi > info.max:
+                self._widen_genes()
+        # Truncate any partial append left by a crash, then write data before the index
+        n_gen, n_prog, n_genes = len(self), len(self._lengths), int(self._offsets[-1])
+        self._write("genes.bin", genes.astype(self._genes_dtype), n_genes)
+        self._write("lengths.i64", pop.lengths.astype(np.int64), n_prog)
+        self._write("fingerprints.u64", pop.fingerprints, n_prog)
+        for c in self.columns:
+            values = metadata.get(c)
+            values = np.full(n, -1) if values is None else np.asarray(values)
+            if len(values) != n:
+                raise ValueError(f"Metadata column {c!r} has {len(values)} entries for {n} programs")
+            self._write(f"{c}.bin", values.astype(METADATA_COLUMNS[c]), n_prog)
+        self._write("labels.i64", np.array([n_gen if label is None else label], dtype=np.int64), n_gen)
+        self._write("generations.i64", np.array([n_prog + n], dtype=np.int64), n_gen)
+
+        self._gen_buf = _grow(self._gen_buf, n_gen, [n_prog + n])
+        self._label_buf = _grow(self._label_buf, n_gen, [n_gen if label is None else label])
+        self._length_buf = _grow(self._length_buf, n_prog, pop.lengths)
+        self._offset_buf = _grow(self._offset_buf, n_prog + 1, n_genes + np.cumsum(pop.lengths, dtype=np.int64))
+        self._set_views(n_gen + 1, n_prog + n)
+        return n_gen
+
+    def truncate(self, n_generations: int) -> None:
+        """Drop every generation from n_generations on."""
+        if self.mode == "r":
+            raise ValueError("Archive opened read-only")
+        with open(self.path / "generations.i64", "r+b") as f:
+            f.truncate(min(n_generations, len(self)) * 8)
+        self._load_index()
+
+    def _widen_genes(self) -> None:
+        """Rewrite genes.bin as int64 (when a new gene does not fit the current dtype)."""
+        tmp_path = self.path / "genes.bin.tmp"
+        np.asarray(self._genes, dtype=np.int64).tofile(tmp_path)
+        self._genes = None
+        os.replace(tmp_path, self.path / "genes.bin")
+        self.header["genes_dtype"] = "int64"
+        with open(self.path / _HEADER, "w") as f:
+            json.dump(self.header, f, indent=2)
+        self._genes_dtype = np.dtype(np.int64)
+        self._load_index()
+
+    def _write(self, name: str, values: np.ndarray, at: int) -> None:
+        with open(self.path / name, "r+b") as f:
+            f.truncate(at * values.dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            values.tofile(f)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+
+    # --- Reading ---
+
+    def __len__(self) -> int:
+        """Number of generations stored."""
+        return len(self._gen_ends)
+
+    @property
+    def n_programs(self) -> int:
+        return len(self._lengths)
+
+    def _span(self, gen: int) -> tuple:
+        if gen < 0:
+            gen += len(self)
+        if not 0 <= gen < len(self):
+            raise IndexError(f"Generation {gen} out of range ({len(self)} stored)")
+        start = int(self._gen_ends[gen - 1]) if gen else 0
+        return start, int(self._gen_ends[gen])
+
+    def generation(self, gen: int) -> Population:
+        """Population of generation gen (genes read lazily from the memmap)."""
+        start, stop = self._span(gen)
+        offsets = self._offsets[start:stop + 1]
+        pop = Population(self._genes[offsets[0]:offsets[-1]], offsets - offsets[0])
+        pop._fingerprints = np.asarray(self._fingerprints[start:stop])
+        return pop
+
+    def program(self, gen: int, index: int) -> List[int]:
+        """Program index of generation gen."""
+        start, stop = self._span(gen)
+        if index < 0:
+            index += stop - start
+        if not 0 <= index < stop - start:
+            raise IndexError(f"Program {index} out of range for generation {gen}")
+        k = start + index
+        return self._genes[self._offsets[k]:self._offsets[k + 1]].tolist()
+
+    def fingerprints(self, gen: int) -> np.ndarray:
+        start, stop = self._span(gen)
+        return np.asarray(self._fingerprints[start:stop])
+
+    def metadata(self, column: str, gen: int) -> np.ndarray:
+        start, stop = self._span(gen)
+        return np.asarray(self._metadata[column][start:stop])
+
+
+# --- Conversion from JSON-lines runs ---
+
+_SNAPSHOT_RE = re.compile(r"^(work_pop|ref_pop)_(\d+)(\.delta)?\.json$")
+
+
+def convert_run(run_dir, out_path=None, kind: str = "work_pop") -> Optional[PopulationArchive]:
+    """
+    Convert the population snapshots of an ExperimentLogger run directory
+    (full or delta JSON lines) into an archive, one generation per snapshot,
+    labelled with its step. Returns None when the run has no snapshots of that kind.
+    """
+    from loggers.experiment_logger import load_snapshot
+
+    run_dir = Path(run_dir)
+    pops_dir = run_dir / "populations"
+    steps = sorted({
+        int(m.group(2))
+        for f in (pops_dir.iterdir() if pops_dir.is_dir() else [])
+        if (m := _SNAPSHOT_RE.match(f.name)) and m.group(1) == kind
+    })
+    if not steps:
+        return None
+    archive = PopulationArchive(out_path or run_dir / f"{kind}_archive", mode="w")
+    for step in steps:
+        archive.append(load_snapshot(pops_dir, step, kind), label=step)
+    return archive
+
+
+def convert_outputs(root="outputs", kind: str = "work_pop") -> List[Path]:
+    """Convert every run under root (any directory with a populations/ folder); returns the archives."""
+    converted = []
+    for pops_dir in sorted(Path(root).rglob("populations")):
+        archive = convert_run(pops_dir.parent, kind=kind)
+        if archive is not None:
+            converted.append(archive.path)
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert JSON population snapshots to binary archives")
+    parser.add_argument("runs", nargs="*", help="run directories (default: every run under --root)")
+    parser.add_argument("--root", default="outputs")
+    parser.add_argument("--kind", default="work_pop", choices=["work_pop", "ref_pop"])
+    args = parser.parse_args()
+    if args.runs:
+        paths = [a.path for a in (convert_run(r, kind=args.kind) for r in args.runs) if a]
+    else:
+        paths = convert_outputs(args.root, kind=args.kind)
+    for p in paths:
+        print(p)
@@ -0,0 +1,71 @@
+import json
+import os
+import pickle
+import random
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+CHECKPOINT_NAME = "checkpoint.npz"
+
+
+def save_checkpoint(path, arrays: Dict[str, np.ndarray], state: Dict[str, Any], cfg) -> None:
+    """
+    Atomically write a checkpoint.
+
+    The arrays are stored as-is (keep payoffs in a compact dtype such as int8),
+    next to a JSON state dict and the pickled config. The file is written
+    under a temporary name and renamed over the previous checkpoint, so a
+    crash mid-write leaves the last good checkpoint in place.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            **arrays,
+            _state=np.frombuffer(json.dumps(state).encode(), dtype=np.uint8),
+            _config=np.frombuffer(pickle.dumps(cfg), dtype=np.uint8),
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path) -> Tuple[Dict[str, np.ndarray], Dict[str, Any], Any]:
+    """Return (arrays, state, cfg) as given to save_checkpoint."""
+    # Object arrays (e.g. arbitrary-size genes) are pickled; so is the config
+    with np.load(path, allow_pickle=True) as data:
+        arrays = {k: data[k] for k in data.files if k not in ("_state", "_config")}
+        state = json.loads(data["_state"].tobytes().decode())
+        cfg = pickle.loads(data["_config"].tobytes())
+    return arrays, state, cfg
+
+
+def load_config(out_dir):
+    """The config a run was checkpointed with (for --resume)."""
+    return load_checkpoint(Path(out_dir) / CHECKPOINT_NAME)[2]
+
+
+def get_rng_states(rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    """JSON-able states of the `random` module, numpy's global RNG and rng."""
+    version, internal, gauss = random.getstate()
+    name, keys, pos, has_gauss, cached = np.random.get_state()
+    states = {
+        "random": [version, list(internal), gauss],
+        "np_global": [name, keys.tolist(), pos, has_gauss, cached],
+    }
+    if rng is not None:
+        states["generator"] = rng.bit_generator.state
+    return states
+
+
+def set_rng_states(states: Dict[str, Any], rng: Optional[np.random.Generator] = None) -> None:
+    """Restore states captured by get_rng_states."""
+    version, internal, gauss = states["random"]
+    random.setstate((version, tuple(internal), gauss))
+    name, keys, pos, has_gauss, cached = states["np_global"]
+    np.random.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached))
+    if rng is not None:
+        rng.bit_generator.state = states["generator"]
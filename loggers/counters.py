@@ -0,0 +1,107 @@
+import functools
+import os
+import pickle
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+# Process-local hot-path counters (interpreter calls, steps, cache hits, LCS
+# cells, worker busy time, IPC bytes, ...). Everything is a no-op until
+# enable() is called, so hot paths only pay for an `if counters.ENABLED`
+# check. ExperimentLogger enables them from LoggingConfig.counters and merges
+# report() into every record; payoff workers enable them from the same config
+# and ship theirs back with each task result (see task()).
+
+ENABLED = False
+
+_values: Dict[str, float] = defaultdict(int)
+_worker_busy: Dict[int, float] = defaultdict(float)  # pid -> busy seconds since the last report
+_workers_seen: set = set()
+_last_report = time.perf_counter()
+
+
+def enable(on: bool = True) -> None:
+    global ENABLED
+    ENABLED = on
+
+
+def reset() -> None:
+    """Drop everything accumulated so far (start of a run)."""
+    global _last_report
+    collect()
+    _worker_busy.clear()
+    _workers_seen.clear()
+    _last_report = time.perf_counter()
+
+
+def add(name: str, value: float = 1) -> None:
+    if ENABLED:
+        _values[name] += value
+
+
+def collect() -> Dict[str, float]:
+    """Counters accumulated since the last collect(), which resets them."""
+    global _values
+    values, _values = _values, defaultdict(int)
+    return dict(values)
+
+
+def merge(values: Dict[str, float], worker: Optional[int] = None) -> None:
+    """Add counters collected in another process (worker = its pid, for busy time)."""
+    for name, value in values.items():
+        _values[name] += value
+    if worker is not None:
+        _workers_seen.add(worker)
+        _worker_busy[worker] += values.get("worker.busy_s", 0.0)
+
+
+def report() -> Dict[str, float]:
+    """
+    collect(), plus per-worker busy time over the wall time since the last
+    report: worker.busy_max_s / busy_min_s and worker.idle_frac, the fraction
+    of worker time (over every worker seen so far) spent waiting for tasks.
+    """
+    global _last_report
+    now = time.perf_counter()
+    wall, _last_report = now - _last_report, now
+    values = collect()
+    if _workers_seen:
+        busy = [_worker_busy.get(pid, 0.0) for pid in _workers_seen]
+        values["worker.busy_max_s"] = max(busy)
+        values["worker.busy_min_s"] = min(busy)
+        values["worker.idle_frac"] = max(0.0, 1 - sum(busy) / (len(busy) * wall)) if wall > 0 else 0.0
+        _worker_busy.clear()
+    for name in list(values):
+        if name.endswith(".hits") and name[:-5] + ".misses" in values:
+            prefix = name[:-5]
+            total = values[name] + values[prefix + ".misses"]
+            values[prefix + ".hit_rate"] = values[name] / total if total else 0.0
+    return {name: round(value, 6) if isinstance(value, float) else value for name, value in values.items()}
+
+
+def task(fn: Callable) -> Callable:
+    """
+    Wrap a worker function so it returns (result, stats): stats is None when
+    counters are disabled, else (pid, counters) including busy time and the
+    pickled size of its arguments and result. Unwrap with unpack() in the parent.
+    """
+    @functools.wraps(fn)
+    def run(args):
+        if not ENABLED:
+            return fn(args), None
+        t0 = time.perf_counter()
+        result = fn(args)
+        add("worker.busy_s", time.perf_counter() - t0)
+        add("worker.tasks")
+        add("ipc.bytes_in", len(pickle.dumps(args, pickle.HIGHEST_PROTOCOL)))
+        add("ipc.bytes_out", len(pickle.dumps(result, pickle.HIGHEST_PROTOCOL)))
+        return result, (os.getpid(), collect())
+    return run
+
+
+def unpack(item: Tuple) -> object:
+    """Result of a task()-wrapped call, merging the worker's counters."""
+    result, stats = item
+    if stats is not None:
+        merge(stats[1], worker=stats[0])
+    return result
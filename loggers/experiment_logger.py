@@ -1,9 +1,20 @@
 import json
+import queue
 import subprocess
+import threading
 import time
+import weakref
+from collections import Counter
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, List, Optional
+
+import numpy as np
+
+from config import LoggingConfig
+from creation.population import Population
+from loggers import counters, profiling
+from loggers.archive import PopulationArchive
 
 
 def _git_hash() -> str:
@@ -15,54 +26,295 @@ def _git_hash() -> str:
         return "unknown"
 
 
+def _logging_config(cfg) -> LoggingConfig:
+    """The LoggingConfig of a side config (found on it or its experiment), or the defaults."""
+    for holder in (cfg, getattr(cfg, "experiment", None), getattr(getattr(cfg, "evolution", None), "experiment", None)):
+        log_cfg = getattr(holder, "logging", None)
+        if isinstance(log_cfg, LoggingConfig):
+            return log_cfg
+    return LoggingConfig()
+
+
+def _as_population(pop) -> Population:
+    return pop if isinstance(pop, Population) else Population.from_programs(pop)
+
+
+class _Writer:
+    """
+    Writer side of an ExperimentLogger: metrics file, snapshots and the
+    background thread. Kept apart from the logger so that the thread and the
+    logger's finalizer don't keep the logger alive.
+    """
+
+    def __init__(self, cfg: LoggingConfig, metrics_path: Path, pops_dir: Path):
+        self.cfg = cfg
+        self.pops_dir = pops_dir
+        self.metrics = open(metrics_path, "a")
+        self.bases: dict[str, tuple] = {}  # kind -> (step, fingerprint Counter, n snapshots since full)
+        self._n_unflushed = 0
+        self._archives: dict[str, PopulationArchive] = {}
+        self._error: Optional[BaseException] = None
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, item) -> None:
+        if not self.cfg.async_write:
+            self._write(item)
+            self._flush()
+            return
+        if self._thread is None:
+            # Started on first use, e.g. after sides/islands.py has forked its islands
+            self._queue = queue.Queue(maxsize=self.cfg.queue_size)
+            self._thread = threading.Thread(target=self._run, name="experiment-logger", daemon=True)
+            self._thread.start()
+        self._queue.put(item)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._flush()
+                    return
+                if self._error is None:
+                    self._write(item)
+                    if self._queue.empty() or self._n_unflushed >= self.cfg.flush_every:
+                        self._flush()
+            except BaseException as e:  # surfaced on the next log() / flush()
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, item) -> None:
+        step, record, pops = item
+        json.dump(record, self.metrics)
+        self.metrics.write("\n")
+        self._n_unflushed += 1
+        for kind, pop in pops.items():
+            self._write_snapshot(kind, step, pop)
+
+    def _flush(self) -> None:
+        self.metrics.flush()
+        self._n_unflushed = 0
+
+    def archive(self, kind: str) -> PopulationArchive:
+        if kind not in self._archives:
+            self._archives[kind] = PopulationArchive(self.pops_dir / f"{kind}_archive", mode="a")
+        return self._archives[kind]
+
+    def _write_snapshot(self, kind: str, step: int, pop) -> None:
+        if self.cfg.snapshot_mode == "full":
+            self._write_pop(pop, f"{kind}_{step:06d}.json")
+            return
+        if self.cfg.snapshot_mode == "archive":
+            self.archive(kind).append(pop, label=step)
+            return
+        if self.cfg.snapshot_mode != "delta":
+            raise ValueError(f"Unknown snapshot mode: {self.cfg.snapshot_mode}")
+
+        pop = _as_population(pop)
+        fps = pop.fingerprints.tolist()
+        counts = Counter(fps)
+        base = self.bases.get(kind)
+        if base is None or base[2] + 1 >= self.cfg.full_every:
+            self._write_pop(pop, f"{kind}_{step:06d}.json")
+            self.bases[kind] = (step, counts, 0)
+            return
+
+        base_step, base_counts, n_since_full = base
+        removed = list((base_counts - counts).elements())
+        extra = counts - base_counts
+        added = []
+        for k, fp in enumerate(fps):
+            if extra[fp] > 0:
+                extra[fp] -= 1
+                added.append(pop[k])
+        with open(self.pops_dir / f"{kind}_{step:06d}.delta.json", "w") as f:
+            json.dump({"base": base_step, "removed": removed}, f)
+            f.write("\n")
+            for ind in added:
+                json.dump(ind, f)
+                f.write("\n")
+        self.bases[kind] = (step, counts, n_since_full + 1)
+
+    def _write_pop(self, pop, filename: str) -> None:
+        with open(self.pops_dir / filename, "w") as f:
+            for ind in pop:
+                json.dump(ind, f)
+                f.write("\n")
+
+    def check_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("ExperimentLogger writer failed") from error
+
+    def flush(self) -> None:
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Drain the queue and close the files (errors stay for check_error)."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread, self._queue = None, None
+        self.metrics.close()
+
+
 class ExperimentLogger:
     """
-    Writes four files into out_dir:
+    Writes into out_dir:
       config.json    — full dataclass config, serialized once at init
       meta.json      — run metadata (time, git hash, script params)
       metrics.jsonl  — one JSON record per generation/iteration (append)
-      work_pop.json  — current working population, overwritten each step
-      ref_pop.json   — reference population, overwritten each step
+      populations/   — population snapshots, every snapshot_every steps:
+        work_pop_{step}.json        full snapshot, one program per line
+        work_pop_{step}.delta.json  delta from the previous snapshot: a header
+                                    line {"base": step, "removed": [fingerprints]}
+                                    then the added programs, one per line
+        (same for ref_pop)
+        work_pop_archive/           with snapshot_mode="archive", a binary
+                                    PopulationArchive instead (one generation
+                                    per snapshot, labelled with its step)
+
+    Writes happen on a background thread (see LoggingConfig), started by the
+    first log(): log() only enqueues, metrics are flushed in batches, and the
+    file handle stays open. Call close() (or use the logger as a context
+    manager) to drain the queue; it also happens when the logger is garbage
+    collected or at interpreter exit. Use load_snapshot to rebuild a
+    population from delta snapshots.
+
+    With LoggingConfig.counters, the hot-path counters accumulated since the
+    previous record (loggers.counters.report) are merged into each record.
+    While profiling (loggers.profiling), so are peak RSS and tracemalloc usage.
+
+    With resume=True an existing run directory is reopened: config.json is
+    kept, the resume time is added to meta.json, and `restore` rewinds the
+    metrics to a checkpoint.
     """
 
-    def __init__(self, out_dir: str, cfg, **meta_extra: Any):
+    def __init__(self, out_dir: str, cfg, resume: bool = False, **meta_extra: Any):
         self.out_dir = Path(out_dir)
         self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.cfg = _logging_config(cfg)
+        if self.cfg.counters:
+            counters.enable()
+            counters.reset()
 
-        with open(self.out_dir / "config.json", "w") as f:
-            json.dump(asdict(cfg), f, indent=2)
-
-        meta = {
-            "start_time": time.strftime("%Y-%m-%dT%H:%M:%S"),
-            "start_ts": time.time(),
-            "git_hash": _git_hash(),
-            **meta_extra,
-        }
+        if resume:
+            with open(self.out_dir / "meta.json") as f:
+                meta = json.load(f)
+            meta.setdefault("resume_times", []).append(time.strftime("%Y-%m-%dT%H:%M:%S"))
+        else:
+            with open(self.out_dir / "config.json", "w") as f:
+                json.dump(asdict(cfg), f, indent=2)
+            meta = {
+                "start_time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "start_ts": time.time(),
+                "git_hash": _git_hash(),
+                **meta_extra,
+            }
         with open(self.out_dir / "meta.json", "w") as f:
             json.dump(meta, f, indent=2)
 
         self._metrics_path = self.out_dir / "metrics.jsonl"
         self._pops_dir = self.out_dir / "populations"
-        self._pops_dir.mkdir()
+        self._pops_dir.mkdir(exist_ok=resume)
         self._step = 0
 
+        self._writer = _Writer(self.cfg, self._metrics_path, self._pops_dir)
+        self._finalizer = weakref.finalize(self, self._writer.close)
+
     def log(
         self,
         record: dict[str, Any],
         work_pop: Optional[list] = None,
         ref_pop: Optional[list] = None,
     ) -> None:
-        with open(self._metrics_path, "a") as f:
-            json.dump(record, f)
-            f.write("\n")
-        if work_pop is not None:
-            self._write_pop(work_pop, f"work_pop_{self._step:06d}.json")
-        if ref_pop is not None:
-            self._write_pop(ref_pop, f"ref_pop_{self._step:06d}.json")
+        if not self._finalizer.alive:
+            raise ValueError("ExperimentLogger is closed")
+        self._writer.check_error()
+        if counters.ENABLED:
+            record = {**record, **counters.report()}
+        if profiling.active():
+            record = {**record, **profiling.memory_stats(self._step)}
+        every = self.cfg.snapshot_every
+        snapshot = bool(every) and self._step % every == 0
+        pops = {}
+        if snapshot:
+            # Copy lists: callers may grow them in place after log() returns
+            if work_pop is not None:
+                pops["work_pop"] = work_pop if isinstance(work_pop, Population) else list(work_pop)
+            if ref_pop is not None:
+                pops["ref_pop"] = ref_pop if isinstance(ref_pop, Population) else list(ref_pop)
+        item = (self._step, record, pops)
         self._step += 1
+        self._writer.submit(item)
 
-    def _write_pop(self, pop: list, filename: str) -> None:
-        with open(self._pops_dir / filename, "w") as f:
-            for ind in pop:
-                json.dump(ind, f)
-                f.write("\n")
+    # --- Control ---
+
+    def flush(self) -> None:
+        """Block until every record logged so far is on disk."""
+        self._writer.flush()
+        self._writer.check_error()
+
+    def close(self) -> None:
+        """Drain the queue and close the files; later log() calls are not allowed."""
+        if not self._finalizer.alive:
+            return
+        self._finalizer()
+        self._writer.check_error()
+
+    def __enter__(self) -> "ExperimentLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def state(self) -> dict[str, int]:
+        """Position in the output files, for checkpoints."""
+        self.flush()
+        size = self._metrics_path.stat().st_size if self._metrics_path.exists() else 0
+        return {"step": self._step, "metrics_bytes": size}
+
+    def restore(self, state: dict[str, int]) -> None:
+        """Rewind to a state(): drop metrics and snapshots logged after it."""
+        self.flush()
+        self._writer.metrics.truncate(state["metrics_bytes"])
+        self._writer.metrics.seek(0, 2)
+        self._step = state["step"]
+        self._writer.bases = {}  # the next snapshot is full
+        for kind in ("work_pop", "ref_pop"):
+            # Left over from a crashed run, these would shadow the snapshots rewritten from here
+            for path in self._pops_dir.glob(f"{kind}_*.json"):
+                if int(path.name[len(kind) + 1:].split(".")[0]) >= self._step:
+                    path.unlink()
+            if (self._pops_dir / f"{kind}_archive").is_dir():
+                archive = self._writer.archive(kind)
+                archive.truncate(int((np.asarray(archive.labels) < self._step).sum()))
+
+
+def load_snapshot(pops_dir, step: int, kind: str = "work_pop") -> List[List[int]]:
+    """
+    Population of a snapshot, following delta files back to the last full one.
+    Delta snapshots keep the order of survivors (up to identical programs)
+    and append added programs.
+    """
+    pops_dir = Path(pops_dir)
+    full = pops_dir / f"{kind}_{step:06d}.json"
+    if full.exists():
+        with open(full) as f:
+            return [json.loads(line) for line in f]
+
+    with open(pops_dir / f"{kind}_{step:06d}.delta.json") as f:
+        header = json.loads(f.readline())
+        added = [json.loads(line) for line in f]
+    base = load_snapshot(pops_dir, header["base"], kind)
+    removed = Counter(header["removed"])
+    pop = []
+    for ind, fp in zip(base, _as_population(base).fingerprints.tolist()):
+        if removed[fp] > 0:
+            removed[fp] -= 1
+        else:
+            pop.append(ind)
+    return pop + added
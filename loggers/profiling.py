@@ -0,0 +1,255 @@
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from multiprocessing import util
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Profiling of a run, in the parent and in every worker process.
+#
+# main.py --profile starts a session in the parent and sets
+# LoggingConfig.profile_dir so pool workers (and islands) start their own in
+# their initializer. Parent time is split by phase (see phase()); each
+# process writes its profile into profile_dir when it exits, and the parent
+# merges them when the run ends. ExperimentLogger adds memory stats to every
+# record while a session is active.
+
+_SESSION: Optional["ProfileSession"] = None
+
+
+class _Sampler:
+    """Stack sampler of one thread: counts folded stacks ("phase;f1;f2;...") every interval seconds."""
+
+    def __init__(self, session: "ProfileSession", thread_id: int, interval: float):
+        self.session = session
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join([self.session.current_phase, *reversed(names)])] += 1
+
+
+class ProfileSession:
+    """
+    Profiles of one process, written into out_dir as {name}.prof (cProfile,
+    one per phase for the parent) or {name}.folded (sampling), plus
+    {name}.json with the process's peak RSS.
+
+    Args:
+        out_dir: Profile directory.
+        name: File prefix ("parent", "worker_<pid>", ...).
+        mode: "cprofile" | "sample".
+        memory: Trace allocations with tracemalloc (parent only; slow).
+        interval: Sampling period in seconds (mode="sample").
+    """
+
+    def __init__(self, out_dir, name: str, mode: str = "cprofile", memory: bool = False, interval: float = 0.005):
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown profile mode: {mode!r}")
+        self.out_dir = Path(out_dir)
+        self.name = name
+        self.mode = mode
+        self.memory = memory
+        self.current_phase = "other"
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._sampler: Optional[_Sampler] = None
+        if mode == "sample":
+            self._sampler = _Sampler(self, threading.get_ident(), interval)
+
+    def start(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        if self.memory:
+            tracemalloc.start()
+        if self._sampler is not None:
+            self._sampler.start()
+        else:
+            self._profile(self.current_phase).enable()
+
+    def _profile(self, phase: str) -> cProfile.Profile:
+        if phase not in self._profiles:
+            self._profiles[phase] = cProfile.Profile()
+        return self._profiles[phase]
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        previous, self.current_phase = self.current_phase, name
+        if self._sampler is None:
+            self._profile(previous).disable()
+            self._profile(name).enable()
+        try:
+            yield
+        finally:
+            if self._sampler is None:
+                self._profile(name).disable()
+                self._profile(previous).enable()
+            self.current_phase = previous
+
+    def detach(self) -> None:
+        """Stop profiling without writing anything (inherited by a forked child)."""
+        for profile in self._profiles.values():
+            profile.disable()
+        self._profiles = {}
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def stop(self) -> None:
+        """Stop profiling and write this process's files."""
+        if self._sampler is not None:
+            self._sampler.stop()
+            with open(self.out_dir / f"{self.name}.folded", "w") as f:
+                for stack, count in self._sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        else:
+            for phase, profile in self._profiles.items():
+                profile.disable()
+                profile.dump_stats(self.out_dir / f"{self.name}.{phase}.prof")
+        with open(self.out_dir / f"{self.name}.json", "w") as f:
+            json.dump({"pid": os.getpid(), "peak_rss_mb": peak_rss_mb()}, f)
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, in MB (ru_maxrss is in KB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 2)
+
+
+# --- Module-level interface ---
+
+def active() -> bool:
+    return _SESSION is not None
+
+
+def start(out_dir, mode: str = "cprofile", memory: bool = False) -> ProfileSession:
+    """Start profiling the parent process."""
+    global _SESSION
+    _SESSION = ProfileSession(out_dir, "parent", mode=mode, memory=memory)
+    _SESSION.start()
+    return _SESSION
+
+
+def start_worker(log_cfg) -> None:
+    """
+    Start profiling a worker process if LoggingConfig.profile_dir is set
+    (called from pool initializers). Its files are written when it exits.
+    """
+    global _SESSION
+    if _SESSION is not None:
+        _SESSION.detach()
+        _SESSION = None
+    if not log_cfg.profile_dir:
+        return
+    _SESSION = ProfileSession(log_cfg.profile_dir, f"worker_{os.getpid()}", mode=log_cfg.profile_mode)
+    _SESSION.start()
+    # Pool workers leave through multiprocessing's exit path, which skips atexit
+    util.Finalize(None, _SESSION.stop, exitpriority=10)
+
+
+def phase(name: str):
+    """Attribute the enclosed parent time to phase name (no-op when not profiling)."""
+    if _SESSION is None:
+        return contextlib.nullcontext()
+    return _SESSION.phase(name)
+
+
+def memory_stats(step: int) -> Dict[str, Any]:
+    """
+    Peak RSS, plus tracemalloc current/peak usage when tracing; the snapshot
+    itself is dumped to profile_dir/tracemalloc_{step}.snap.
+    """
+    stats: Dict[str, Any] = {"peak_rss_mb": peak_rss_mb()}
+    if _SESSION is not None and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        stats["traced_mb"] = round(current / 2**20, 2)
+        stats["traced_peak_mb"] = round(peak / 2**20, 2)
+        tracemalloc.take_snapshot().dump(str(_SESSION.out_dir / f"tracemalloc_{step:06d}.snap"))
+    return stats
+
+
+def stop(top: int = 40) -> Optional[Path]:
+    """
+    Stop the parent session and merge every process's files in its directory:
+      merged.prof / merged.txt          all processes and phases (cProfile)
+      phase_{name}.prof / .txt          parent time per phase
+      workers.prof                      all worker processes
+      merged.folded                     all stacks (sampling, flamegraph input)
+      summary.json                      peak RSS per process, files merged
+    Returns the profile directory.
+    """
+    global _SESSION
+    session, _SESSION = _SESSION, None
+    if session is None:
+        return None
+    session.stop()
+    out_dir = session.out_dir
+    summary: Dict[str, Any] = {"mode": session.mode, "processes": {}}
+    for meta in sorted(out_dir.glob("*.json")):
+        if meta.name != "summary.json":
+            with open(meta) as f:
+                summary["processes"][meta.stem] = json.load(f)
+
+    if session.mode == "cprofile":
+        profiles = sorted(out_dir.glob("*.prof"))
+        profiles = [p for p in profiles if not p.name.startswith(("merged", "phase_", "workers"))]
+        _merge_profiles(profiles, out_dir / "merged", top)
+        workers = [p for p in profiles if p.name.startswith("worker_")]
+        if workers:
+            _merge_profiles(workers, out_dir / "workers", top)
+        for p in profiles:
+            if p.name.startswith("parent."):
+                _merge_profiles([p], out_dir / f"phase_{p.name.split('.')[1]}", top)
+        summary["merged"] = [p.name for p in profiles]
+    else:
+        stacks: Counter = Counter()
+        folded = [p for p in sorted(out_dir.glob("*.folded")) if p.name != "merged.folded"]
+        for path in folded:
+            with open(path) as f:
+                for line in f:
+                    stack, count = line.rsplit(" ", 1)
+                    stacks[stack] += int(count)
+        with open(out_dir / "merged.folded", "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        summary["merged"] = [p.name for p in folded]
+    with open(out_dir / "summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    return out_dir
+
+
+def _merge_profiles(paths, out_stem: Path, top: int) -> None:
+    stats = pstats.Stats(str(paths[0]), stream=io.StringIO())
+    for path in paths[1:]:
+        stats.add(str(path))
+    stats.dump_stats(str(out_stem) + ".prof")
+    text = io.StringIO()
+    stats.stream = text
+    stats.sort_stats("cumulative").print_stats(top)
+    with open(str(out_stem) + ".txt", "w") as f:
+        f.write(text.getvalue())
@@ -0,0 +1,167 @@
+import argparse
+import ast
+import json
+from dataclasses import asdict, fields, is_dataclass
+from pathlib import Path
+
+from config import (
+    EvolutionConfig,
+    HomoiconicConfig,
+    IslandConfig,
+    LoggingConfig,
+    RandomBaselineConfig,
+    RandomSkimmedConfig,
+    ServerConfig,
+    SweepConfig,
+)
+
+# side name -> (config class, output field, supports --resume)
+SIDES = {
+    "evolution": (EvolutionConfig, "out_dir", True),
+    "islands": (IslandConfig, "out_dir", False),
+    "random_baseline": (RandomBaselineConfig, "out_path", False),
+    "random_skimmed": (RandomSkimmedConfig, "out_dir", True),
+    "homoiconic": (HomoiconicConfig, "out_path", False),
+    "sweep": (SweepConfig, "out_dir", False),
+    "server": (ServerConfig, "out_dir", False),
+}
+
+
+def _parse_value(raw: str, current):
+    """Parse an override string, guided by the type of the value it replaces."""
+    if raw.lower() in ("none", "null"):
+        return None
+    if isinstance(current, bool):
+        if raw.lower() in ("1", "true", "yes", "on"):
+            return True
+        if raw.lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"Not a boolean: {raw!r}")
+    if isinstance(current, str):
+        return raw
+    try:
+        value = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        return raw
+    if isinstance(current, float) and isinstance(value, int):
+        return float(value)
+    return value
+
+
+def _field(cfg, path: str):
+    """(dataclass, field name) of a dotted field path in a (nested) dataclass config."""
+    *parents, name = path.strip().split(".")
+    target = cfg
+    for part in parents:
+        target = getattr(target, part)
+    if not is_dataclass(target) or name not in {f.name for f in fields(target)}:
+        raise ValueError(f"Unknown config field: {path!r}")
+    return target, name
+
+
+def set_field(cfg, path: str, value) -> None:
+    """Set the field at a dotted path of a (nested) dataclass config in place."""
+    target, name = _field(cfg, path)
+    setattr(target, name, value)
+
+
+def apply_override(cfg, override: str) -> None:
+    """Apply one "dotted.path=value" override to a (nested) dataclass config in place."""
+    path, sep, raw = override.partition("=")
+    if not sep:
+        raise ValueError(f"Override must look like key=value: {override!r}")
+    target, name = _field(cfg, path)
+    setattr(target, name, _parse_value(raw.strip(), getattr(target, name)))
+
+
+def logging_configs(cfg):
+    """Every LoggingConfig nested in cfg."""
+    if isinstance(cfg, LoggingConfig):
+        yield cfg
+    elif is_dataclass(cfg):
+        for f in fields(cfg):
+            yield from logging_configs(getattr(cfg, f.name))
+
+
+def profile_dir(side: str, cfg) -> Path:
+    """Where a profiled run writes its profiles: next to the run's outputs."""
+    out = Path(getattr(cfg, SIDES[side][1]))
+    return out / "profile" if SIDES[side][1] == "out_dir" else out.with_name(out.name + "_profile")
+
+
+def run_side(side: str, cfg, resume: bool = False) -> None:
+    if side == "evolution":
+        from sides.evolution import main as evolution_main
+        evolution_main(cfg, resume=resume)
+    elif side == "islands":
+        from sides.islands import main as islands_main
+        islands_main(cfg)
+    elif side == "random_baseline":
+        from sides.random_baseline import main as random_baseline_main
+        random_baseline_main(cfg)
+    elif side == "random_skimmed":
+        from sides.random_skimmed import main as random_skimmed_main
+        random_skimmed_main(cfg, resume=resume)
+    elif side == "homoiconic":
+        from sides.homoiconic import main as homoiconic_main
+        homoiconic_main(cfg.pop_path, cfg.out_path, cfg.block_rounds, cfg.experiment)
+    elif side == "sweep":
+        from sides.sweep import main as sweep_main
+        sweep_main(cfg)
+    elif side == "server":
+        from sides.server import main as server_main
+        server_main(cfg)
+    else:
+        raise ValueError(f"Unknown side: {side!r}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run a side script with an overridable config")
+    parser.add_argument("side", choices=list(SIDES))
+    parser.add_argument(
+        "--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+        help="override a config field, e.g. --set n_iter=100 --set experiment.payoff.n_workers=4",
+    )
+    parser.add_argument("--resume", metavar="OUT_DIR", help="resume a checkpointed run (evolution, random_skimmed)")
+    parser.add_argument(
+        "--profile", nargs="?", const="cprofile", choices=["cprofile", "sample"],
+        help="profile the parent and every worker process (default: cprofile)",
+    )
+    parser.add_argument("--profile-memory", action="store_true", help="with --profile, trace allocations (slow)")
+    parser.add_argument("--print-config", action="store_true", help="print the resolved config and exit")
+    args = parser.parse_args(argv)
+
+    config_cls, out_field, resumable = SIDES[args.side]
+    if args.resume:
+        if not resumable:
+            parser.error(f"{args.side} does not support --resume")
+        from loggers import load_config
+        cfg = load_config(args.resume)
+    else:
+        cfg = config_cls()
+    for override in args.overrides:
+        apply_override(cfg, override)
+
+    if args.print_config:
+        print(json.dumps(asdict(cfg), indent=2))
+        return
+
+    if not args.profile:
+        run_side(args.side, cfg, resume=bool(args.resume))
+        return
+
+    from loggers import profiling
+
+    out = profile_dir(args.side, cfg)
+    for log_cfg in logging_configs(cfg):
+        log_cfg.profile_dir = str(out)
+        log_cfg.profile_mode = args.profile
+    profiling.start(out, mode=args.profile, memory=args.profile_memory)
+    try:
+        run_side(args.side, cfg, resume=bool(args.resume))
+    finally:
+        print(f"Profiles written to {profiling.stop()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import argparse
+import atexit
+import os
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import ExperimentConfig
+
+# Protocol (multiprocessing.connection messages, HMAC-authenticated with authkey):
+#   worker -> coordinator: ("hello", host, pid)
+#   coordinator -> worker: ("init", cfg, reward_fn)      worker runs _init_worker
+#   worker -> coordinator: ("get",)
+#   coordinator -> worker: ("task", task_id, fn, args) | ("stop",)
+#   worker -> coordinator: ("result", task_id, value) | ("error", task_id, traceback)
+#   worker -> coordinator: ("heartbeat",)                every heartbeat_interval, from a side thread
+# A worker holds at most one task. Its task goes back to the queue when its
+# connection drops or it misses heartbeats for heartbeat_timeout seconds;
+# a task that raised is retried up to max_retries times on other workers.
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class _Task:
+    def __init__(self, fn: Callable, args: Any):
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.attempts = 0
+
+
+class _WorkerState:
+    def __init__(self, conn, name: str):
+        self.conn = conn
+        self.name = name
+        self.task_id: Optional[int] = None
+        self.last_seen = time.monotonic()
+        self.alive = True
+
+
+class Coordinator:
+    """
+    TCP work queue with an Executor-like submit(fn, args) -> Future.
+
+    Remote workers (python -m rewards.distributed) connect, are initialised
+    with cfg and reward_fn like pool workers, and pull tasks one at a time.
+    fn must be a module-level function (it is pickled by reference), e.g. the
+    tile functions of rewards.payoff.
+    """
+
+    def __init__(self, cfg: ExperimentConfig, reward_fn: Callable):
+        pc = cfg.payoff
+        if not pc.authkey:
+            # Anyone who can connect with the key is sent pickles to run: no stock key
+            raise ValueError("backend='tcp' needs a secret experiment.payoff.authkey (passed to workers as --authkey)")
+        self.cfg = cfg
+        self.reward_fn = reward_fn
+        self.address = parse_address(pc.address)
+        self.authkey = pc.authkey.encode()
+        self.heartbeat_timeout = pc.heartbeat_timeout
+        self.max_retries = pc.max_retries
+
+        self._tasks: Dict[int, _Task] = {}
+        self._queue: deque = deque()
+        self._workers: Dict[int, _WorkerState] = {}
+        self._next_id = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self.address = self._listener.address  # actual port when 0 was asked for
+        self._threads = [
+            threading.Thread(target=self._accept, name="coordinator-accept", daemon=True),
+            threading.Thread(target=self._monitor, name="coordinator-monitor", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    @property
+    def n_workers(self) -> int:
+        with self._cond:
+            return sum(w.alive for w in self._workers.values())
+
+    # --- Executor interface ---
+
+    def submit(self, fn: Callable, args: Any) -> Future:
+        task = _Task(fn, args)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Coordinator is closed")
+            task_id, self._next_id = self._next_id, self._next_id + 1
+            self._tasks[task_id] = task
+            self._queue.append(task_id)
+            self._cond.notify_all()
+        return task.future
+
+    def shutdown(self) -> None:
+        """Stop serving: idle workers are told to stop, pending futures fail."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            for task in self._tasks.values():
+                if not task.future.done():
+                    task.future.set_exception(RuntimeError("Coordinator shut down"))
+            self._tasks.clear()
+            self._queue.clear()
+            self._cond.notify_all()
+        # Unblock accept() with a throwaway connection
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+        self._listener.close()
+
+    # --- Coordinator threads ---
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed:
+                    return
+                continue  # failed handshake (e.g. wrong authkey)
+            if self._closed:
+                conn.close()
+                return
+            threading.Thread(target=self._serve, args=(conn,), name="coordinator-conn", daemon=True).start()
+
+    def _serve(self, conn) -> None:
+        try:
+            _, host, pid = conn.recv()
+            conn.send(("init", self.cfg, self.reward_fn))
+        except (EOFError, OSError):
+            conn.close()
+            return
+        worker = _WorkerState(conn, f"{host}:{pid}")
+        with self._cond:
+            self._workers[id(worker)] = worker
+        try:
+            while True:
+                msg = conn.recv()
+                worker.last_seen = time.monotonic()
+                kind = msg[0]
+                if kind == "heartbeat":
+                    continue
+                if kind == "get":
+                    task_id, task = self._next_task(worker)
+                    if task is None:
+                        conn.send(("stop",))
+                        return
+                    conn.send(("task", task_id, task.fn, task.args))
+                elif kind == "result":
+                    self._finish(worker, msg[1], value=msg[2])
+                elif kind == "error":
+                    self._finish(worker, msg[1], error=msg[2])
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._drop(worker)
+
+    def _next_task(self, worker: _WorkerState):
+        """Block until a task is queued (or the coordinator closes); assign it to worker."""
+        with self._cond:
+            while True:
+                if self._closed or not worker.alive:
+                    return None, None
+                while self._queue:
+                    task_id = self._queue.popleft()
+                    if task_id in self._tasks:
+                        worker.task_id = task_id
+                        worker.last_seen = time.monotonic()
+                        self._tasks[task_id].attempts += 1
+                        return task_id, self._tasks[task_id]
+                self._cond.wait(timeout=1.0)
+
+    def _finish(self, worker: _WorkerState, task_id: int, value: Any = None, error: Optional[str] = None) -> None:
+        with self._cond:
+            if worker.task_id == task_id:
+                worker.task_id = None
+            task = self._tasks.get(task_id)
+            if task is None:
+                return  # already done elsewhere (a reassigned duplicate)
+            if error is None:
+                del self._tasks[task_id]
+                task.future.set_result(value)
+            elif task.attempts > self.max_retries:
+                del self._tasks[task_id]
+                task.future.set_exception(RuntimeError(f"Task failed on {worker.name} after {task.attempts} attempts:\n{error}"))
+            else:
+                self._queue.append(task_id)
+                self._cond.notify_all()
+
+    def _drop(self, worker: _WorkerState) -> None:
+        """Forget a worker and requeue its task (called by its serving thread)."""
+        with self._cond:
+            worker.alive = False
+            self._workers.pop(id(worker), None)
+            if worker.task_id is not None and worker.task_id in self._tasks:
+                self._queue.appendleft(worker.task_id)
+                self._cond.notify_all()
+            worker.task_id = None
+        worker.conn.close()
+
+    def _monitor(self) -> None:
+        """Drop busy workers that missed their heartbeats."""
+        while not self._closed:
+            time.sleep(min(1.0, self.heartbeat_timeout / 4))
+            now = time.monotonic()
+            with self._cond:
+                lost = [
+                    w for w in self._workers.values()
+                    if w.task_id is not None and now - w.last_seen > self.heartbeat_timeout
+                ]
+            for worker in lost:
+                # Wake its serving thread out of recv() with EOF; it drops the worker
+                with socket.fromfd(worker.conn.fileno(), socket.AF_INET, socket.SOCK_STREAM) as sock:
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+
+
+# One coordinator per address and process, shared by every engine / payoff call
+_COORDINATORS: Dict[str, Coordinator] = {}
+
+
+def get_coordinator(cfg: ExperimentConfig, reward_fn: Callable) -> Coordinator:
+    coordinator = _COORDINATORS.get(cfg.payoff.address)
+    if coordinator is None:
+        coordinator = Coordinator(cfg, reward_fn)
+        _COORDINATORS[cfg.payoff.address] = coordinator
+        atexit.register(coordinator.shutdown)
+    return coordinator
+
+
+# --- Worker daemon ---
+
+def run_worker(address: Tuple[str, int], authkey: bytes, heartbeat_interval: float = 5.0) -> None:
+    """Serve one coordinator until it stops or the connection drops."""
+    from rewards.payoff import _init_worker
+
+    conn = Client(address, authkey=authkey)
+    send_lock = threading.Lock()
+    done = threading.Event()
+
+    def send(msg) -> None:
+        with send_lock:
+            conn.send(msg)
+
+    def heartbeat() -> None:
+        while not done.wait(heartbeat_interval):
+            try:
+                send(("heartbeat",))
+            except OSError:
+                return
+
+    try:
+        send(("hello", socket.gethostname(), os.getpid()))
+        _, cfg, reward_fn = conn.recv()
+        _init_worker(cfg, reward_fn)
+        threading.Thread(target=heartbeat, name="worker-heartbeat", daemon=True).start()
+        while True:
+            send(("get",))
+            msg = conn.recv()
+            if msg[0] == "stop":
+                return
+            _, task_id, fn, args = msg
+            try:
+                value = fn(args)
+            except Exception:
+                send(("error", task_id, traceback.format_exc()))
+            else:
+                send(("result", task_id, value))
+    finally:
+        done.set()
+        conn.close()
+
+
+def serve(address: str, authkey: str, heartbeat_interval: float = 5.0, retry_s: float = 2.0, exit_on_stop: bool = False) -> None:
+    """
+    Worker daemon: (re)connect to the coordinator at address and serve it,
+    forever, or until the first coordinator stops or is lost with exit_on_stop.
+    """
+    while True:
+        try:
+            run_worker(parse_address(address), authkey.encode(), heartbeat_interval)
+            served = True
+        except ConnectionRefusedError:
+            served = False  # coordinator not up (yet)
+        except (EOFError, OSError):
+            served = True
+        if served and exit_on_stop:
+            return
+        time.sleep(retry_s)
+
+
+if __name__ == "__main__":
+    import multiprocessing as mp
+
+    parser = argparse.ArgumentParser(description="Payoff worker daemon for PayoffConfig.backend='tcp'")
+    parser.add_argument("--address", default="127.0.0.1:7780", help="coordinator host:port")
+    parser.add_argument("--authkey", required=True, help="the run's experiment.payoff.authkey")
+    parser.add_argument("--procs", type=int, default=os.cpu_count(), help="worker processes on this host")
+    parser.add_argument("--heartbeat", type=float, default=5.0, help="seconds between heartbeats")
+    parser.add_argument("--exit-on-stop", action="store_true", help="exit when the coordinator stops instead of reconnecting")
+    args = parser.parse_args()
+
+    serve_args = (args.address, args.authkey, args.heartbeat, 2.0, args.exit_on_stop)
+    if args.procs == 1:
+        serve(*serve_args)
+    else:
+        procs = [mp.Process(target=serve, args=serve_args) for _ in range(args.procs)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
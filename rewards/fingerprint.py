@@ -0,0 +1,158 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import ExperimentConfig
+from creation.population import Population, _mix64
+from rewards.wrapper import make_reward_probes
+
+
+def behavior_fingerprints(interp, programs, probes: List[List[int]]) -> np.ndarray:
+    """
+    uint64 fingerprint of what each program outputs on a fixed probe set.
+
+    Programs with equal fingerprints produced the same output on every probe
+    (up to 64-bit hash collisions). Interpreters with a program_key (treemo:
+    the canonical rule set) only run the probes once per key, since programs
+    with equal keys give the same output on every input.
+    """
+    program_key = getattr(interp, "program_key", None)
+    if program_key is not None:
+        groups: dict = {}
+        inverse = np.array([groups.setdefault(program_key(list(prog)), len(groups)) for prog in programs], dtype=np.int64)
+        reps = np.unique(inverse, return_index=True)[1]
+        return _probe_fingerprints(interp, [programs[int(i)] for i in reps], probes)[inverse]
+    return _probe_fingerprints(interp, programs, probes)
+
+
+def _probe_fingerprints(interp, programs, probes: List[List[int]]) -> np.ndarray:
+    fp = np.zeros(len(programs), dtype=np.uint64)
+    for probe in probes:
+        outputs = Population.from_programs(interp.run(list(prog), list(probe))[0] for prog in programs)
+        fp = _mix64(fp ^ outputs.fingerprints)
+    return fp
+
+
+def make_fingerprinter(cfg: ExperimentConfig, interp):
+    """
+    Build the fingerprint function used to share payoffs between programs.
+
+    Returns fingerprint(programs) -> uint64 array, or None when
+    cfg.payoff.dedup == "none". With "exact", programs share a fingerprint
+    only when every reward they can earn is guaranteed equal: same probe
+    outputs if the reward declares its probes (it only looks at them), same
+    code otherwise. "probe" always compares outputs on n_probes random inputs,
+    which is only an approximation for rewards that look at anything else.
+    """
+    mode = cfg.payoff.dedup
+    if mode == "none":
+        return None
+    if mode == "exact":
+        probes = make_reward_probes(cfg)
+        if probes is None:
+            return lambda programs: _as_population(programs).fingerprints
+    elif mode == "probe":
+        rng = np.random.default_rng(0)
+        probes = rng.integers(-8, 16, size=(cfg.payoff.n_probes, 8)).tolist()
+    else:
+        raise ValueError(f"Unknown dedup mode: {mode}")
+    return lambda programs: behavior_fingerprints(interp, programs, probes)
+
+
+def _as_population(programs) -> Population:
+    return programs if isinstance(programs, Population) else Population.from_programs(programs)
+
+
+def distinct(fingerprints: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group programs by fingerprint.
+
+    Returns:
+        reps: index of the first program of each group
+        inverse: group of every program (programs[i] behaves as programs[reps[inverse[i]]])
+        counts: group sizes
+    """
+    _, reps, inverse, counts = np.unique(
+        fingerprints, return_index=True, return_inverse=True, return_counts=True,
+    )
+    return reps, inverse.ravel(), counts
+
+
+class ExpansionPlan:
+    """
+    Which matchups to evaluate when m new programs join n old ones.
+
+    Only one representative per fingerprint is played: old representatives
+    against the groups that first appear among the new programs, and those
+    groups against each other. A new program that behaves like an old one
+    needs no evaluation at all. `assemble` expands the representative blocks
+    back to the full (n, m) and (m, m) blocks by multiplicity.
+
+    Assumes zero-sum self-play, like the evolution loop.
+    """
+
+    def __init__(self, old_fingerprints: np.ndarray, new_fingerprints: np.ndarray):
+        self.n_old = len(old_fingerprints)
+        reps, self._inverse, _ = distinct(np.concatenate([old_fingerprints, new_fingerprints]))
+        is_new = reps >= self.n_old
+        self._old_groups = np.flatnonzero(~is_new)
+        self._new_groups = np.flatnonzero(is_new)
+        self._n_groups = len(reps)
+        # Representatives, as indices into the old / new programs
+        self.old_reps = reps[self._old_groups]
+        self.new_reps = reps[self._new_groups] - self.n_old
+
+    @property
+    def n_matchups(self) -> int:
+        n_new = len(self.new_reps)
+        return len(self.old_reps) * n_new + n_new * n_new
+
+    def assemble(
+        self,
+        old_payoff: np.ndarray,
+        reps_old_new: np.ndarray,
+        reps_new_new: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Args:
+            old_payoff: (n, n) payoffs among the old programs.
+            reps_old_new: (len(old_reps), len(new_reps)) payoffs of old vs new representatives.
+            reps_new_new: (len(new_reps), len(new_reps)) payoffs among new representatives.
+
+        Returns:
+            (old_new, new_new) blocks of shape (n, m) and (m, m).
+        """
+        groups = np.zeros((self._n_groups, self._n_groups), dtype=int)
+        old_g, new_g = self._old_groups, self._new_groups
+        groups[np.ix_(old_g, old_g)] = old_payoff[np.ix_(self.old_reps, self.old_reps)]
+        groups[np.ix_(old_g, new_g)] = reps_old_new
+        groups[np.ix_(new_g, old_g)] = -np.asarray(reps_old_new).T
+        groups[np.ix_(new_g, new_g)] = reps_new_new
+
+        inv_old, inv_new = self._inverse[: self.n_old], self._inverse[self.n_old:]
+        return groups[np.ix_(inv_old, inv_new)], groups[np.ix_(inv_new, inv_new)]
+
+
+def select_distinct(select_fn, payoff: np.ndarray, fingerprints: np.ndarray, warm_start: Optional[np.ndarray] = None):
+    """
+    Run a selection on one representative per fingerprint, then expand back.
+
+    select_fn(reduced_payoff, warm_start) -> (survivors, mixture) is called on
+    the representatives' payoff matrix, with the warm start summed per group.
+    Every member of a surviving group survives; a group's equilibrium weight
+    is split evenly among its members.
+
+    Returns:
+        (survivors, mixture) over the full population.
+    """
+    reps, inverse, counts = distinct(fingerprints)
+    if warm_start is not None:
+        warm_start = np.bincount(inverse, weights=warm_start, minlength=len(reps))
+    kept, mixture = select_fn(payoff[np.ix_(reps, reps)], warm_start)
+
+    alive = np.zeros(len(reps), dtype=bool)
+    alive[kept] = True
+    survivors = np.flatnonzero(alive[inverse])
+    if mixture is not None:
+        mixture = (mixture / counts)[inverse]
+    return survivors, mixture
@@ -1,16 +1,29 @@
 
 import numpy as np
-from typing import List, Callable
-from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import Iterator, List, Callable, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
 
 from config import ExperimentConfig
+from creation.factory import make_creator
+from interpreters.cache import CachedInterpreter
 from interpreters.wrapper import make_interpreter
+from loggers import counters, profiling
 from rewards.wrapper import make_reward
 
 
 # These will be "per-process" globals in worker processes
 _INTERP = None
 _REWARD_FN: Callable | None = None
+_CREATOR = None
+_REF: List[List[int]] | None = None
+
+
+def _make_worker_interpreter(cfg: ExperimentConfig):
+    interp = make_interpreter(cfg)
+    if cfg.payoff.run_cache_size > 0:
+        interp = CachedInterpreter(interp, cfg.payoff.run_cache_size)
+    return interp
 
 
 def _init_worker(cfg: ExperimentConfig, reward_fn: Callable):
@@ -18,11 +31,44 @@ def _init_worker(cfg: ExperimentConfig, reward_fn: Callable):
     Called once in each worker process.
     Builds the interpreter and stores the reward function as per-process globals.
     """
-    global _INTERP, _REWARD_FN
-    _INTERP = make_interpreter(cfg)     # intesrpreter built ONCE per worker
+    global _INTERP, _REWARD_FN, _CREATOR
+    counters.enable(cfg.logging.counters)
+    profiling.start_worker(cfg.logging)
+    _INTERP = _make_worker_interpreter(cfg)     # intesrpreter built ONCE per worker
     _REWARD_FN = make_reward(cfg)       # top-level function, picklable
+    _CREATOR = make_creator(cfg)
+
+
+# Shared pool workers (rewards.shared_pool) serve several experiments: one
+# interpreter per interpreter config (so runs cached by one experiment serve
+# the others), and reward function + creator per experiment.
+_INTERPRETERS: dict = {}
+_CONTEXTS: dict = {}
+
+
+def _init_shared_worker(log_cfg) -> None:
+    """Initializer of shared pool workers; contexts are built on first use."""
+    counters.enable(log_cfg.counters)
+    profiling.start_worker(log_cfg)
+
 
+def _run_in_context(args):
+    """
+    Run fn(task_args) with the per-process globals of an experiment,
+    building them the first time this worker sees it.
+    """
+    global _INTERP, _REWARD_FN, _CREATOR
+    interp_key, context_key, cfg, fn, task_args = args
+    context = _CONTEXTS.get(context_key)
+    if context is None:
+        if interp_key not in _INTERPRETERS:
+            _INTERPRETERS[interp_key] = _make_worker_interpreter(cfg)
+        context = _CONTEXTS[context_key] = (_INTERPRETERS[interp_key], make_reward(cfg), make_creator(cfg))
+    _INTERP, _REWARD_FN, _CREATOR = context
+    return fn(task_args)
 
+
+@counters.task
 def _compute_single_matchup(args):
     """
     Worker function that computes reward for a single (i, j) matchup.
@@ -34,6 +80,128 @@ def _compute_single_matchup(args):
     return i, j, reward
 
 
+@counters.task
+def _compute_tile(args):
+    """
+    Worker function that computes a whole ref-block x pop-block tile.
+    Uses per-process globals _INTERP and _REWARD_FN.
+    """
+    global _INTERP, _REWARD_FN
+    r0, c0, ref_block, pop_block = args
+    tile = np.zeros((len(ref_block), len(pop_block)), dtype=int)
+    for i, code_a in enumerate(ref_block):
+        for j, code_b in enumerate(pop_block):
+            tile[i, j] = _REWARD_FN(_INTERP, code_a, code_b)  # type: ignore[arg-type]
+    return r0, c0, tile
+
+
+@counters.task
+def _compute_pairs(args):
+    """
+    Worker function that computes a block of explicit matchups.
+    Uses per-process globals _INTERP and _REWARD_FN.
+    """
+    global _INTERP, _REWARD_FN
+    k0, pairs = args
+    return k0, [_REWARD_FN(_INTERP, code_a, code_b) for code_a, code_b in pairs]  # type: ignore[arg-type]
+
+
+@counters.task
+def _compute_homoiconic(args):
+    """
+    Worker function that builds homoiconic children for a block of parent pairs.
+    Uses per-process globals _INTERP and _CREATOR.
+    """
+    global _INTERP, _CREATOR
+    k0, parents_a, parents_b = args
+    return k0, [_CREATOR.homoiconic(_INTERP, pa, pb) for pa, pb in zip(parents_a, parents_b)]
+
+
+def _init_search_worker(cfg: ExperimentConfig, reward_fn: Callable, ref: List[List[int]]):
+    """_init_worker, plus the reference population the candidates are scored against."""
+    global _REF
+    _init_worker(cfg, reward_fn)
+    _REF = ref
+
+
+def _score_block(creator, interp, reward_fn, ref, seed: int, block: int, n: int, min_score: float):
+    """
+    Generate block `block` of a seeded candidate stream and score each candidate
+    against every reference program. Returns (block, hits, stats) where hits
+    are the (candidate id, score) pairs with score > min_score and stats is
+    (score sum, score min, score max) over the block.
+    """
+    candidates = creator.seeded_batch(n, (seed, block))
+    scores = np.zeros(n, dtype=int)
+    for j in range(n):
+        code_b = candidates[j]
+        scores[j] = sum(reward_fn(interp, code_a, code_b) for code_a in ref)
+    hits = [(block * n + j, int(scores[j])) for j in np.flatnonzero(scores > min_score).tolist()]
+    return block, hits, (int(scores.sum()), int(scores.min()), int(scores.max()))
+
+
+@counters.task
+def _search_block(args):
+    """
+    Worker function for search_candidates.
+    Uses per-process globals _CREATOR, _INTERP, _REWARD_FN and _REF.
+    """
+    return _score_block(_CREATOR, _INTERP, _REWARD_FN, _REF, *args)
+
+
+def search_candidates(
+    cfg: ExperimentConfig,
+    ref: List[List[int]],
+    reward_fn: Callable,
+    seed: int,
+    n_blocks: int,
+    block_size: int,
+    min_score: float,
+    start_block: int = 0,
+) -> Iterator[Tuple[int, List[Tuple[int, int]], Tuple[int, int, int]]]:
+    """
+    Stream random candidates against a fixed reference population.
+
+    Workers hold ref, generate candidate blocks themselves from seeded RNG
+    streams (creator.seeded_batch(block_size, (seed, block))) and send back
+    only the candidates that score above min_score, so almost nothing crosses
+    process boundaries. Use seeded_candidate to rebuild a candidate from its id.
+
+    Yields, in block order from start_block:
+        (block, [(candidate id, score), ...], (score sum, score min, score max))
+    where score is the sum of reward_fn(interp, ref[i], candidate) over ref.
+    """
+    blocks = range(start_block, start_block + n_blocks)
+    n_workers = cfg.payoff.n_workers
+
+    # --- Sequential path ---
+    if n_workers == 1:
+        creator, interp = make_creator(cfg), _make_worker_interpreter(cfg)
+        for block in blocks:
+            yield _score_block(creator, interp, reward_fn, ref, seed, block, block_size, min_score)
+        return
+
+    # --- Parallel path (a bounded window of blocks in flight) ---
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_search_worker,
+        initargs=(cfg, reward_fn, ref),
+    ) as executor:
+        pending: deque = deque()
+        for block in blocks:
+            pending.append(executor.submit(_search_block, (seed, block, block_size, min_score)))
+            if len(pending) >= 4 * n_workers:
+                yield counters.unpack(pending.popleft().result())
+        while pending:
+            yield counters.unpack(pending.popleft().result())
+
+
+def seeded_candidate(creator, seed: int, candidate_id: int, block_size: int) -> List[int]:
+    """Rebuild candidate candidate_id of a search_candidates stream."""
+    block, j = divmod(candidate_id, block_size)
+    return creator.seeded_batch(block_size, (seed, block))[j]
+
+
 def compute_payoff_matrix(
     cfg: ExperimentConfig,
     ref: List[List[int]],
@@ -59,6 +227,10 @@ def compute_payoff_matrix(
 
     n_workers = cfg.payoff.n_workers
 
+    # --- Remote / shared pool path (tiles go to workers that outlive this call) ---
+    if cfg.payoff.backend != "local":
+        return PayoffEngine(cfg, reward_fn).compute(ref, pop)
+
     # --- Sequential path (simpler, good for debugging) ---
     if n_workers == 1:
         interp = make_interpreter(cfg)
@@ -79,7 +251,312 @@ def compute_payoff_matrix(
         initializer=_init_worker,
         initargs=(cfg, reward_fn),
     ) as executor:
-        for i, j, r in executor.map(_compute_single_matchup, matchups):
+        for item in executor.map(_compute_single_matchup, matchups):
+            i, j, r = counters.unpack(item)
             payoff_matrix[i, j] = r
 
     return payoff_matrix
+
+
+
+def compute_payoff_pairs(
+    cfg: ExperimentConfig,
+    pop: List[List[int]],
+    rows: np.ndarray,
+    cols: np.ndarray,
+    reward_fn: Callable,
+) -> np.ndarray:
+    """
+    Compute rewards for an explicit list of matchups instead of a full matrix.
+
+    Args:
+        cfg: ExperimentConfig with interpreter + payoff settings.
+        pop: Population (list of programs).
+        rows, cols: Equal-length index arrays; matchup k is pop[rows[k]] vs pop[cols[k]].
+        reward_fn: reward(interp, code_a, code_b) -> int
+
+    Returns:
+        1D int array where entry k is the reward for pop[rows[k]] playing pop[cols[k]].
+    """
+    n_pairs = len(rows)
+    rewards = np.zeros(n_pairs, dtype=int)
+    n_workers = cfg.payoff.n_workers
+
+    # --- Remote / shared pool path ---
+    if cfg.payoff.backend != "local":
+        return PayoffEngine(cfg, reward_fn).pairs(pop, rows, cols)
+
+    # --- Sequential path ---
+    if n_workers == 1:
+        interp = make_interpreter(cfg)
+        for k, (i, j) in enumerate(zip(rows.tolist(), cols.tolist())):
+            rewards[k] = reward_fn(interp, pop[i], pop[j])
+        return rewards
+
+    # --- Parallel path (chunked: one matchup per task is too fine-grained here) ---
+    matchups = [
+        (k, 0, pop[i], pop[j])
+        for k, (i, j) in enumerate(zip(rows.tolist(), cols.tolist()))
+    ]
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(cfg, reward_fn),
+    ) as executor:
+        chunksize = max(1, n_pairs // (8 * n_workers))
+        for item in executor.map(_compute_single_matchup, matchups, chunksize=chunksize):
+            k, _, r = counters.unpack(item)
+            rewards[k] = r
+
+    return rewards
+
+class LazyPayoffMatrix:
+    """
+    Square self-play payoff matrix over a population, evaluated on demand.
+
+    Unknown entries are NaN. Like the evolution loop, this assumes zero-sum
+    self-play: payoff[j, i] = -payoff[i, j], so evaluating a row also fills
+    the matching column. Only entries that are still unknown get computed,
+    on engine's persistent workers when there is one.
+    """
+
+    def __init__(
+        self,
+        cfg: ExperimentConfig,
+        pop: List[List[int]],
+        reward_fn: Callable,
+        engine: Optional["PayoffEngine"] = None,
+    ):
+        self.cfg = cfg
+        self.reward_fn = reward_fn
+        self.engine = engine
+        self.pop = list(pop)
+        self.values = np.full((len(self.pop), len(self.pop)), np.nan)
+        self.n_evaluated = 0  # matchups computed so far (diagnostics)
+
+    def __len__(self) -> int:
+        return len(self.pop)
+
+    @property
+    def known_fraction(self) -> float:
+        """Fraction of the current matrix that has been evaluated."""
+        if not self.values.size:
+            return 1.0
+        return float(np.count_nonzero(~np.isnan(self.values))) / self.values.size
+
+    def rows(self, indices) -> np.ndarray:
+        """Return payoff[indices, :], evaluating whatever is missing."""
+        indices = np.asarray(indices, dtype=int)
+        block = self.values[indices]
+        missing = np.isnan(block)
+        if missing.any():
+            rows = indices[missing.any(axis=1)]
+            cols = np.flatnonzero(missing.any(axis=0))
+            ref = [self.pop[i] for i in rows.tolist()]
+            opp = [self.pop[j] for j in cols.tolist()]
+            if self.engine is not None:
+                computed = self.engine.compute(ref, opp)
+            else:
+                computed = compute_payoff_matrix(self.cfg, ref, opp, self.reward_fn)
+            # Entries of the rectangle that were already known are recomputed, not counted
+            self.n_evaluated += int(np.isnan(self.values[np.ix_(rows, cols)]).sum())
+            self.values[np.ix_(rows, cols)] = computed
+            self.values[np.ix_(cols, rows)] = -computed.T
+            block = self.values[indices]
+        return block
+
+    def cols(self, indices) -> np.ndarray:
+        """Return payoff[:, indices] (via zero-sum), evaluating whatever is missing."""
+        return -self.rows(indices).T
+
+    def extend(self, programs: List[List[int]]) -> None:
+        """Append programs with unknown payoffs."""
+        n_old, n_new = len(self.pop), len(self.pop) + len(programs)
+        values = np.full((n_new, n_new), np.nan)
+        values[:n_old, :n_old] = self.values
+        self.values = values
+        self.pop.extend(programs)
+
+    def keep(self, indices) -> None:
+        """Restrict to the given programs, keeping their known payoffs."""
+        indices = np.asarray(indices, dtype=int)
+        self.values = self.values[np.ix_(indices, indices)]
+        self.pop = [self.pop[i] for i in indices.tolist()]
+
+
+class PendingPayoff:
+    """Handle on a payoff matrix being computed by a PayoffEngine."""
+
+    def __init__(
+        self,
+        shape: tuple,
+        futures: List[Future],
+        matrix: Optional[np.ndarray] = None,
+        on_done: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ):
+        self.shape = shape
+        self._futures = futures
+        self._matrix = matrix
+        self._on_done = on_done  # maps the assembled matrix to the result (e.g. merging cached entries)
+
+    @property
+    def n_matchups(self) -> int:
+        return self.shape[0] * self.shape[1]
+
+    def done(self) -> bool:
+        return all(f.done() for f in self._futures)
+
+    def result(self) -> np.ndarray:
+        """Block until every tile is in and return the assembled matrix."""
+        if self._matrix is None:
+            matrix = np.zeros(self.shape, dtype=int)
+            for f in self._futures:
+                r0, c0, tile = counters.unpack(f.result())
+                matrix[r0:r0 + tile.shape[0], c0:c0 + tile.shape[1]] = tile
+            self._matrix = matrix
+            self._futures = []
+        if self._on_done is not None:
+            self._matrix, self._on_done = self._on_done(self._matrix), None
+        return self._matrix
+
+
+class PayoffEngine:
+    """
+    Persistent payoff evaluator.
+
+    Unlike compute_payoff_matrix, which starts a fresh process pool per call,
+    the engine keeps its workers (and their interpreters) alive and accepts
+    asynchronous requests: `submit` splits ref x pop into tiles, queues them
+    and returns immediately, so the caller can do other work meanwhile.
+
+    With n_workers == 1 requests are computed synchronously in-process.
+    With cfg.payoff.backend == "tcp", tiles go to remote workers through the
+    process's shared rewards.distributed.Coordinator instead of a local pool;
+    with "shared", to the process's rewards.shared_pool.SharedPool, whose
+    payoff cache is consulted before anything is computed.
+    """
+
+    def __init__(self, cfg: ExperimentConfig, reward_fn: Callable, tiles_per_worker: int = 4):
+        self.cfg = cfg
+        self.reward_fn = reward_fn
+        self.n_workers = cfg.payoff.n_workers
+        self.tiles_per_worker = tiles_per_worker
+        self._interp = None
+        self._creator = None
+        self._executor = None
+        self._owns_executor = True
+        self._cache = None
+        if cfg.payoff.backend == "tcp":
+            from rewards.distributed import get_coordinator
+            self._executor = get_coordinator(cfg, reward_fn)
+            self._owns_executor = False  # shared, shut down at exit
+        elif cfg.payoff.backend == "shared":
+            from rewards.shared_pool import get_shared_pool
+            self._executor = get_shared_pool().view(cfg)
+            self._cache = self._executor.cache
+            self._owns_executor = False  # owned by whoever set the pool up
+        elif cfg.payoff.backend != "local":
+            raise ValueError(f"Unknown payoff backend: {cfg.payoff.backend!r}")
+        elif self.n_workers > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_worker,
+                initargs=(cfg, reward_fn),
+            )
+
+    @property
+    def executor(self):
+        """The engine's workers as submit(fn, args) -> Future (None when in-process), for other tasks to reuse."""
+        return self._executor
+
+    def _local_interp(self):
+        if self._interp is None:
+            self._interp = _make_worker_interpreter(self.cfg)
+        return self._interp
+
+    def submit(self, ref: List[List[int]], pop: List[List[int]]) -> PendingPayoff:
+        """Queue the ref x pop payoff matrix; returns without waiting."""
+        if self._cache is not None:
+            return self._cache.submit(self._submit_tiles, ref, pop)
+        return self._submit_tiles(ref, pop)
+
+    def _submit_tiles(self, ref: List[List[int]], pop: List[List[int]], on_done: Optional[Callable] = None) -> PendingPayoff:
+        shape = (len(ref), len(pop))
+        if self._executor is None:
+            self._local_interp()
+            matrix = np.zeros(shape, dtype=int)
+            for i in range(shape[0]):
+                for j in range(shape[1]):
+                    matrix[i, j] = self.reward_fn(self._interp, ref[i], pop[j])
+            return PendingPayoff(shape, [], matrix, on_done=on_done)
+
+        # Split along rows, or columns when there are few rows
+        n_tiles = self.n_workers * self.tiles_per_worker
+        futures = []
+        if shape[0] >= shape[1]:
+            step = max(1, -(-shape[0] // n_tiles))
+            for r0 in range(0, shape[0], step):
+                futures.append(self._executor.submit(_compute_tile, (r0, 0, ref[r0:r0 + step], pop)))
+        else:
+            step = max(1, -(-shape[1] // n_tiles))
+            for c0 in range(0, shape[1], step):
+                futures.append(self._executor.submit(_compute_tile, (0, c0, ref, pop[c0:c0 + step])))
+        return PendingPayoff(shape, futures, on_done=on_done)
+
+    def compute(self, ref: List[List[int]], pop: List[List[int]]) -> np.ndarray:
+        """Synchronous ref x pop payoff matrix."""
+        return self.submit(ref, pop).result()
+
+    def pairs(self, pop: List[List[int]], rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Rewards of the matchups pop[rows[k]] vs pop[cols[k]] (see compute_payoff_pairs)."""
+        pairs = [(pop[i], pop[j]) for i, j in zip(rows.tolist(), cols.tolist())]
+        if self._executor is None:
+            interp = self._local_interp()
+            return np.array([self.reward_fn(interp, a, b) for a, b in pairs], dtype=int)
+        step = max(1, -(-len(pairs) // (self.n_workers * self.tiles_per_worker)))
+        futures = [
+            self._executor.submit(_compute_pairs, (k0, pairs[k0:k0 + step]))
+            for k0 in range(0, len(pairs), step)
+        ]
+        rewards = np.zeros(len(pairs), dtype=int)
+        for f in futures:
+            k0, block = counters.unpack(f.result())
+            rewards[k0:k0 + len(block)] = block
+        return rewards
+
+    def homoiconic(self, parents_a: List[List[int]], parents_b: List[List[int]]) -> List[Optional[List[int]]]:
+        """
+        Homoiconic children creator.homoiconic(interp, parents_a[k], parents_b[k]),
+        built on the workers (None where a pair produced nothing). With
+        run_cache_size > 0, runs a worker already did while computing payoffs
+        come from its cache.
+        """
+        n = len(parents_a)
+        if self._executor is None:
+            if self._creator is None:
+                self._creator = make_creator(self.cfg)
+            interp = self._local_interp()
+            return [self._creator.homoiconic(interp, pa, pb) for pa, pb in zip(parents_a, parents_b)]
+
+        step = max(1, -(-n // (self.n_workers * self.tiles_per_worker)))
+        futures = [
+            self._executor.submit(_compute_homoiconic, (k0, parents_a[k0:k0 + step], parents_b[k0:k0 + step]))
+            for k0 in range(0, n, step)
+        ]
+        children: List[Optional[List[int]]] = [None] * n
+        for f in futures:
+            k0, block = counters.unpack(f.result())
+            children[k0:k0 + len(block)] = block
+        return children
+
+    def close(self) -> None:
+        if self._executor is not None:
+            if self._owns_executor:
+                self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "PayoffEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,118 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+
+class PayoffBuffer:
+    """
+    Square self-play payoff matrix with spare capacity.
+
+    The live matrix is the top-left (n, n) corner of a (capacity, capacity)
+    array. New programs are appended in place, capacity doubles when it runs
+    out, and selection compacts survivors in place, so a generation copies
+    O(n * n_new) entries instead of rebuilding the whole matrix.
+
+    Entries are stored as int8 (every reward is -1/0/+1). With memmap_path
+    the backing array lives in a file, so only touched pages stay in RAM.
+
+    Like the evolution loop, this assumes zero-sum self-play:
+    payoff(new, old) = -payoff(old, new)^T.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        dtype=np.int8,
+        memmap_path: Optional[str] = None,
+    ):
+        self.dtype = np.dtype(dtype)
+        self.memmap_path = memmap_path
+        self.n = 0
+        self._data = self._allocate(max(1, capacity))
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The live (n, n) payoff matrix (a view, not a copy)."""
+        return self._data[: self.n, : self.n]
+
+    def _allocate(self, capacity: int, path: Optional[str] = None) -> np.ndarray:
+        path = path or self.memmap_path
+        if path is None:
+            return np.zeros((capacity, capacity), dtype=self.dtype)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return np.memmap(path, dtype=self.dtype, mode="w+", shape=(capacity, capacity))
+
+    def _reserve(self, size: int) -> None:
+        """Make room for size programs, doubling capacity as needed."""
+        if size <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        if self.memmap_path is None:
+            data = self._allocate(capacity)
+            data[: self.n, : self.n] = self.matrix
+        else:
+            tmp_path = self.memmap_path + ".grow"
+            data = self._allocate(capacity, tmp_path)
+            data[: self.n, : self.n] = self.matrix
+            data.flush()
+            del self._data
+            os.replace(tmp_path, self.memmap_path)
+            data = np.memmap(self.memmap_path, dtype=self.dtype, mode="r+", shape=(capacity, capacity))
+        self._data = data
+
+    def _check_range(self, block: np.ndarray) -> None:
+        if block.size and np.issubdtype(self.dtype, np.integer):
+            info = np.iinfo(self.dtype)
+            if block.min() < info.min or block.max() > info.max:
+                raise ValueError(f"Payoff values do not fit in {self.dtype}")
+
+    def append(self, old_new: np.ndarray, new_new: np.ndarray) -> None:
+        """
+        Append m programs in place.
+
+        Args:
+            old_new: (n, m) payoffs of the current programs against the new ones.
+            new_new: (m, m) payoffs among the new programs.
+        """
+        n, m = self.n, new_new.shape[0]
+        if old_new.shape != (n, m):
+            raise ValueError(f"Expected old_new of shape {(n, m)}, got {old_new.shape}")
+        self._check_range(old_new)
+        self._check_range(new_new)
+        self._reserve(n + m)
+        self._data[:n, n:n + m] = old_new
+        self._data[n:n + m, :n] = -old_new.T
+        self._data[n:n + m, n:n + m] = new_new
+        self.n = n + m
+
+    def compact(self, indices: np.ndarray, chunk: int = 256) -> None:
+        """
+        Keep only the given programs (sorted, unique), in place.
+
+        Row a of the result is read from row indices[a] >= a, so rows can be
+        moved up in order without clobbering any source still to be read;
+        only a (chunk, k) temporary is allocated.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        k = len(indices)
+        if k and (np.any(np.diff(indices) <= 0) or indices[-1] >= self.n):
+            raise ValueError("compact() needs sorted, unique indices within the buffer")
+        for start in range(0, k, chunk):
+            stop = min(start + chunk, k)
+            self._data[start:stop, :k] = self._data[np.ix_(indices[start:stop], indices)]
+        self.n = k
+
+    def flush(self) -> None:
+        """Flush a memory-mapped buffer to disk (no-op in RAM)."""
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
@@ -1,13 +1,16 @@
 
 from typing import List
 
+# The reward only depends on each program's output on these inputs
+PROBES = [[0, 1, 2, 3, 4, 5]]
+
 
 def reward(interpreter, code_a: List[int], code_b: List[int]) -> int:
     """
     Reward obtained by playing both side of the subleq game with deterministic reward -1, 0 or 1
     The more the better for A 
     """
-    staple = [0, 1, 2, 3, 4, 5]
+    staple = PROBES[0]
     out_a, _ = interpreter.run(code_a, staple)
     out_b, _ = interpreter.run(code_b, staple)
     
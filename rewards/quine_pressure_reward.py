@@ -2,6 +2,8 @@
 
 from typing import List, Union
 
+from loggers import counters
+
 Program = List[int]
 
 
@@ -16,6 +18,9 @@ def _lcs_length(a: List[int], b: List[int]) -> int:
     # Keep the shorter sequence in the inner loop
     if len(a) < len(b):
         a, b = b, a
+    if counters.ENABLED:
+        counters.add("lcs.calls")
+        counters.add("lcs.cells", len(a) * len(b))
 
     n = len(b)
     prev = [0] * (n + 1)
@@ -0,0 +1,199 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class SparseResults:
+    """
+    Sparse record of evaluated matchups over a population that grows and shrinks.
+
+    Each result (i, j, r) is the reward of program i playing program j. Only
+    sampled pairs are stored, so memory is O(n * k) instead of O(n^2).
+    """
+
+    def __init__(self, n: int = 0):
+        self.n = n
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.cols = np.zeros(0, dtype=np.int64)
+        self.rewards = np.zeros(0, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.rewards)
+
+    def add(self, rows: np.ndarray, cols: np.ndarray, rewards: np.ndarray) -> None:
+        self.rows = np.concatenate([self.rows, rows])
+        self.cols = np.concatenate([self.cols, cols])
+        self.rewards = np.concatenate([self.rewards, np.asarray(rewards, dtype=np.int8)])
+
+    def extend(self, n_new: int) -> None:
+        """Append n_new programs with no results yet."""
+        self.n += n_new
+
+    def keep(self, indices: np.ndarray) -> None:
+        """Restrict to the given programs, renumbering them 0..len(indices)-1."""
+        remap = np.full(self.n, -1, dtype=np.int64)
+        remap[indices] = np.arange(len(indices))
+        rows, cols = remap[self.rows], remap[self.cols]
+        alive = (rows >= 0) & (cols >= 0)
+        self.rows, self.cols, self.rewards = rows[alive], cols[alive], self.rewards[alive]
+        self.n = len(indices)
+
+    def contains(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Boolean mask: True where (i, j) or (j, i) was already evaluated."""
+        known = np.concatenate([self.rows * self.n + self.cols, self.cols * self.n + self.rows])
+        return np.isin(rows * self.n + cols, known)
+
+    def to_csr(self):
+        """Results as a scipy.sparse (n, n) matrix; zero-sum entries are mirrored."""
+        from scipy.sparse import coo_matrix
+
+        data = np.concatenate([self.rewards, -self.rewards]).astype(np.int8)
+        rows = np.concatenate([self.rows, self.cols])
+        cols = np.concatenate([self.cols, self.rows])
+        return coo_matrix((data, (rows, cols)), shape=(self.n, self.n)).tocsr()
+
+
+def unique_pairs(rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Drop repeated matchups ((i, j) and (j, i) count as one), keeping first occurrences in order."""
+    if not len(rows):
+        return rows, cols
+    lo, hi = np.minimum(rows, cols), np.maximum(rows, cols)
+    _, first = np.unique(lo * (int(hi.max()) + 1) + hi, return_index=True)
+    first.sort()
+    return rows[first], cols[first]
+
+
+def sample_opponents(
+    n: int,
+    k: int,
+    rng: np.random.Generator,
+    players: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw k uniform opponents (never themselves) for each player.
+
+    Args:
+        n: Population size.
+        k: Opponents per player (capped at n - 1).
+        rng: numpy Generator.
+        players: Programs to sample for (default: all).
+
+    Returns:
+        (rows, cols) index arrays of at most len(players) * k distinct matchups.
+    """
+    if players is None:
+        players = np.arange(n)
+    k = min(k, n - 1)
+    if k <= 0 or not len(players):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    rows = np.repeat(players, k)
+    # Draw from n - 1 slots and skip over the player itself
+    cols = rng.integers(0, n - 1, size=len(rows))
+    cols += cols >= rows
+    return unique_pairs(rows, cols)
+
+
+def fit_bradley_terry(
+    results: SparseResults,
+    n_iter: int = 200,
+    prior: float = 1.0,
+    tol: float = 1e-4,
+    init: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit Bradley-Terry ratings to sparse -1/0/+1 results.
+
+    P(i beats j) = sigmoid(rating_i - rating_j); a draw counts as half a win
+    each. Ratings are fitted with Hunter's MM iteration, fully vectorised
+    over the results. Every program also draws `prior` virtual games against
+    a rating-0 anchor, which keeps unbeaten / winless programs finite and
+    fixes the scale (with prior=0, ratings are centred on mean 0 instead).
+    `init` (e.g. last generation's ratings) warm-starts the iteration.
+
+    Returns:
+        ratings:
+            Log-strength per program, relative to the anchor.
+        stderr:
+            Approximate standard error of each rating, from the Fisher
+            information sum p (1 - p) over its games.
+    """
+    n = results.n
+    i, j = results.rows, results.cols
+    score = (results.rewards.astype(float) + 1.0) / 2.0  # share of the win for i
+
+    wins = (
+        np.bincount(i, weights=score, minlength=n)
+        + np.bincount(j, weights=1.0 - score, minlength=n)
+        + prior / 2.0
+    )
+    gamma = np.exp(init) if init is not None and len(init) == n else np.ones(n)
+    for _ in range(n_iter):
+        inv = 1.0 / (gamma[i] + gamma[j])
+        denom = (
+            np.bincount(i, weights=inv, minlength=n)
+            + np.bincount(j, weights=inv, minlength=n)
+            + prior / (gamma + 1.0)
+        )
+        new_gamma = wins / denom
+        done = np.max(np.abs(np.log(new_gamma) - np.log(gamma))) < tol
+        gamma = new_gamma
+        if done:
+            break
+
+    ratings = np.log(gamma)
+    if prior <= 0 and n:
+        ratings -= ratings.mean()  # without the anchor only differences are defined
+        gamma = np.exp(ratings)
+    p = 1.0 / (1.0 + np.exp(ratings[j] - ratings[i]))
+    info = (
+        np.bincount(i, weights=p * (1 - p), minlength=n)
+        + np.bincount(j, weights=p * (1 - p), minlength=n)
+        + prior * gamma / (gamma + 1.0) ** 2
+    )
+    return ratings, 1.0 / np.sqrt(info)
+
+
+def adaptive_pairs(
+    ratings: np.ndarray,
+    stderr: np.ndarray,
+    cutoff: float,
+    k: int,
+    rng: np.random.Generator,
+    z: float = 2.0,
+    window: int = 8,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extra matchups for programs whose fate is still uncertain.
+
+    A program is uncertain if its rating is within z standard errors of the
+    selection cutoff. Each uncertain program gets k opponents drawn from its
+    `window` nearest neighbours by rating: close pairs have outcomes near
+    50/50, which is where a result carries the most information.
+
+    Returns:
+        (rows, cols) index arrays.
+    """
+    n = len(ratings)
+    uncertain = np.flatnonzero(np.abs(ratings - cutoff) <= z * stderr)
+    if n < 2 or not len(uncertain) or k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    order = np.argsort(ratings)
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+
+    rows = np.repeat(uncertain, k)
+    offsets = rng.integers(1, window + 1, size=len(rows)) * rng.choice([-1, 1], size=len(rows))
+    neighbour_rank = rank[rows] + offsets
+    # Reflect off the ends of the ranking so the opponent is never the player itself
+    neighbour_rank = np.where(neighbour_rank < 0, rank[rows] - offsets, neighbour_rank)
+    neighbour_rank = np.where(neighbour_rank >= n, rank[rows] - np.abs(offsets), neighbour_rank)
+    neighbour_rank = np.clip(neighbour_rank, 0, n - 1)
+    cols = order[neighbour_rank]
+    mask = cols != rows
+    return unique_pairs(rows[mask], cols[mask])
+
+
+def expected_payoff(ratings: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Expected -1/0/+1 payoff of rows[k] vs cols[k] under the fitted model."""
+    return np.tanh((ratings[rows] - ratings[cols]) / 2.0)
@@ -0,0 +1,281 @@
+import itertools
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import ExperimentConfig, LoggingConfig
+from creation.population import Population
+from loggers import counters
+from rewards.payoff import PendingPayoff, _init_shared_worker, _run_in_context
+
+# One process pool shared by every experiment running in this process, or
+# in other processes through a SharedPoolServer + SharedPoolClient (the
+# concurrent runs of a sweep, each in its own process, see sides/sweep.py),
+# selected with PayoffConfig.backend = "shared". Workers keep one interpreter
+# per interpreter config, so their run caches serve every experiment using
+# it, and the pool keeps one payoff cache per interpreter + reward config.
+
+_POOL = None  # SharedPool or SharedPoolClient
+
+
+def interpreter_key(cfg: ExperimentConfig) -> str:
+    """Everything the interpreter a worker builds from cfg depends on."""
+    section = getattr(cfg, cfg.interpreter, None)
+    return json.dumps(
+        [cfg.interpreter, asdict(section) if is_dataclass(section) else None,
+         cfg.payoff.run_cache_size, cfg.logging.counters],
+        sort_keys=True,
+    )
+
+
+class PayoffCache:
+    """
+    LRU cache of rewards keyed by the fingerprints of both programs, for
+    experiments sharing an interpreter and reward config.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._values: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def submit(self, submit_tiles: Callable, ref: List[List[int]], pop: List[List[int]]) -> PendingPayoff:
+        """
+        Look up ref x pop; submit_tiles(ref', pop', on_done) computes the
+        rows and columns that still have unknown entries. The returned
+        handle counts only the matchups computed.
+        """
+        fp_ref = Population.from_programs(ref).fingerprints.tolist()
+        fp_pop = Population.from_programs(pop).fingerprints.tolist()
+        matrix, known = self.lookup(fp_ref, fp_pop)
+        n_known = int(known.sum())
+        counters.add("payoff_cache.hits", n_known)
+        counters.add("payoff_cache.misses", known.size - n_known)
+
+        rows = np.flatnonzero(~known.all(axis=1))
+        cols = np.flatnonzero(~known.all(axis=0))
+
+        def merge(computed: np.ndarray) -> np.ndarray:
+            matrix[np.ix_(rows, cols)] = computed
+            self.store([fp_ref[i] for i in rows.tolist()], [fp_pop[j] for j in cols.tolist()], computed)
+            return matrix
+
+        if not len(rows):
+            return PendingPayoff((0, 0), [], np.zeros((0, 0), dtype=int), on_done=merge)
+        return submit_tiles([ref[i] for i in rows.tolist()], [pop[j] for j in cols.tolist()], on_done=merge)
+
+    def lookup(self, fp_rows: List[int], fp_cols: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Cached rewards of fp_rows x fp_cols, and the mask of entries found."""
+        matrix = np.zeros((len(fp_rows), len(fp_cols)), dtype=int)
+        known = np.zeros(matrix.shape, dtype=bool)
+        with self._lock:
+            for i, a in enumerate(fp_rows):
+                for j, b in enumerate(fp_cols):
+                    value = self._values.get((a, b))
+                    if value is not None:
+                        self._values.move_to_end((a, b))
+                        matrix[i, j] = value
+                        known[i, j] = True
+        return matrix, known
+
+    def store(self, fp_rows: List[int], fp_cols: List[int], values: np.ndarray) -> None:
+        with self._lock:
+            for i, a in enumerate(fp_rows):
+                for j, b in enumerate(fp_cols):
+                    self._values[(a, b)] = int(values[i, j])
+            while len(self._values) > self.size:
+                self._values.popitem(last=False)
+
+
+class _RemotePayoffCache(PayoffCache):
+    """PayoffCache of a SharedPool in another process, reached through its proxy."""
+
+    def __init__(self, proxy, cfg: ExperimentConfig):
+        super().__init__(0)
+        self._proxy = proxy
+        self._cfg = cfg
+
+    def lookup(self, fp_rows: List[int], fp_cols: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        return self._proxy.cache_lookup(self._cfg, fp_rows, fp_cols)
+
+    def store(self, fp_rows: List[int], fp_cols: List[int], values: np.ndarray) -> None:
+        self._proxy.cache_store(self._cfg, fp_rows, fp_cols, values)
+
+
+class PoolView:
+    """Executor-like view of a SharedPool for one experiment: submit(fn, args) -> Future."""
+
+    def __init__(self, pool, cfg: ExperimentConfig, context_key: int):
+        self.pool = pool
+        self.cfg = cfg
+        self._interp_key = interpreter_key(cfg)
+        self._context_key = context_key
+        self.cache = pool.payoff_cache(cfg)
+
+    def submit(self, fn: Callable, args: Any) -> Future:
+        return self.pool.submit_task(self._interp_key, self._context_key, self.cfg, fn, args)
+
+    def shutdown(self) -> None:
+        """The pool outlives its views."""
+
+
+class SharedPool:
+    """
+    Process pool with a fixed core budget, shared by concurrent experiments.
+
+    Args:
+        n_workers: Worker processes (the core budget).
+        payoff_cache_size: Entries of each payoff cache (0 = no payoff cache).
+        log_cfg: Worker logging settings (counters, profiling).
+    """
+
+    def __init__(self, n_workers: int, payoff_cache_size: int = 0, log_cfg: Optional[LoggingConfig] = None):
+        self.n_workers = n_workers
+        self.payoff_cache_size = payoff_cache_size
+        self.executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_shared_worker,
+            initargs=(log_cfg or LoggingConfig(),),
+        )
+        self._caches: Dict[str, PayoffCache] = {}
+        self._contexts: Dict[str, int] = {}
+        self._next_context = itertools.count()
+        self._lock = threading.Lock()
+
+    def context_key(self, cfg: ExperimentConfig) -> int:
+        """Worker context of an experiment with config cfg (equal configs share one)."""
+        key = json.dumps(asdict(cfg), sort_keys=True, default=str)
+        with self._lock:
+            if key not in self._contexts:
+                self._contexts[key] = next(self._next_context)
+            return self._contexts[key]
+
+    def view(self, cfg: ExperimentConfig) -> PoolView:
+        """Executor for an experiment with config cfg."""
+        return PoolView(self, cfg, self.context_key(cfg))
+
+    def submit_task(self, interp_key: str, context_key: int, cfg: ExperimentConfig, fn: Callable, args: Any) -> Future:
+        return self.executor.submit(_run_in_context, (interp_key, context_key, cfg, fn, args))
+
+    def run_task(self, *task) -> Any:
+        """Blocking submit_task, for SharedPoolClient."""
+        return self.submit_task(*task).result()
+
+    def payoff_cache(self, cfg: ExperimentConfig) -> Optional[PayoffCache]:
+        if self.payoff_cache_size <= 0:
+            return None
+        key = json.dumps([interpreter_key(cfg), cfg.reward])
+        with self._lock:
+            if key not in self._caches:
+                self._caches[key] = PayoffCache(self.payoff_cache_size)
+            return self._caches[key]
+
+    def cache_lookup(self, cfg: ExperimentConfig, fp_rows: List[int], fp_cols: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        return self.payoff_cache(cfg).lookup(fp_rows, fp_cols)
+
+    def cache_store(self, cfg: ExperimentConfig, fp_rows: List[int], fp_cols: List[int], values: np.ndarray) -> None:
+        self.payoff_cache(cfg).store(fp_rows, fp_cols, values)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self) -> "SharedPool":
+        set_shared_pool(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        set_shared_pool(None)
+        self.shutdown()
+
+
+class _PoolManager(BaseManager):
+    pass
+
+
+_PoolManager.register(
+    "SharedPool", SharedPool, exposed=("context_key", "run_task", "cache_lookup", "cache_store", "shutdown"),
+)
+
+
+class SharedPoolServer:
+    """
+    A SharedPool in a manager process, for experiments running in other
+    processes: `with SharedPoolServer(...) as proxy`, then hand proxy to
+    each process's SharedPoolClient. Arguments are SharedPool's.
+    """
+
+    def __init__(self, n_workers: int, payoff_cache_size: int = 0, log_cfg: Optional[LoggingConfig] = None):
+        self.n_workers = n_workers
+        self.payoff_cache_size = payoff_cache_size
+        self._manager = _PoolManager()
+        self._manager.start()
+        self.proxy = self._manager.SharedPool(n_workers, payoff_cache_size, log_cfg)
+
+    def shutdown(self) -> None:
+        self.proxy.shutdown()
+        self._manager.shutdown()
+
+    def __enter__(self):
+        return self.proxy
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+
+class SharedPoolClient:
+    """
+    Stand-in for a SharedPool served by a SharedPoolServer in another
+    process: `with SharedPoolClient(proxy, ...)` makes it this process's
+    shared pool. Tasks are run by blocking proxy calls on local threads.
+
+    Args:
+        proxy: The server's pool proxy.
+        n_workers: The server pool's n_workers (also the number of threads).
+        payoff_cache_size: The server pool's payoff_cache_size.
+    """
+
+    def __init__(self, proxy, n_workers: int, payoff_cache_size: int = 0):
+        self.proxy = proxy
+        self.n_workers = n_workers
+        self.payoff_cache_size = payoff_cache_size
+        self._threads = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="shared-pool")
+
+    def view(self, cfg: ExperimentConfig) -> PoolView:
+        return PoolView(self, cfg, self.proxy.context_key(cfg))
+
+    def payoff_cache(self, cfg: ExperimentConfig) -> Optional[PayoffCache]:
+        return _RemotePayoffCache(self.proxy, cfg) if self.payoff_cache_size > 0 else None
+
+    def submit_task(self, *task) -> Future:
+        return self._threads.submit(self.proxy.run_task, *task)
+
+    def shutdown(self) -> None:
+        self._threads.shutdown()
+
+    def __enter__(self) -> "SharedPoolClient":
+        set_shared_pool(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        set_shared_pool(None)
+        self.shutdown()
+
+
+def set_shared_pool(pool) -> None:
+    global _POOL
+    _POOL = pool
+
+
+def get_shared_pool():
+    if _POOL is None:
+        raise RuntimeError('PayoffConfig.backend == "shared" needs a SharedPool (use `with SharedPool(...)`)')
+    return _POOL
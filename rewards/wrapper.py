@@ -1,22 +1,47 @@
 # rewards/reward.py
-from typing import List
+import importlib
+from typing import Dict, List, Optional
 
-from rewards.blind_reward import reward as blind_reward
-from rewards.placeholder_reward import reward as placeholder_reward
-from rewards.quine_pressure_reward import reward as quine_pressure_reward
 from config import ExperimentConfig
 
+# Rewards are registered by name -> module, imported on first use. A reward
+# module defines reward(interp, code_a, code_b) -> int, and may define PROBES:
+# the inputs that fully determine the reward (see make_reward_probes).
+REWARDS: Dict[str, str] = {
+    "blind": "rewards.blind_reward",
+    "placeholder": "rewards.placeholder_reward",
+    "quine_pressure": "rewards.quine_pressure_reward",
+}
+
+
+def register_reward(name: str, module: str) -> None:
+    REWARDS[name] = module
+
+
+def _reward_module(cfg: ExperimentConfig):
+    module = REWARDS.get(cfg.reward)
+    if module is None:
+        raise ValueError(f"Unknown reward type: {cfg.reward}")
+    try:
+        return importlib.import_module(module)
+    except ModuleNotFoundError as e:
+        if e.name != module:
+            raise
+        raise ImportError(f"Reward {cfg.reward!r} is registered but its module {module} is missing") from e
+
 
 def make_reward(cfg: ExperimentConfig):
     """
     Top-level reward factory.
     Returns a reward function with signature: reward(interp, code_a, code_b) -> int
     """
-    if cfg.reward == "blind":
-        return blind_reward
-    elif cfg.reward == "placeholder":
-        return placeholder_reward
-    elif cfg.reward == "quine_pressure":  
-        return quine_pressure_reward
-    
-    raise ValueError(f"Unknown reward type: {cfg.reward}")
\ No newline at end of file
+    return _reward_module(cfg).reward
+
+
+def make_reward_probes(cfg: ExperimentConfig) -> Optional[List[List[int]]]:
+    """
+    Inputs that fully determine the reward, if the reward only looks at each
+    program's outputs on fixed inputs (None otherwise). Two programs with the
+    same outputs on every probe then earn exactly the same rewards.
+    """
+    return getattr(_reward_module(cfg), "PROBES", None)
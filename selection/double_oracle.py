@@ -0,0 +1,79 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from selection.nash_set import compute_nash_equilibrium
+
+
+def double_oracle(
+    payoff,
+    tol: float = 1e-7,
+    warm_start: Optional[List[int]] = None,
+    max_iter: Optional[int] = None,
+) -> Tuple[np.ndarray, List[int], float]:
+    """
+    Double-oracle Nash equilibrium of a zero-sum game with lazily evaluated payoffs.
+
+    A restricted game over row strategies R and column strategies C is solved
+    exactly, then each player's best response to the other's equilibrium
+    mixture is looked up over the *whole* population. Profitable deviations
+    are added to R / C and the loop repeats; when there are none, the
+    restricted equilibrium is an equilibrium of the full game.
+
+    Only the rows of R and the columns of C are ever requested, so with a
+    `rewards.payoff.LazyPayoffMatrix` most of the matrix is never evaluated.
+
+    Args:
+        payoff:
+            Object with `rows(idx) -> payoff[idx, :]`, `cols(idx) -> payoff[:, idx]`
+            and `len()`, e.g. a LazyPayoffMatrix.
+        tol:
+            A deviation must beat the restricted value by more than tol.
+        warm_start:
+            Initial strategies for both players, typically the previous
+            generation's support. Defaults to [0].
+        max_iter:
+            Optional cap on oracle iterations (defaults to 2 * len(payoff),
+            after which R and C hold every strategy).
+
+    Returns:
+        row_strategy:
+            1D array over all rows, zero outside R.
+        support:
+            Sorted row indices with positive probability.
+        value:
+            Game value at equilibrium.
+    """
+    n = len(payoff)
+    if n == 0:
+        return np.zeros(0), [], 0.0
+
+    R = sorted(set(warm_start)) if warm_start else [0]
+    C = list(R)
+    if max_iter is None:
+        max_iter = 2 * n
+
+    for _ in range(max_iter):
+        row_block = payoff.rows(R)  # (|R|, n)
+        col_block = payoff.cols(C)  # (n, |C|)
+        x, restricted_support, value, y = compute_nash_equilibrium(row_block[:, C])
+
+        row_values = col_block @ y  # every row against the column mixture
+        col_values = x @ row_block  # the row mixture against every column
+
+        grew = False
+        i = int(np.argmax(row_values))
+        if row_values[i] > value + tol and i not in R:
+            R.append(i)
+            grew = True
+        j = int(np.argmin(col_values))
+        if col_values[j] < value - tol and j not in C:
+            C.append(j)
+            grew = True
+        if not grew:
+            break
+
+    row_strategy = np.zeros(n)
+    row_strategy[R] = x
+    support = sorted(R[k] for k in restricted_support)
+    return row_strategy, support, value
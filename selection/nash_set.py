@@ -2,16 +2,103 @@
 
 from __future__ import annotations
 
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Tuple
 
 import numpy as np
-import nashpy as nash
+from scipy.optimize import linprog
+
+
+# Feasibility slack on the value inside the support LPs of non-symmetric games
+# (symmetric games have value exactly 0 and need none), and the weight a row
+# must reach in those LPs to count as supported. The slack alone can push
+# O(n * slack) mass onto any row, so the threshold sits well above it.
+_LP_SLACK = 1e-9
+_LP_SUPPORT_TOL = 1e-6
+
+# Share of uniform mixed into a warm start before it becomes MWU logits: rows
+# the warm start zero-pads (new programs) would otherwise start near log(0)
+# and never recover.
+_MWU_WARM_MIX = 0.1
+
+def _is_symmetric_zero_sum(A: np.ndarray) -> bool:
+    """True if A = -A^T, i.e. both players face the same game and value is 0."""
+    return A.shape[0] == A.shape[1] and np.array_equal(A, -A.T)
+
+
+def _solve_zero_sum(A: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Solve max_x min_j (x^T A)_j with HiGHS.
+
+    Variables are (x, v): maximise v subject to (A^T x)_j >= v for every
+    column j, sum(x) = 1, x >= 0. The column strategy is read from the duals
+    of the column constraints. For symmetric games v is pinned to 0 and the
+    row strategy doubles as the column strategy.
+
+    Returns:
+        (row_strategy, col_strategy, value)
+    """
+    n_rows, n_cols = A.shape
+    c = np.zeros(n_rows + 1)
+    c[-1] = -1.0
+    A_ub = np.hstack([-A.T, np.ones((n_cols, 1))])
+    b_ub = np.zeros(n_cols)
+    A_eq = np.ones((1, n_rows + 1))
+    A_eq[0, -1] = 0.0
+    symmetric = _is_symmetric_zero_sum(A)
+    v_bounds = (0.0, 0.0) if symmetric else (None, None)
+    bounds = [(0.0, None)] * n_rows + [v_bounds]
+
+    res = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=[1.0], bounds=bounds, method="highs")
+    if res.status != 0:
+        raise RuntimeError(f"Zero-sum LP failed: {res.message}")
+
+    row_strategy = np.clip(res.x[:n_rows], 0.0, None)
+    row_strategy /= row_strategy.sum()
+    if symmetric:
+        # Pinning v drops sum(y) = 1 from the dual; x itself is optimal for columns
+        return row_strategy, row_strategy.copy(), 0.0
+    col_strategy = np.clip(-res.ineqlin.marginals, 0.0, None)
+    col_strategy = col_strategy / col_strategy.sum() if col_strategy.sum() > 0 else np.full(n_cols, 1.0 / n_cols)
+    return row_strategy, col_strategy, float(res.x[-1])
+
+
+def _max_group_weight(A: np.ndarray, value: float, rows: List[int]) -> Optional[np.ndarray]:
+    """
+    Maximise sum(x[rows]) over the optimal row strategies of A (those
+    guaranteeing `value` against every column). Returns the maximiser, or
+    None if the LP fails.
+
+    A zero optimum proves that no row of the group is in any equilibrium
+    support; otherwise the maximiser reveals at least one that is. With a
+    single row this is the plain per-row membership check.
+    """
+    n_rows, n_cols = A.shape
+    c = np.zeros(n_rows)
+    c[rows] = -1.0
+    slack = 0.0 if _is_symmetric_zero_sum(A) else _LP_SLACK
+    res = linprog(
+        c,
+        A_ub=-A.T,
+        b_ub=np.full(n_cols, -(value - slack)),
+        A_eq=np.ones((1, n_rows)),
+        b_eq=[1.0],
+        bounds=[(0.0, None)] * n_rows,
+        method="highs",
+    )
+    return res.x if res.status == 0 else None
+
+
+def _lp_group_check(args):
+    """Worker function: (A, value, rows) -> (rows, _max_group_weight(A, value, rows))."""
+    A, value, rows = args
+    return rows, _max_group_weight(A, value, rows)
 
 
 def compute_nash_equilibrium(
     payoff: np.ndarray,
     tol: float = 1e-8,
-) -> Tuple[np.ndarray, List[int], float]:
+) -> Tuple[np.ndarray, List[int], float, np.ndarray]:
     """
     Compute a Nash equilibrium for a zero-sum game given the row player's
     payoff matrix and return the row strategy, its support, and the game value.
@@ -20,6 +107,9 @@ def compute_nash_equilibrium(
         - payoff[i, j] is the payoff for the row player
         - the column player gets -payoff[i, j] (zero-sum)
 
+    The equilibrium is the solution of a single linear program (HiGHS), which
+    is polynomial in the matrix size.
+
     Args:
         payoff:
             2D array of shape (n_rows, n_cols) with payoffs to the row player.
@@ -34,46 +124,244 @@ def compute_nash_equilibrium(
             List of row indices i with row_strategy[i] > tol (the Nash subset).
         value:
             Scalar game value at equilibrium.
+        col_strategy:
+            1D numpy array of length n_cols with the column player's mixed strategy.
     """
-    payoff = np.asarray(payoff, dtype=float)
+    A = np.asarray(payoff, dtype=float)
+    row_strategy, col_strategy, value = _solve_zero_sum(A)
+    support = [i for i, p in enumerate(row_strategy) if p > tol]
+    return row_strategy, support, value, col_strategy
+
 
-    A = payoff
-    B = -A
-    game = nash.Game(A, B)
+def nash_subset_and_strategy(
+    payoff: np.ndarray,
+    tol: float = 1e-8,
+    n_workers: int = 1,
+    warm_start: Optional[np.ndarray] = None,
+    executor: Optional[Any] = None,
+) -> Tuple[List[int], np.ndarray]:
+    """
+    Union of equilibrium supports, plus one optimal row strategy.
 
-    # Take the first Nash equilibrium found by support enumeration
-    the_point = game.support_enumeration()
-    row_strategy, col_strategy = next(the_point)
+    The optimal row strategies of a zero-sum game form a polytope, so row i
+    is in some equilibrium support iff max x_i over that polytope is > 0.
+    Candidate rows are checked in groups by maximising their total weight:
+    a zero optimum clears the whole group, otherwise the revealed rows are
+    marked and the rest of the group is checked again. Skipped outright are:
+        - rows already seen with positive weight in an earlier LP solution,
+        - rows that do worse than the value against an optimal column strategy
+          (complementary slackness rules them out of every optimal support).
 
-    row_strategy = np.asarray(row_strategy, dtype=float)
-    col_strategy = np.asarray(col_strategy, dtype=float)
+    Args:
+        payoff:
+            2D array (n_rows, n_cols) with payoffs to the row player.
+        tol:
+            Probability threshold for support membership.
+        n_workers:
+            1 = sequential, >1 = check one candidate group per worker, on
+            executor or else on a ProcessPoolExecutor started for this call.
+        warm_start:
+            Optional row mixture, typically the previous generation's
+            equilibrium padded with zeros for new programs. If it is still
+            optimal its support is accepted without an LP, and in symmetric
+            games it replaces the value LP altogether.
+        executor:
+            Optional persistent executor with submit(fn, args) -> Future
+            (e.g. PayoffEngine.executor), so repeated calls don't start a
+            pool each time.
 
-    support = [i for i, p in enumerate(row_strategy) if p > tol]
+    Returns:
+        (sorted row indices in some equilibrium support, an optimal row strategy)
+    """
+    A = np.asarray(payoff, dtype=float)
+    n_rows = A.shape[0]
 
-    # Game value for the row player
-    value = float(row_strategy @ A @ col_strategy)
+    w = None
+    if warm_start is not None and len(warm_start) == n_rows and np.sum(warm_start) > 0:
+        w = np.asarray(warm_start, dtype=float)
+        w = w / w.sum()
 
-    return row_strategy, support, value, the_point
+    if w is not None and _is_symmetric_zero_sum(A) and (w @ A).min() >= -_LP_SLACK:
+        # w guarantees the value 0, so it is optimal for both players
+        row_strategy, col_strategy, value = w, w, 0.0
+    else:
+        row_strategy, col_strategy, value = _solve_zero_sum(A)
+
+    in_support = row_strategy > tol
+    if w is not None and (w @ A).min() >= value - _LP_SLACK:
+        in_support |= w > tol
+
+    row_values = A @ col_strategy
+    candidates = [
+        i for i in range(n_rows)
+        if not in_support[i] and row_values[i] >= value - _LP_SUPPORT_TOL
+    ]
+    support_tol = max(tol, _LP_SUPPORT_TOL)
+
+    def _absorb(rows: List[int], x: Optional[np.ndarray]) -> List[int]:
+        """Mark rows revealed by x; return what is left of the group to check."""
+        if x is None or x[rows].max() <= support_tol:
+            return []
+        in_support[:] |= x > support_tol
+        return [i for i in rows if not in_support[i]]
+
+    # --- Sequential path ---
+    if n_workers == 1 or len(candidates) <= 1:
+        group = candidates
+        while group:
+            group = _absorb(group, _max_group_weight(A, value, group))
+        return np.flatnonzero(in_support).tolist(), row_strategy
+
+    # --- Parallel path: one candidate group per worker, re-checked until cleared ---
+    groups = [g.tolist() for g in np.array_split(candidates, min(n_workers, len(candidates)))]
+
+    own_pool = executor is None
+    if own_pool:
+        executor = ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        while groups:
+            futures = [executor.submit(_lp_group_check, (A, value, g)) for g in groups]
+            groups = [_absorb(rows, x) for rows, x in (f.result() for f in futures)]
+            # rows revealed by another group's solution need no check of their own
+            groups = [[i for i in g if not in_support[i]] for g in groups]
+            groups = [g for g in groups if g]
+    finally:
+        if own_pool:
+            executor.shutdown()
+
+    return np.flatnonzero(in_support).tolist(), row_strategy
 
 
 def compute_nash_subset(
     payoff: np.ndarray,
     tol: float = 1e-8,
+    n_workers: int = 1,
+    warm_start: Optional[np.ndarray] = None,
 ) -> List[int]:
     """
     Return the set of row indices that get positive probability in at least
     one Nash equilibrium (union of supports over all equilibria).
+
+    See `nash_subset_and_strategy` for the LP-based method and arguments.
     """
-    payoff = np.asarray(payoff, dtype=float)
-    A = payoff
-    B = -A
-    game = nash.Game(A, B)
+    indices, _ = nash_subset_and_strategy(payoff, tol, n_workers, warm_start)
+    return indices
 
-    n_rows = A.shape[0]
-    in_some_equilibrium = np.zeros(n_rows, dtype=bool)
 
-    for row_strategy, _ in game.support_enumeration():
-        row_strategy = np.asarray(row_strategy, dtype=float)
-        in_some_equilibrium |= row_strategy > tol
+def compute_nash_approx(
+    payoff: np.ndarray,
+    tol: float = 1e-2,
+    max_iter: int = 2_000,
+    method: str = "regret_matching",
+    warm_start: Optional[np.ndarray] = None,
+    support_tol: float = 1e-3,
+    check_every: int = 25,
+    eta: float = 0.1,
+) -> Tuple[np.ndarray, List[int], float, float]:
+    """
+    Anytime approximate Nash equilibrium of a zero-sum game by self-play.
+
+    Both players repeatedly update against each other with one of:
+        "regret_matching"     regret matching+ with linearly weighted averages
+        "mwu"                 multiplicative weights (Hedge) with step eta
+        "fictitious_play"     best response to the opponent's running average
+    Each iteration is two matrix-vector products, so the cost per call is
+    bounded by max_iter * O(n_rows * n_cols) whatever the game.
+
+    The averaged strategies are returned as soon as their exploitability
+        max_i (A y)_i - min_j (x^T A)_j
+    drops to tol (checked every check_every iterations), or at max_iter.
+
+    Args:
+        payoff:
+            2D array (n_rows, n_cols) with payoffs to the row player.
+        tol:
+            Target exploitability.
+        max_iter:
+            Iteration budget.
+        method:
+            "regret_matching" | "mwu" | "fictitious_play".
+        warm_start:
+            Optional row mixture to start from, typically the previous
+            generation's solution padded with zeros for new programs. Square
+            games also start the column player there.
+        support_tol:
+            Probability threshold for support membership in the averaged
+            row strategy.
+        check_every:
+            Iterations between exploitability checks.
+        eta:
+            Step size for "mwu".
+
+    Returns:
+        row_strategy:
+            Averaged row mixture.
+        support:
+            Row indices with row_strategy[i] > support_tol.
+        value:
+            Payoff of the averaged strategy profile.
+        exploitability:
+            Exploitability of the returned profile (<= tol unless the budget ran out).
+    """
+    if method not in ("regret_matching", "mwu", "fictitious_play"):
+        raise ValueError(f"Unknown approximate Nash method: {method!r}")
+
+    A = np.asarray(payoff, dtype=float)
+    n_rows, n_cols = A.shape
+
+    x = np.full(n_rows, 1.0 / n_rows)
+    y = np.full(n_cols, 1.0 / n_cols)
+    if warm_start is not None and len(warm_start) == n_rows and np.sum(warm_start) > 0:
+        x = np.asarray(warm_start, dtype=float) / np.sum(warm_start)
+        if n_rows == n_cols:
+            y = x.copy()
+
+    def _exploitability(xs: np.ndarray, ys: np.ndarray) -> float:
+        return float((A @ ys).max() - (xs @ A).min())
+
+    avg_x, avg_y = x.copy(), y.copy()
+    exploitability = _exploitability(avg_x, avg_y)
+    weight = 1.0
+    regret_x, regret_y = np.zeros(n_rows), np.zeros(n_cols)
+    log_x = np.log((1.0 - _MWU_WARM_MIX) * x + _MWU_WARM_MIX / n_rows)
+    log_y = np.log((1.0 - _MWU_WARM_MIX) * y + _MWU_WARM_MIX / n_cols)
+
+    for t in range(1, max_iter + 1):
+        if exploitability <= tol:
+            break
+
+        if method != "fictitious_play":
+            u_x = A @ y     # row utilities against the current column strategy
+            u_y = -(x @ A)  # column utilities against the current row strategy
+
+        if method == "regret_matching":
+            regret_x = np.maximum(regret_x + u_x - x @ u_x, 0.0)
+            regret_y = np.maximum(regret_y + u_y - y @ u_y, 0.0)
+            x = regret_x / regret_x.sum() if regret_x.sum() > 0 else np.full(n_rows, 1.0 / n_rows)
+            y = regret_y / regret_y.sum() if regret_y.sum() > 0 else np.full(n_cols, 1.0 / n_cols)
+            step = float(t)  # linear averaging (RM+)
+        elif method == "mwu":
+            log_x += eta * u_x
+            log_y += eta * u_y
+            x = np.exp(log_x - log_x.max())
+            y = np.exp(log_y - log_y.max())
+            x /= x.sum()
+            y /= y.sum()
+            step = 1.0
+        else:  # fictitious_play: best-respond to the opponent's average
+            x = np.zeros(n_rows)
+            x[np.argmax(A @ avg_y)] = 1.0
+            y = np.zeros(n_cols)
+            y[np.argmin(avg_x @ A)] = 1.0
+            step = 1.0
+
+        weight += step
+        avg_x += (step / weight) * (x - avg_x)
+        avg_y += (step / weight) * (y - avg_y)
+
+        if t % check_every == 0 or t == max_iter:
+            exploitability = _exploitability(avg_x, avg_y)
 
-    return [i for i, flag in enumerate(in_some_equilibrium) if flag]
+    value = float(avg_x @ A @ avg_y)
+    support = np.flatnonzero(avg_x > support_tol).tolist()
+    return avg_x, support, value, exploitability
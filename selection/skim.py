@@ -2,6 +2,79 @@ import numpy as np
 from typing import Iterable, Optional
 
 
+# Rows are processed in chunks so the (chunk, k, n_words) temporaries stay
+# around this many uint64 words (~32 MB).
+_PACKED_CHUNK_WORDS = 1 << 22
+
+
+def _is_ternary(payoff: np.ndarray) -> bool:
+    """True if payoff is an integer/bool matrix with every entry in {-1, 0, 1}."""
+    if payoff.dtype == bool:
+        return True
+    if not np.issubdtype(payoff.dtype, np.integer) or payoff.size == 0:
+        return False
+    return int(payoff.min()) >= -1 and int(payoff.max()) <= 1
+
+
+def _pack_bit_planes(M: np.ndarray) -> tuple:
+    """
+    Encode a ternary matrix as two bit-planes packed into uint64 words.
+
+    Returns (ge, gt), each of shape (n_rows, n_words), where bit k of row i is
+    set in ge iff M[i, k] >= 0 and in gt iff M[i, k] > 0. Padding bits are zero
+    in both planes, so they never create or hide a difference between rows.
+    """
+    n_rows, n_cols = M.shape
+    n_bytes = ((n_cols + 63) // 64) * 8
+    planes = []
+    for mask in (M >= 0, M > 0):
+        packed = np.packbits(mask, axis=1)
+        buf = np.zeros((n_rows, n_bytes), dtype=np.uint8)
+        buf[:, :packed.shape[1]] = packed
+        planes.append(buf.view(np.uint64))
+    return planes[0], planes[1]
+
+
+def packed_dominated_rows(M: np.ndarray) -> np.ndarray:
+    """
+    Strict row dominance for a ternary (-1/0/+1) matrix using bit-planes.
+
+    For values in {-1, 0, 1}, M[j, k] >= M[i, k] holds iff the >=0 and >0
+    bits of row i are both implied by those of row j. So j >= i everywhere iff
+        (ge_i & ~ge_j) | (gt_i & ~gt_j) == 0   on every word,
+    and, given that, j > i somewhere iff the rows differ in either plane.
+    Each test runs on n_cols / 64 words instead of n_cols floats.
+
+    Args:
+        M:
+            2D integer array (n_rows, n_cols) with entries in {-1, 0, 1}.
+
+    Returns:
+        Boolean array of shape (n_rows,), True where the row is strictly
+        dominated by some other row.
+    """
+    n_rows = M.shape[0]
+    ge, gt = _pack_bit_planes(M)
+    n_words = ge.shape[1]
+    not_ge, not_gt = ~ge, ~gt
+
+    dominated = np.zeros(n_rows, dtype=bool)
+    chunk = max(1, _PACKED_CHUNK_WORDS // max(1, n_rows * n_words))
+    for start in range(0, n_rows, chunk):
+        stop = min(start + chunk, n_rows)
+        ge_i = ge[start:stop, None, :]
+        gt_i = gt[start:stop, None, :]
+
+        # violates[i, j]: some column where row j < row i
+        violates = ((ge_i & not_ge[None]) | (gt_i & not_gt[None])).any(axis=2)
+        # differs[i, j]: rows i and j are not identical
+        differs = ((ge_i ^ ge[None]) | (gt_i ^ gt[None])).any(axis=2)
+
+        dominance = ~violates & differs  # dominance[i, j]: j strictly dominates i
+        dominated[start:stop] = dominance.any(axis=1)
+    return dominated
+
+
 def iterated_elimination_strictly_dominated_rows(
     payoff: np.ndarray,
     atol: float = 0.0,
@@ -101,10 +174,16 @@ def iterated_elimination_strictly_dominated_rows_fast(
             Optional safety cap on number of outer iterations
             (usually not needed; elimination converges quickly).
 
+    When the payoff is a ternary integer matrix (every current reward returns
+    -1/0/+1) and atol < 1, the bit-packed kernel `packed_dominated_rows` is
+    used instead of the float broadcast; both give identical results.
+
     Returns:
         1D numpy array of surviving row indices w.r.t. original payoff.
     """
-    A = np.asarray(payoff, dtype=float)
+    payoff = np.asarray(payoff)
+    packed = 0 <= atol < 1 and _is_ternary(payoff)
+    A = payoff.astype(np.int8) if packed else payoff.astype(float)
     n_rows, n_cols = A.shape
 
     # Start with all rows active (indices in original matrix)
@@ -122,6 +201,13 @@ def iterated_elimination_strictly_dominated_rows_fast(
         # Submatrix of active rows: shape (k, n_cols)
         M = A[np.ix_(active, active)]  # only active rows AND columns (symmetric IESDS)
 
+        if packed:
+            dominated = packed_dominated_rows(M)
+            if not np.any(dominated):
+                break
+            active = active[~dominated]
+            continue
+
         # Compare all row pairs via broadcasting:
         # M[:, None, :] shape (k,1,k)
         # M[None, :, :] shape (1,k,k)
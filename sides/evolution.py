@@ -1,26 +1,58 @@
+import argparse
 import time
-from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional, Tuple
 
 import numpy as np
 
 from config import EvolutionConfig
 from creation.factory import make_creator
-from creation.offspring import make_offspring
+from creation.population import Population
+from creation.offspring import limit_lengths, make_offspring_batch
 from interpreters.wrapper import make_interpreter
-from loggers import ExperimentLogger
-from rewards.payoff import compute_payoff_matrix
+from loggers import CHECKPOINT_NAME, ExperimentLogger, load_checkpoint, load_config, profiling, save_checkpoint
+from loggers.checkpoint import get_rng_states, set_rng_states
+from rewards.payoff import LazyPayoffMatrix, PayoffEngine, PendingPayoff, compute_payoff_matrix
+from rewards.payoff_buffer import PayoffBuffer
+from rewards.fingerprint import ExpansionPlan, make_fingerprinter, select_distinct
+from rewards.sampled import SparseResults, adaptive_pairs, fit_bradley_terry, sample_opponents
 from rewards.wrapper import make_reward
-from selection.nash_set import compute_nash_subset
+from selection.double_oracle import double_oracle
+from selection.nash_set import compute_nash_approx, nash_subset_and_strategy
 from selection.skim import (
     iterated_elimination_strictly_dominated_rows,
     iterated_elimination_strictly_dominated_rows_fast,
 )
 
 
-def _select(payoff: np.ndarray, method: str, n_skim: int) -> np.ndarray:
-    """Return a sorted index array of survivors from the current payoff matrix."""
+def _select(
+    payoff: np.ndarray,
+    method: str,
+    n_skim: int,
+    warm_start: Optional[np.ndarray] = None,
+    n_workers: int = 1,
+    cfg: Optional[EvolutionConfig] = None,
+    executor=None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Return a sorted index array of survivors from the current payoff matrix,
+    and the equilibrium mixture over the current population for Nash methods
+    (None otherwise). warm_start is the previous mixture aligned to payoff.
+    cfg supplies the solver settings of "nash_approx"; "nash_subset" runs its
+    membership LPs on executor (PayoffEngine.executor) when there is one.
+
+    For "double_oracle", payoff is a LazyPayoffMatrix and only the entries
+    the oracle asks for get evaluated.
+    """
+    if method == "double_oracle":
+        initial = np.flatnonzero(warm_start > 0).tolist() if warm_start is not None else None
+        strategy, support, _ = double_oracle(payoff, warm_start=initial)
+        return np.array(support, dtype=int), strategy
+
     if method == "none":
-        return np.arange(payoff.shape[0])
+        return np.arange(payoff.shape[0]), None
 
     if method in ("skim_fast", "skim_slow"):
         skim_fn = (
@@ -32,97 +64,710 @@ def _select(payoff: np.ndarray, method: str, n_skim: int) -> np.ndarray:
         for _ in range(n_skim):
             local = skim_fn(payoff[np.ix_(active, active)])
             active = active[local]
-        return active
+        return active, None
 
     if method == "nash_subset":
-        indices = compute_nash_subset(payoff)
-        return np.array(indices, dtype=int)
+        indices, strategy = nash_subset_and_strategy(
+            payoff, n_workers=n_workers, warm_start=warm_start, executor=executor,
+        )
+        return np.array(indices, dtype=int), strategy
+
+    if method == "nash_approx":
+        cfg = cfg or EvolutionConfig()
+        strategy, support, _, _ = compute_nash_approx(
+            payoff,
+            tol=cfg.nash_tol,
+            max_iter=cfg.nash_max_iter,
+            method=cfg.nash_method,
+            warm_start=warm_start,
+        )
+        return np.array(support, dtype=int), strategy
 
     raise ValueError(f"Unknown selection method: {method!r}")
 
 
 def _expand_payoff(
-    payoff: np.ndarray,
+    payoff: PayoffBuffer,
     pop: list,
     offspring: list,
     cfg,
     reward_fn,
-) -> np.ndarray:
+    plan: Optional[ExpansionPlan] = None,
+    engine: Optional[PayoffEngine] = None,
+) -> int:
     """
-    Expand a square self-play payoff matrix to include new offspring.
+    Expand a square self-play payoff buffer in place to include new offspring.
+    With a plan, only one representative per fingerprint gets evaluated.
+    With an engine, matchups run on its persistent workers.
+    Returns the number of matchups evaluated.
 
     Assumes zero-sum: payoff(new, old) = -payoff(old, new)^T.
     """
-    pay_old_new = compute_payoff_matrix(cfg, pop, offspring, reward_fn)
-    pay_new_new = compute_payoff_matrix(cfg, offspring, offspring, reward_fn)
-    return np.block([
-        [payoff,          pay_old_new],
-        [-pay_old_new.T,  pay_new_new],
-    ])
+    if engine is not None:
+        compute = engine.compute
+    else:
+        def compute(ref, pop_):
+            return compute_payoff_matrix(cfg, ref, pop_, reward_fn)
+
+    if plan is None:
+        pay_old_new = compute(pop, offspring)
+        pay_new_new = compute(offspring, offspring)
+        payoff.append(pay_old_new, pay_new_new)
+        return pay_old_new.size + pay_new_new.size
+
+    old_reps = [pop[i] for i in plan.old_reps.tolist()]
+    new_reps = [offspring[j] for j in plan.new_reps.tolist()]
+    reps_old_new = compute(old_reps, new_reps)
+    reps_new_new = compute(new_reps, new_reps)
+    payoff.append(*plan.assemble(payoff.matrix, reps_old_new, reps_new_new))
+    return plan.n_matchups
+
+
+def _payoff_stats(payoff: np.ndarray) -> dict:
+    """Summary stats over the known (non-NaN) entries of a payoff matrix."""
+    known = payoff[~np.isnan(payoff)] if payoff.dtype.kind == "f" else payoff.ravel()
+    if not known.size:
+        return {"payoff_mean": 0, "payoff_std": 0, "payoff_min": 0, "payoff_max": 0}
+    return {
+        "payoff_mean": round(float(known.mean()), 4),
+        "payoff_std": round(float(known.std()), 4),
+        "payoff_min": int(known.min()),
+        "payoff_max": int(known.max()),
+    }
+
+
+def _select_dense(
+    payoff,
+    fps: Optional[np.ndarray],
+    mixture: Optional[np.ndarray],
+    cfg: EvolutionConfig,
+    engine: Optional[PayoffEngine] = None,
+):
+    """
+    _select with the loop's settings; with fingerprints, on one representative
+    per behavior. Parallel selection work runs on the engine's workers, so
+    without an engine (or with an in-process one) it is sequential.
+    """
+    executor = engine.executor if engine is not None else None
+
+    def select(matrix, warm_start):
+        return _select(
+            matrix, cfg.selection, cfg.n_skim,
+            warm_start=warm_start,
+            n_workers=cfg.experiment.payoff.n_workers if executor is not None else 1,
+            cfg=cfg,
+            executor=executor,
+        )
+
+    if fps is None:
+        return select(payoff, mixture)
+    return select_distinct(select, payoff, fps, warm_start=mixture)
+
+
+def _distinct_stats(fps: Optional[np.ndarray]) -> dict:
+    if fps is None:
+        return {}
+    return {"n_distinct": int(len(np.unique(fps)))}
+
+
+def _cap_survivors(
+    survivors: np.ndarray,
+    mixture: Optional[np.ndarray],
+    lengths: np.ndarray,
+    cfg: EvolutionConfig,
+) -> np.ndarray:
+    """
+    Apply cfg.pop_cap to the sorted survivors. "age" keeps the oldest;
+    "length" keeps the highest equilibrium weight (when there is a mixture),
+    then the shortest programs, then the oldest. Returns sorted indices.
+    """
+    if cfg.pop_cap is None or len(survivors) <= cfg.pop_cap:
+        return survivors
+    if cfg.pop_cap_tiebreak == "age":
+        return survivors[: cfg.pop_cap]
+    if cfg.pop_cap_tiebreak != "length":
+        raise ValueError(f"Unknown pop_cap tie-break: {cfg.pop_cap_tiebreak!r}")
+    weight = mixture[survivors] if mixture is not None else np.zeros(len(survivors))
+    order = np.lexsort((lengths[survivors], -weight))
+    return np.sort(survivors[order[: cfg.pop_cap]])
+
+
+def _length_stats(pop) -> dict:
+    """Program length distribution of the population."""
+    lengths = pop.lengths if isinstance(pop, Population) else np.array([len(p) for p in pop])
+    if not len(lengths):
+        return {"len_mean": 0, "len_p90": 0, "len_max": 0}
+    return {
+        "len_mean": round(float(lengths.mean()), 2),
+        "len_p90": int(np.percentile(lengths, 90)),
+        "len_max": int(lengths.max()),
+    }
+
+
+def _checkpoint_due(cfg: EvolutionConfig, gen: int) -> bool:
+    return bool(cfg.checkpoint_every) and (gen + 1) % cfg.checkpoint_every == 0
+
+
+def _checkpoint(cfg: EvolutionConfig, logger: ExperimentLogger, gen: int, arrays: dict, rng_states: dict) -> None:
+    """Checkpoint after generation gen, every cfg.checkpoint_every generations."""
+    if _checkpoint_due(cfg, gen):
+        state = {"gen": gen + 1, "logger": logger.state(), "rng": rng_states}
+        save_checkpoint(Path(cfg.out_dir) / CHECKPOINT_NAME, arrays, state, cfg)
+
+
+def _resume(cfg: EvolutionConfig, logger: ExperimentLogger, rng: np.random.Generator) -> Tuple[int, dict]:
+    """Load out_dir's checkpoint, rewind logger and RNGs; return (next gen, arrays)."""
+    arrays, state, _ = load_checkpoint(Path(cfg.out_dir) / CHECKPOINT_NAME)
+    logger.restore(state["logger"])
+    set_rng_states(state["rng"], rng)
+    print(f"Resuming {cfg.out_dir} at gen {state['gen']}")
+    return state["gen"], arrays
+
+
+def _pop_arrays(pop) -> dict:
+    if not isinstance(pop, Population):
+        pop = Population.from_programs(pop)
+    return {"genes": pop.genes, "offsets": pop.offsets}
+
+
+def _dense_arrays(pop, payoff, mixture: Optional[np.ndarray], fps: Optional[np.ndarray]) -> dict:
+    """Checkpoint arrays of the dense loops; payoffs stay int8 (float16 with NaN when lazy)."""
+    arrays = _pop_arrays(pop)
+    if isinstance(payoff, LazyPayoffMatrix):
+        arrays["payoff_values"] = payoff.values.astype(np.float16)
+    else:
+        arrays["payoff"] = payoff.matrix
+    if mixture is not None:
+        arrays["mixture"] = mixture
+    if fps is not None:
+        arrays["fps"] = fps
+    return arrays
+
+
+def _select_by_rating(ratings: np.ndarray, method: str, pop_cap: Optional[int]) -> Tuple[np.ndarray, float]:
+    """
+    Survivors under sampled evaluation: the top pop_cap programs by rating
+    (or every program rated above the rating-0 anchor when uncapped).
+    Returns the sorted survivors and the rating cutoff.
+    """
+    if method == "none":
+        return np.arange(len(ratings)), -np.inf
+    if method != "rating":
+        raise ValueError(f"Selection {method!r} needs a dense payoff; use 'rating' with evaluation='sampled'")
+    if pop_cap is not None and len(ratings) > pop_cap:
+        cutoff = float(np.partition(ratings, -pop_cap)[-pop_cap])
+        survivors = np.sort(np.argsort(ratings)[-pop_cap:])
+        return survivors, cutoff
+    if pop_cap is not None:
+        return np.arange(len(ratings)), -np.inf
+    return np.flatnonzero(ratings >= 0.0), 0.0
+
+
+def _evaluate_sampled(engine: PayoffEngine, pop: Population, results: SparseResults, rows, cols) -> int:
+    """Evaluate the (rows, cols) matchups not yet in results; return how many ran."""
+    fresh = ~results.contains(rows, cols)
+    rows, cols = rows[fresh], cols[fresh]
+    if len(rows):
+        results.add(rows, cols, engine.pairs(pop, rows, cols))
+    return len(rows)
+
+
+def main_sampled(cfg: EvolutionConfig, resume: bool = False) -> None:
+    """
+    Evolution loop on a sparse sampled tournament.
+
+    Each new program plays n_opponents random opponents; Bradley-Terry
+    ratings are fitted to all results so far, and programs whose rating is
+    within noise of the selection cutoff get n_adaptive_opponents extra
+    close-rated matchups per adaptive round. Selection keeps the top pop_cap
+    by rating. Results between survivors carry over between generations, so
+    the cost per generation is O((n_offspring + n_uncertain) * k) matchups.
+    """
+    exp = cfg.experiment
+    creator = make_creator(exp)
+    reward_fn = make_reward(exp)
+    rng = np.random.default_rng(cfg.seed)
+
+    logger = ExperimentLogger(cfg.out_dir, cfg, resume=resume)
+    # Persistent workers for matchups and homoiconic offspring
+    engine = PayoffEngine(exp, reward_fn)
+
+    pop = Population.concat([])
+    results = SparseResults()
+    ratings = np.zeros(0)
+    start_gen = 0
+    if resume:
+        start_gen, arrays = _resume(cfg, logger, rng)
+        pop = Population(arrays["genes"], arrays["offsets"])
+        results = SparseResults(len(pop))
+        results.add(arrays["rows"], arrays["cols"], arrays["rewards"])
+        ratings = arrays["ratings"]
+    try:
+        for gen in range(start_gen, cfg.n_iter):
+            t0 = time.time()
+
+            if gen == 0:
+                offspring = limit_lengths(creator, creator.random_batch(cfg.n_init, rng), exp.genetics)
+            else:
+                offspring = make_offspring_batch(
+                    creator=creator,
+                    survivors=pop,
+                    n_offspring=cfg.n_offspring,
+                    gc=exp.genetics,
+                    rng=rng,
+                    engine=engine,
+                )
+            n_old = len(pop)
+            pop = pop + offspring
+            results.extend(len(offspring))
+            ratings = np.concatenate([ratings, np.zeros(len(offspring))])
+
+            rows, cols = sample_opponents(len(pop), cfg.n_opponents, rng, players=np.arange(n_old, len(pop)))
+            n_evaluated = _evaluate_sampled(engine, pop, results, rows, cols)
+            ratings, stderr = fit_bradley_terry(results, init=ratings)
+
+            for _ in range(cfg.n_adaptive_rounds):
+                _, cutoff = _select_by_rating(ratings, cfg.selection, cfg.pop_cap)
+                if not np.isfinite(cutoff):
+                    break
+                rows, cols = adaptive_pairs(ratings, stderr, cutoff, cfg.n_adaptive_opponents, rng)
+                n_new = _evaluate_sampled(engine, pop, results, rows, cols)
+                if not n_new:
+                    break
+                n_evaluated += n_new
+                ratings, stderr = fit_bradley_terry(results, init=ratings)
+
+            t1 = time.time()
+
+            n_before = len(pop)
+            survivors, _ = _select_by_rating(ratings, cfg.selection, cfg.pop_cap)
+            pop = pop.take(survivors)
+            results.keep(survivors)
+            ratings = ratings[survivors]
+
+            t2 = time.time()
+
+            logger.log(
+                {
+                    "gen": gen,
+                    "t": t2,
+                    "payoff_s": round(t1 - t0, 4),
+                    "selection_s": round(t2 - t1, 4),
+                    "pop_size": len(pop),
+                    "n_added": len(offspring),
+                    "n_removed": n_before - len(pop),
+                    "n_evaluated": n_evaluated,
+                    "n_results": len(results),
+                    "rating_mean": round(float(ratings.mean()), 4) if len(ratings) else 0,
+                    "rating_min": round(float(ratings.min()), 4) if len(ratings) else 0,
+                    "rating_max": round(float(ratings.max()), 4) if len(ratings) else 0,
+                    **_length_stats(pop),
+                },
+                work_pop=pop,
+            )
+
+            print(
+                f"gen {gen:>6} | pop {len(pop):>5} | "
+                f"+{len(offspring)} -{n_before - len(pop)} | "
+                f"{n_evaluated} matchups {t1 - t0:.2f}s  select {t2 - t1:.2f}s"
+            )
+            _checkpoint(cfg, logger, gen, {
+                **_pop_arrays(pop),
+                "rows": results.rows, "cols": results.cols, "rewards": results.rewards, "ratings": ratings,
+            }, get_rng_states(rng))
+    finally:
+        engine.close()
+        logger.close()
+
+
+@dataclass
+class _Expansion:
+    """Offspring whose payoffs against a population are being computed on the PayoffEngine."""
+    offspring: Population
+    fps: Optional[np.ndarray]  # offspring fingerprints (None without deduplication)
+    plan: Optional[ExpansionPlan]  # representatives to play (None without deduplication)
+    pending: Tuple[PendingPayoff, PendingPayoff]  # (pop x new, new x new), over representatives with a plan
+    parents: np.ndarray  # (n, 2) pop indices each child was bred from
+    breed_s: float  # time spent breeding and submitting
+
+    @property
+    def n_matchups(self) -> int:
+        return sum(p.n_matchups for p in self.pending)
+
+    def blocks(self, old_payoff: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Wait for the (pop x new, new x new) blocks; old_payoff is pop's own matrix."""
+        old_new, new_new = self.pending[0].result(), self.pending[1].result()
+        if self.plan is None:
+            return old_new, new_new
+        return self.plan.assemble(old_payoff, old_new, new_new)
+
+
+def _breed(
+    creator,
+    engine: PayoffEngine,
+    fingerprint,
+    gc,
+    pop: Population,
+    fps: Optional[np.ndarray],
+    parent_pool: np.ndarray,
+    n_offspring: int,
+    rng: np.random.Generator,
+) -> _Expansion:
+    """Breed n_offspring children of pop[parent_pool] and submit their payoffs against pop."""
+    t0 = time.time()
+    offspring, parents = make_offspring_batch(
+        creator=creator,
+        survivors=pop.take(parent_pool),
+        n_offspring=n_offspring,
+        gc=gc,
+        rng=rng,
+        engine=engine,
+        return_parents=True,
+    )
+    if not len(offspring):
+        nothing = (PendingPayoff((len(pop), 0), [], np.zeros((len(pop), 0), dtype=int)),
+                   PendingPayoff((0, 0), [], np.zeros((0, 0), dtype=int)))
+        new_fps = fps[:0] if fps is not None else None
+        return _Expansion(offspring, new_fps, None, nothing, parent_pool[parents], time.time() - t0)
+    if fingerprint is None:
+        new_fps, plan = None, None
+        pending = (engine.submit(pop, offspring), engine.submit(offspring, offspring))
+    else:
+        new_fps = fingerprint(offspring)
+        plan = ExpansionPlan(fps, new_fps)
+        old_reps, new_reps = pop.take(plan.old_reps), offspring.take(plan.new_reps)
+        pending = (engine.submit(old_reps, new_reps), engine.submit(new_reps, new_reps))
+    return _Expansion(offspring, new_fps, plan, pending, parent_pool[parents], time.time() - t0)
+
+
+def main_pipelined(cfg: EvolutionConfig, resume: bool = False) -> None:
+    """
+    Dense evolution loop that breeds and evaluates the next offspring while
+    the current generation is selected.
 
+    Per generation g:
+        payoff      collect the payoffs of g's offspring, append them
+        speculate   a thread breeds g+1 offspring from the parents likely to
+                    survive (the last Nash support, else the survivors of
+                    the last selection) and submits their payoffs against
+                    the whole population to the PayoffEngine
+        select      selection + cap, meanwhile
+        prune       speculative children with a pruned parent are discarded;
+                    the rest keep their payoff columns of the survivors
+        log         the record of g (survivors only)
+        top up      breed the missing children from the survivors and
+                    submit their payoffs, collected at g+1
 
-def main(cfg: EvolutionConfig) -> None:
+    Each generation still adds n_offspring children of survivors, but the
+    speculative ones draw their parents from a subset of the survivors and
+    the RNG is used in a different order, so runs differ from `main`. A
+    resumed run restarts without a speculative batch. Records add per-phase
+    times (offspring_s in the loop, speculate_s in the thread, spec_wait_s
+    blocked on it after selection) and the speculation counts.
+    """
     exp = cfg.experiment
+    if cfg.selection == "double_oracle":
+        raise ValueError("pipeline=True needs a dense payoff; double_oracle evaluates lazily")
     creator = make_creator(exp)
     reward_fn = make_reward(exp)
     interp = make_interpreter(exp)
 
-    logger = ExperimentLogger(cfg.out_dir, cfg)
+    logger = ExperimentLogger(cfg.out_dir, cfg, resume=resume)
+    engine = PayoffEngine(exp, reward_fn)
+    breeder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="breeder")
+    rng = np.random.default_rng(cfg.seed)
 
-    pop = [creator.random() for _ in range(cfg.n_init)]
-    payoff = compute_payoff_matrix(exp, pop, pop, reward_fn)
+    fingerprint = make_fingerprinter(exp, interp)
+    fps = None  # per-program fingerprints when deduplicating
+    mixture = None  # last equilibrium mixture over pop, warm-starts Nash selection
+    start_gen = 0
+    if resume:
+        start_gen, arrays = _resume(cfg, logger, rng)
+        pop = Population(arrays["genes"], arrays["offsets"])
+        mixture, fps = arrays.get("mixture"), arrays.get("fps")
+        payoff = PayoffBuffer(capacity=2 * (len(pop) + cfg.n_offspring), memmap_path=exp.payoff.memmap_path)
+        payoff.append(np.zeros((0, len(pop)), dtype=int), arrays["payoff"])
+    else:
+        pop = limit_lengths(creator, creator.random_batch(cfg.n_init, rng), exp.genetics)
+        payoff = PayoffBuffer(capacity=2 * (cfg.n_init + cfg.n_offspring), memmap_path=exp.payoff.memmap_path)
+        if fingerprint is None:
+            payoff.append(np.zeros((0, len(pop)), dtype=int), engine.compute(pop, pop))
+        else:
+            fps = fingerprint(pop)
+            _expand_payoff(payoff, pop[:0], pop, exp, reward_fn, plan=ExpansionPlan(fps[:0], fps), engine=engine)
+    n_survivors = len(pop)  # pop[:n_survivors] went through the last selection
+    topup = None  # children of the survivors still being evaluated against pop
+    n_kept = 0  # speculative children that joined pop after the last selection
 
-    for gen in range(cfg.n_iter):
-        t0 = time.time()
+    def append(batch: _Expansion, old_new: np.ndarray, new_new: np.ndarray, keep: Optional[np.ndarray] = None):
+        nonlocal pop, fps, mixture
+        offspring, new_fps = batch.offspring, batch.fps
+        if keep is not None:
+            offspring = offspring.take(keep)
+            new_fps = new_fps[keep] if new_fps is not None else None
+        if not len(offspring):
+            return 0
+        payoff.append(old_new, new_new)
+        pop = pop + offspring
+        if fps is not None:
+            fps = np.concatenate([fps, new_fps])
+        if mixture is not None:
+            mixture = np.concatenate([mixture, np.zeros(len(offspring))])
+        return len(offspring)
 
-        offspring = make_offspring(
-            creator=creator,
-            survivors=pop,
-            n_offspring=cfg.n_offspring,
-            gc=exp.genetics,
-            interp=interp,
-        )
+    try:
+        for gen in range(start_gen, cfg.n_iter):
+            t0 = time.time()
 
-        if offspring:
-            payoff = _expand_payoff(payoff, pop, offspring, exp, reward_fn)
-            pop = pop + offspring
+            if topup is None:
+                with profiling.phase("offspring"):
+                    topup = _breed(
+                        creator, engine, fingerprint, exp.genetics, pop, fps,
+                        np.arange(n_survivors), cfg.n_offspring, rng,
+                    )
+            offspring_s = topup.breed_s
+            n_evaluated = topup.n_matchups
+            with profiling.phase("payoff"):
+                t_wait = time.time()
+                n_added = n_kept + append(topup, *topup.blocks(payoff.matrix))
+                topup = None
+            payoff_s = time.time() - t_wait
 
-        t1 = time.time()
-
-        n_before = len(pop)
-        survivors = _select(payoff, cfg.selection, cfg.n_skim)
-
-        if cfg.pop_cap is not None and len(survivors) > cfg.pop_cap:
-            survivors = survivors[: cfg.pop_cap]
-
-        pop = [pop[i] for i in survivors.tolist()]
-        payoff = payoff[np.ix_(survivors, survivors)]
-
-        t2 = time.time()
-
-        logger.log(
-            {
-                "gen": gen,
-                "t": t2,
-                "payoff_s": round(t1 - t0, 4),
-                "selection_s": round(t2 - t1, 4),
-                "pop_size": len(pop),
-                "n_added": len(offspring),
-                "n_removed": n_before - len(pop),
-                "payoff_mean": round(float(payoff.mean()), 4) if payoff.size else 0,
-                "payoff_std": round(float(payoff.std()), 4) if payoff.size else 0,
-                "payoff_min": int(payoff.min()) if payoff.size else 0,
-                "payoff_max": int(payoff.max()) if payoff.size else 0,
-            },
-            work_pop=pop,
-        )
+            t1 = time.time()
 
-        print(
-            f"gen {gen:>6} | pop {len(pop):>5} | "
-            f"+{len(offspring)} -{n_before - len(pop)} | "
-            f"payoff {t1 - t0:.2f}s  select {t2 - t1:.2f}s"
-        )
+            # Speculate from the parents most likely to survive this selection
+            spec = None
+            if gen + 1 < cfg.n_iter:
+                safe = np.flatnonzero(mixture > 0) if mixture is not None else np.arange(n_survivors)
+                spec_rng = np.random.default_rng(rng.integers(2**63))
+                spec = breeder.submit(
+                    _breed, creator, engine, fingerprint, exp.genetics, pop, fps,
+                    safe, cfg.n_offspring, spec_rng,
+                )
+
+            n_before = len(pop)
+            with profiling.phase("selection"):
+                survivors, mixture = _select_dense(payoff.matrix, fps, mixture, cfg, engine)
+                survivors = _cap_survivors(survivors, mixture, pop.lengths, cfg)
+
+            t2 = time.time()
+
+            n_spec = n_discarded = 0
+            speculate_s = 0.0
+            if spec is not None:
+                with profiling.phase("payoff"):
+                    spec = spec.result()
+                    keep = np.flatnonzero(np.isin(spec.parents, survivors).all(axis=1))
+                    old_new, new_new = spec.blocks(payoff.matrix)
+                    old_new, new_new = old_new[survivors][:, keep], new_new[np.ix_(keep, keep)]
+                n_spec, n_discarded = len(spec.offspring), len(spec.offspring) - len(keep)
+                n_evaluated += spec.n_matchups
+                speculate_s = spec.breed_s
+
+            t3 = time.time()
+
+            with profiling.phase("selection"):
+                pop = pop.take(survivors)
+                payoff.compact(survivors)
+            if mixture is not None:
+                mixture = mixture[survivors]
+            if fps is not None:
+                fps = fps[survivors]
+            n_survivors = len(pop)
+
+            with profiling.phase("logging"):
+                logger.log(
+                    {
+                        "gen": gen,
+                        "t": t3,
+                        "offspring_s": round(offspring_s, 4),
+                        "payoff_s": round(payoff_s, 4),
+                        "selection_s": round(t2 - t1, 4),
+                        "speculate_s": round(speculate_s, 4),
+                        "spec_wait_s": round(t3 - t2, 4),
+                        "pop_size": len(pop),
+                        "n_added": n_added,
+                        "n_removed": n_before - len(pop),
+                        "n_evaluated": n_evaluated,
+                        "n_speculative": n_spec,
+                        "n_speculative_discarded": n_discarded,
+                        **_payoff_stats(payoff.matrix),
+                        **_distinct_stats(fps),
+                        **_length_stats(pop),
+                    },
+                    work_pop=pop,
+                )
+
+            print(
+                f"gen {gen:>6} | pop {len(pop):>5} | "
+                f"+{n_added} -{n_before - len(pop)} | "
+                f"payoff {payoff_s:.2f}s  select {t2 - t1:.2f}s  "
+                f"spec {n_spec - n_discarded}/{n_spec} in {speculate_s:.2f}s (wait {t3 - t2:.2f}s)"
+            )
+            if _checkpoint_due(cfg, gen):
+                _checkpoint(cfg, logger, gen, _dense_arrays(pop, payoff, mixture, fps), get_rng_states(rng))
+
+            if spec is not None:
+                # Kept speculative children join now; the top-up plays against them too
+                n_kept = append(spec, old_new, new_new, keep)
+                with profiling.phase("offspring"):
+                    topup = _breed(
+                        creator, engine, fingerprint, exp.genetics, pop, fps,
+                        np.arange(n_survivors), cfg.n_offspring - n_kept, rng,
+                    )
+    finally:
+        breeder.shutdown()
+        engine.close()
+        logger.close()
+
+
+def main(cfg: EvolutionConfig, resume: bool = False) -> None:
+    """
+    Dense evolution loop. With resume=True, continue the run in cfg.out_dir
+    from its last checkpoint (see checkpoint_every).
+    """
+    if cfg.evaluation == "sampled":
+        return main_sampled(cfg, resume)
+    if cfg.evaluation != "dense":
+        raise ValueError(f"Unknown evaluation mode: {cfg.evaluation!r}")
+    if cfg.pipeline:
+        return main_pipelined(cfg, resume)
+
+    exp = cfg.experiment
+    creator = make_creator(exp)
+    reward_fn = make_reward(exp)
+    interp = make_interpreter(exp)
+
+    logger = ExperimentLogger(cfg.out_dir, cfg, resume=resume)
+    # Persistent workers for payoffs and homoiconic offspring (double_oracle evaluates lazily on them)
+    engine = PayoffEngine(exp, reward_fn)
+    rng = np.random.default_rng(cfg.seed)
+
+    lazy = cfg.selection == "double_oracle"
+    fingerprint = None if lazy else make_fingerprinter(exp, interp)
+    fps = None  # per-program fingerprints when deduplicating
+    mixture = None  # last equilibrium mixture over pop, warm-starts Nash selection
+    start_gen = 0
+    if resume:
+        start_gen, arrays = _resume(cfg, logger, rng)
+        pop = Population(arrays["genes"], arrays["offsets"])
+        mixture, fps = arrays.get("mixture"), arrays.get("fps")
+        if lazy:
+            payoff = LazyPayoffMatrix(exp, pop, reward_fn, engine)
+            payoff.values = arrays["payoff_values"].astype(float)
+            payoff.n_evaluated = int(arrays["n_evaluated"])
+        else:
+            payoff = PayoffBuffer(capacity=2 * (len(pop) + cfg.n_offspring), memmap_path=exp.payoff.memmap_path)
+            payoff.append(np.zeros((0, len(pop)), dtype=int), arrays["payoff"])
+    else:
+        pop = limit_lengths(creator, creator.random_batch(cfg.n_init, rng), exp.genetics)
+        if lazy:
+            payoff = LazyPayoffMatrix(exp, pop, reward_fn, engine)
+        else:
+            payoff = PayoffBuffer(capacity=2 * (cfg.n_init + cfg.n_offspring), memmap_path=exp.payoff.memmap_path)
+            if fingerprint is None:
+                payoff.append(np.zeros((0, len(pop)), dtype=int), engine.compute(pop, pop))
+            else:
+                fps = fingerprint(pop)
+                _expand_payoff(payoff, pop[:0], pop, exp, reward_fn, plan=ExpansionPlan(fps[:0], fps), engine=engine)
+
+    try:
+        for gen in range(start_gen, cfg.n_iter):
+            t0 = time.time()
+
+            with profiling.phase("offspring"):
+                offspring = make_offspring_batch(
+                    creator=creator,
+                    survivors=pop,
+                    n_offspring=cfg.n_offspring,
+                    gc=exp.genetics,
+                    rng=rng,
+                    engine=engine,
+                )
+
+            n_evaluated = 0
+            if len(offspring):
+                with profiling.phase("payoff"):
+                    if lazy:
+                        payoff.extend(offspring)
+                    elif fingerprint is None:
+                        n_evaluated = _expand_payoff(payoff, pop, offspring, exp, reward_fn, engine=engine)
+                    else:
+                        new_fps = fingerprint(offspring)
+                        plan = ExpansionPlan(fps, new_fps)
+                        n_evaluated = _expand_payoff(payoff, pop, offspring, exp, reward_fn, plan=plan, engine=engine)
+                        fps = np.concatenate([fps, new_fps])
+                pop = pop + offspring
+                if mixture is not None:
+                    mixture = np.concatenate([mixture, np.zeros(len(offspring))])
+
+            t1 = time.time()
+
+            n_before = len(pop)
+            with profiling.phase("selection"):
+                survivors, mixture = _select_dense(payoff if lazy else payoff.matrix, fps, mixture, cfg, engine)
+
+                survivors = _cap_survivors(survivors, mixture, pop.lengths, cfg)
+
+                pop = pop.take(survivors)
+                if lazy:
+                    payoff.keep(survivors)
+                else:
+                    payoff.compact(survivors)
+            if mixture is not None:
+                mixture = mixture[survivors]
+            if fps is not None:
+                fps = fps[survivors]
+
+            t2 = time.time()
+
+            if lazy:
+                extra = {
+                    "payoff_known_frac": round(payoff.known_fraction, 4),
+                    "n_evaluated": payoff.n_evaluated,
+                }
+            else:
+                extra = {"n_evaluated": n_evaluated, **_distinct_stats(fps)}
+
+            with profiling.phase("logging"):
+                logger.log(
+                    {
+                        "gen": gen,
+                        "t": t2,
+                        "payoff_s": round(t1 - t0, 4),
+                        "selection_s": round(t2 - t1, 4),
+                        "pop_size": len(pop),
+                        "n_added": len(offspring),
+                        "n_removed": n_before - len(pop),
+                        **_payoff_stats(payoff.values if lazy else payoff.matrix),
+                        **_length_stats(pop),
+                        **extra,
+                    },
+                    work_pop=pop,
+                )
+
+            print(
+                f"gen {gen:>6} | pop {len(pop):>5} | "
+                f"+{len(offspring)} -{n_before - len(pop)} | "
+                f"payoff {t1 - t0:.2f}s  select {t2 - t1:.2f}s"
+            )
+            if _checkpoint_due(cfg, gen):
+                arrays = _dense_arrays(pop, payoff, mixture, fps)
+                if lazy:
+                    arrays["n_evaluated"] = np.array(payoff.n_evaluated)
+                _checkpoint(cfg, logger, gen, arrays, get_rng_states(rng))
+    finally:
+        engine.close()
+        logger.close()
 
 
 if __name__ == "__main__":
-    main(EvolutionConfig())
+    parser = argparse.ArgumentParser(description="Self-play evolution")
+    parser.add_argument("--resume", metavar="OUT_DIR", help="continue the run checkpointed in OUT_DIR")
+    args = parser.parse_args()
+    if args.resume:
+        cfg = load_config(args.resume)
+        cfg.out_dir = args.resume
+        main(cfg, resume=True)
+    else:
+        main(EvolutionConfig())
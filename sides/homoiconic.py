@@ -3,15 +3,20 @@
 import json
 import time
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple
 
 from config import ExperimentConfig
 from interpreters.wrapper import make_interpreter
+from loggers.archive import PopulationArchive
 from rewards.wrapper import make_reward
-from rewards.payoff import compute_payoff_matrix
+from rewards.payoff import PayoffEngine, compute_payoff_matrix
 
 
 def load_population(path: str) -> List[List[int]]:
+    """Load a JSON list of programs, or the last generation of a PopulationArchive directory."""
+    if Path(path).is_dir():
+        return PopulationArchive(path).generation(-1).to_lists()
     with open(path, "r") as f:
         pop = json.load(f)
     return [[int(x) for x in ind] for ind in pop]
@@ -26,8 +31,35 @@ def rounds(n):
         for j in range(n):
             yield j, (i+j)%n 
 
-def main(pop_path: str, out_path: str) -> None:
-    cfg = ExperimentConfig()
+def round_blocks(n: int, block_rounds: int):
+    it = rounds(n)
+    while block := list(islice(it, block_rounds)):
+        yield block
+
+def run_round(interpreter, code: List[int], input_data: List[int]) -> Tuple[List[int], List[int], Optional[int]]:
+    """(out, mem, status) of one round; status is None for interpreters that return only (out, mem)."""
+    result = interpreter.run(code, input_data)
+    return result[0], result[1], (result[2] if len(result) > 2 else None)
+
+def make_block(interpreter, pop: List[List[int]], block: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """Run every round of the block; one candidate entry per (round, out/mem)."""
+    entries = []
+    for i, j in block:
+        out_ij, mem_ij, status_ij = run_round(interpreter, pop[i], pop[j])
+        for label, cand in (("out", out_ij), ("mem", mem_ij)):
+            entries.append({"i": i, "j": j, "label": label, "candidate": cand, "status": status_ij})
+    return entries
+
+def main(pop_path: str, out_path: str, block_rounds: int = 64, cfg: Optional[ExperimentConfig] = None) -> None:
+    """
+    Score the out/mem candidates of every round against the population.
+
+    Rounds are processed in blocks: all candidates of a block are scored in
+    one payoff call on a persistent PayoffEngine, and the next block's
+    candidates are generated while it runs. time_s is the block's scoring
+    time per candidate.
+    """
+    cfg = cfg or ExperimentConfig()
     interpreter = make_interpreter(cfg)
     reward_fn = make_reward(cfg)
 
@@ -37,38 +69,31 @@ def main(pop_path: str, out_path: str) -> None:
     out_file = Path(out_path)
     out_file.parent.mkdir(parents=True, exist_ok=True)
 
-    with out_file.open("a") as f:
-        for (i, j) in rounds(n):
-            print(i, j, end="\r")
-            code = pop[i]
-            input_data = pop[j]
-
-            out_ij, mem_ij, status_ij = interpreter.run(code, input_data)
-
-            candidates: List[Tuple[str, List[int]]] = [
-                ("out", out_ij),
-                ("mem", mem_ij),
-            ]
-
-            for label, cand in candidates:
-                t0 = time.time()
-                score = score_candidate(cfg, pop, cand, reward_fn)
-                dt = time.time() - t0
-
+    blocks = round_blocks(n, block_rounds)
+    with PayoffEngine(cfg, reward_fn) as engine, out_file.open("a") as f:
+        entries = make_block(interpreter, pop, next(blocks, []))
+        while entries:
+            t0 = time.time()
+            pending = engine.submit(pop, [e["candidate"] for e in entries])
+            next_entries = make_block(interpreter, pop, next(blocks, []))
+            scores = pending.result().sum(axis=0)
+            dt = (time.time() - t0) / len(entries)
+            print(entries[-1]["i"], entries[-1]["j"], end="\r")
+
+            for entry, score in zip(entries, scores.tolist()):
                 record: Dict[str, Any] = {
-                    "i": i,
-                    "j": j,
-                    "label": label,
-                    "candidate_len": len(cand),
-                    "status": status_ij,
+                    "i": entry["i"],
+                    "j": entry["j"],
+                    "label": entry["label"],
+                    "candidate_len": len(entry["candidate"]),
+                    "status": entry["status"],
                     "score": score,
                     "time_s": dt,
                 }
                 json.dump(record, f)
                 f.write("\n")
-                f.flush()
-
-            # print(f"completed i={i}/{n}", end="\r")
+            f.flush()
+            entries = next_entries
 
     print("\nDone.")
 
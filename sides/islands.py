@@ -0,0 +1,242 @@
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+import traceback
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from config import IslandConfig
+from creation.factory import make_creator
+from creation.offspring import limit_lengths, make_offspring
+from interpreters.wrapper import make_interpreter
+from loggers import ExperimentLogger, profiling
+from rewards.payoff import PayoffEngine
+from rewards.payoff_buffer import PayoffBuffer
+from rewards.wrapper import make_reward
+from selection.nash_set import nash_subset_and_strategy
+from sides.evolution import _cap_survivors, _expand_payoff, _length_stats, _payoff_stats, _select
+
+
+def _destinations(k: int, n_islands: int, topology: str, rng: np.random.Generator) -> List[int]:
+    """Islands that island k sends migrants to at this migration event."""
+    if topology == "ring":
+        return [(k + 1) % n_islands]
+    if topology == "full":
+        return [d for d in range(n_islands) if d != k]
+    if topology == "random":
+        # Shared rng: every island draws the same shift, so each receives exactly once
+        return [(k + int(rng.integers(1, n_islands))) % n_islands]
+    raise ValueError(f"Unknown topology: {topology!r}")
+
+
+def _n_sources(n_islands: int, topology: str) -> int:
+    return n_islands - 1 if topology == "full" else 1
+
+
+# Seconds between liveness checks while waiting on a queue
+_POLL_S = 1.0
+# Seconds the other islands get to stop after a failure before being terminated
+_ABORT_GRACE_S = 10.0
+
+
+class _Aborted(Exception):
+    """Raised in an island when the run was aborted because of another island."""
+
+
+def _receive(inbox, abort) -> list:
+    """Next batch of migrants, unless the run is aborted meanwhile."""
+    while True:
+        try:
+            return inbox.get(timeout=_POLL_S)
+        except queue.Empty:
+            if abort.is_set():
+                raise _Aborted()
+
+
+def _pick_migrants(payoff: np.ndarray, n: int, method: str, executor=None) -> np.ndarray:
+    """Indices of the n programs an island sends out."""
+    if method == "top":
+        score = payoff.mean(axis=1) if payoff.size else np.zeros(len(payoff))
+    elif method == "nash":
+        _, score = nash_subset_and_strategy(payoff, executor=executor)
+    else:
+        raise ValueError(f"Unknown migrant selection: {method!r}")
+    return np.argsort(-score, kind="stable")[:n]
+
+
+def _island(k: int, cfg: IslandConfig, seed: int, inboxes, records, abort) -> None:
+    """
+    One island: the dense evolution loop on its own population and payoff
+    buffer, plus synchronous migration every migration_interval generations.
+    Arriving migrants are only evaluated against this island's population.
+    On failure the island sends {"island": k, "error": traceback} and sets
+    abort, which stops islands waiting for its migrants.
+    """
+    random.seed(seed + k)
+    np.random.seed((seed + k) % 2**32)
+    migration_rng = np.random.default_rng(seed)  # same stream on every island
+
+    evo = cfg.evolution
+    exp = evo.experiment
+    profiling.start_worker(exp.logging)
+    creator = make_creator(exp)
+    reward_fn = make_reward(exp)
+    interp = make_interpreter(exp)
+    logger = ExperimentLogger(str(Path(cfg.out_dir) / f"island_{k:02d}"), evo, island=k, seed=seed + k)
+    # Persistent workers for this island's payoffs and Nash LPs
+    engine = PayoffEngine(exp, reward_fn)
+
+    try:
+        pop = limit_lengths(creator, [creator.random() for _ in range(evo.n_init)], exp.genetics)
+        payoff = PayoffBuffer(capacity=2 * (evo.n_init + evo.n_offspring))
+        payoff.append(np.zeros((0, len(pop)), dtype=int), engine.compute(pop, pop))
+
+        for gen in range(evo.n_iter):
+            if abort.is_set():
+                raise _Aborted()
+            t0 = time.time()
+
+            offspring = make_offspring(
+                creator=creator,
+                survivors=pop,
+                n_offspring=evo.n_offspring,
+                gc=exp.genetics,
+                interp=interp,
+            )
+            if offspring:
+                _expand_payoff(payoff, pop, offspring, exp, reward_fn, engine=engine)
+                pop = pop + offspring
+
+            t1 = time.time()
+
+            n_before = len(pop)
+            survivors, _ = _select(payoff.matrix, evo.selection, evo.n_skim, cfg=evo, executor=engine.executor)
+            survivors = _cap_survivors(survivors, None, np.array([len(p) for p in pop]), evo)
+            pop = [pop[i] for i in survivors.tolist()]
+            payoff.compact(survivors)
+
+            t2 = time.time()
+
+            n_arrived = 0
+            if cfg.n_islands > 1 and (gen + 1) % cfg.migration_interval == 0:
+                dests = _destinations(k, cfg.n_islands, cfg.topology, migration_rng)
+                picked = _pick_migrants(payoff.matrix, cfg.n_migrants, cfg.migrant_selection, engine.executor)
+                migrants = [pop[i] for i in picked]
+                for d in dests:
+                    inboxes[d].put(migrants)
+                arrivals = []
+                for _ in range(_n_sources(cfg.n_islands, cfg.topology)):
+                    arrivals.extend(_receive(inboxes[k], abort))
+                arrivals = limit_lengths(creator, arrivals, exp.genetics)
+                if arrivals:
+                    _expand_payoff(payoff, pop, arrivals, exp, reward_fn, engine=engine)
+                    pop = pop + arrivals
+                n_arrived = len(arrivals)
+
+            t3 = time.time()
+
+            record = {
+                "island": k,
+                "gen": gen,
+                "t": t3,
+                "payoff_s": round(t1 - t0, 4),
+                "selection_s": round(t2 - t1, 4),
+                "migration_s": round(t3 - t2, 4),
+                "pop_size": len(pop),
+                "n_added": len(offspring),
+                "n_removed": n_before - len(survivors),
+                "n_migrants_in": n_arrived,
+                **_payoff_stats(payoff.matrix),
+                **_length_stats(pop),
+            }
+            logger.log(record, work_pop=pop)
+            records.put(record)
+    except _Aborted:
+        pass
+    except BaseException:
+        abort.set()
+        records.put({"island": k, "error": traceback.format_exc()})
+        raise
+    finally:
+        engine.close()
+        logger.close()  # island processes skip atexit handlers
+        records.put(None)
+
+
+def main(cfg: IslandConfig) -> None:
+    """
+    Run n_islands evolution loops in separate processes with periodic migration.
+
+    Each island writes the usual logger layout to out_dir/island_XX/; the
+    coordinator writes config/meta for the whole run to out_dir/ and merges
+    every island's records (tagged with "island") into out_dir/metrics.jsonl.
+    If an island raises or dies, the others are stopped and the run raises.
+    Islands evaluate dense payoff matrices: double_oracle selection and
+    sampled evaluation are not supported.
+    """
+    evo = cfg.evolution
+    if evo.evaluation != "dense" or evo.selection == "double_oracle":
+        raise ValueError(
+            f"Islands need dense evaluation and a dense selection method "
+            f"(got evaluation={evo.evaluation!r}, selection={evo.selection!r})"
+        )
+    seed = cfg.seed if cfg.seed is not None else int.from_bytes(os.urandom(4), "little")
+    logger = ExperimentLogger(cfg.out_dir, cfg, n_islands=cfg.n_islands, seed=seed)
+
+    inboxes = [mp.Queue() for _ in range(cfg.n_islands)]
+    records = mp.Queue()
+    abort = mp.Event()
+    procs = [
+        mp.Process(target=_island, args=(k, cfg, seed, inboxes, records, abort), name=f"island-{k}")
+        for k in range(cfg.n_islands)
+    ]
+    for p in procs:
+        p.start()
+
+    errors = []
+    n_running = len(procs)
+    try:
+        while n_running:
+            try:
+                record = records.get(timeout=_POLL_S)
+            except queue.Empty:
+                # An island killed outright sends nothing: stop the others too
+                if any(p.exitcode not in (None, 0) for p in procs):
+                    abort.set()
+                    break
+                continue
+            if record is None:
+                n_running -= 1
+            elif "error" in record:
+                errors.append(record)
+            else:
+                logger.log(record)
+                print(
+                    f"island {record['island']:>2} | gen {record['gen']:>6} | pop {record['pop_size']:>5} | "
+                    f"+{record['n_added']} -{record['n_removed']} ~{record['n_migrants_in']}"
+                )
+    except BaseException:
+        abort.set()
+        raise
+    finally:
+        logger.close()
+        deadline = time.monotonic() + _ABORT_GRACE_S
+        for p in procs:
+            p.join(max(0.0, deadline - time.monotonic()) if abort.is_set() else None)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+
+    for error in errors:
+        print(f"island {error['island']} failed:\n{error['error']}")
+    failed = [p.name for p in procs if p.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Islands failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main(IslandConfig())
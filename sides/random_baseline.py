@@ -1,5 +1,6 @@
 
 import json
+import random
 import time
 from pathlib import Path
 from typing import List
@@ -7,11 +8,71 @@ from typing import List
 from config import RandomBaselineConfig
 from loggers import ExperimentLogger
 from creation.factory import make_creator
-from rewards.payoff import compute_payoff_matrix
+from rewards.payoff import compute_payoff_matrix, search_candidates, seeded_candidate
 from rewards.wrapper import make_reward
 
 
+def _write_bests(rb_cfg: RandomBaselineConfig, entries: List[list]) -> None:
+    if not entries:
+        return
+    with open(Path(rb_cfg.out_path) / "bests.jsonl", "a") as f:
+        for entry in entries:
+            json.dump(entry, f)
+            f.write("\n")
+
+
+def main_stream(rb_cfg: RandomBaselineConfig) -> None:
+    """
+    Streaming search: workers generate and score the candidates themselves
+    (see search_candidates) and only the ones above threshold come back.
+    Each iteration is one seeded block of n_grain candidates; bests.jsonl
+    entries are [candidate id, score, program].
+    """
+    cfg = rb_cfg.experiment
+    creator = make_creator(cfg)
+    seed = rb_cfg.seed if rb_cfg.seed is not None else random.getrandbits(63)
+
+    ref_pop = [creator.random() for _ in range(rb_cfg.n_ref)]
+
+    logger = ExperimentLogger(
+        rb_cfg.out_path, rb_cfg,
+        n_ref=rb_cfg.n_ref, n_tested=rb_cfg.n_tested, n_grain=rb_cfg.n_grain, seed=seed,
+    )
+
+    reward_fn = make_reward(cfg)
+    n_bests = 0
+    min_score = rb_cfg.threshold * len(ref_pop)
+    t0 = time.time()
+    blocks = search_candidates(cfg, ref_pop, reward_fn, seed, rb_cfg.n_tested, rb_cfg.n_grain, min_score)
+    for i, (block, hits, (score_sum, score_min, score_max)) in enumerate(blocks):
+        print("Up to:", i * rb_cfg.n_grain, end="\r")
+        elapsed, t0 = time.time() - t0, time.time()
+        step_bests = [[k, score, seeded_candidate(creator, seed, k, rb_cfg.n_grain)] for k, score in hits]
+        n_bests += len(step_bests)
+
+        logger.log(
+            {
+                "iter": i,
+                "t": time.time(),
+                "n_tested_so_far": (i + 1) * rb_cfg.n_grain,
+                "payoff_s": round(elapsed, 4),
+                "score_mean": round(score_sum / rb_cfg.n_grain, 4),
+                "score_min": score_min,
+                "score_max": score_max,
+                "n_bests_step": len(step_bests),
+                "n_bests_total": n_bests,
+            },
+            ref_pop=ref_pop,
+        )
+        _write_bests(rb_cfg, step_bests)
+    logger.close()
+
+
 def main(rb_cfg: RandomBaselineConfig) -> None:
+    if rb_cfg.mode == "stream":
+        return main_stream(rb_cfg)
+    if rb_cfg.mode != "pool":
+        raise ValueError(f"Unknown random baseline mode: {rb_cfg.mode}")
     cfg = rb_cfg.experiment
     creator = make_creator(cfg)
 
@@ -34,7 +95,7 @@ def main(rb_cfg: RandomBaselineConfig) -> None:
         elapsed = time.time() - t0
 
         scores = [int(payoff[:, j].sum()) for j in range(rb_cfg.n_grain)]
-        step_bests = [[j, scores[j], pool[j]] for j in range(rb_cfg.n_grain) if scores[j] / len(ref_pop) > 0.7]
+        step_bests = [[j, scores[j], pool[j]] for j in range(rb_cfg.n_grain) if scores[j] / len(ref_pop) > rb_cfg.threshold]
         bests.extend(step_bests)
 
         logger.log(
@@ -53,10 +114,8 @@ def main(rb_cfg: RandomBaselineConfig) -> None:
             ref_pop=ref_pop,
         )
 
-        for entry in step_bests:
-            with open(Path(rb_cfg.out_path) / "bests.jsonl", "a") as f:
-                json.dump(entry, f)
-                f.write("\n")
+        _write_bests(rb_cfg, step_bests)
+    logger.close()
 
 
 if __name__ == "__main__":
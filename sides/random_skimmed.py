@@ -1,42 +1,57 @@
+import argparse
 from pathlib import Path
 import numpy as np
 import time
 
 from selection.skim import iterated_elimination_strictly_dominated_rows_fast
 from rewards.payoff import compute_payoff_matrix
-from loggers import ExperimentLogger
+from rewards.payoff_buffer import PayoffBuffer
+from loggers import CHECKPOINT_NAME, ExperimentLogger, load_checkpoint, load_config, save_checkpoint
+from loggers.checkpoint import get_rng_states, set_rng_states
+from creation.population import Population
 from creation.factory import make_creator
 from config import RandomSkimmedConfig
 from rewards.wrapper import make_reward
 
 
-def main(cfg: RandomSkimmedConfig):
+def _save(cfg: RandomSkimmedConfig, logger: ExperimentLogger, gen: int, pop: list, payoff: PayoffBuffer) -> None:
+    pop = Population.from_programs(pop)
+    state = {"gen": gen + 1, "logger": logger.state(), "rng": get_rng_states()}
+    arrays = {"genes": pop.genes, "offsets": pop.offsets, "payoff": payoff.matrix}
+    save_checkpoint(Path(cfg.out_dir) / CHECKPOINT_NAME, arrays, state, cfg)
+
+
+def main(cfg: RandomSkimmedConfig, resume: bool = False):
     creator = make_creator(cfg.experiment)
     logger = ExperimentLogger(
-        cfg.out_dir, cfg.experiment,
+        cfg.out_dir, cfg.experiment, resume=resume,
         n_pop=cfg.n_pop, n_iter=cfg.n_iter, n_skim=cfg.n_skim, n_accepted=cfg.n_accepted,
     )
     reward_fn = make_reward(cfg.experiment)
     pop = []
-    payoff = compute_payoff_matrix(cfg.experiment, pop, pop, reward_fn)
-    for i in range(cfg.n_iter):
+    payoff = PayoffBuffer(capacity=2 * cfg.n_pop, memmap_path=cfg.experiment.payoff.memmap_path)
+    start = 0
+    if resume:
+        arrays, state, _ = load_checkpoint(Path(cfg.out_dir) / CHECKPOINT_NAME)
+        pop = Population(arrays["genes"], arrays["offsets"]).to_lists()
+        payoff.append(np.zeros((0, len(pop)), dtype=int), arrays["payoff"])
+        logger.restore(state["logger"])
+        set_rng_states(state["rng"])
+        start = state["gen"]
+        print(f"Resuming {cfg.out_dir} at gen {start}")
+    for i in range(start, cfg.n_iter):
         n_old = len(pop)
         pop += [creator.random() for _ in range(cfg.n_pop)]
         print(f"Starting gen {i}, with population {len(pop)}")
         t0 = time.time()
         payoff_new_new = compute_payoff_matrix(cfg.experiment, pop[n_old:], pop[n_old:], reward_fn)
-        if n_old == 0:
-            payoff = payoff_new_new
-        else:
-            payoff_old_new = compute_payoff_matrix(cfg.experiment, pop[:n_old], pop[n_old:], reward_fn)
-            payoff = np.append(payoff, payoff_old_new, axis=1)
-            temp = np.append(-payoff_old_new.T, payoff_new_new, axis=1)
-            payoff = np.append(payoff, temp, axis=0)
+        payoff_old_new = compute_payoff_matrix(cfg.experiment, pop[:n_old], pop[n_old:], reward_fn)
+        payoff.append(payoff_old_new, payoff_new_new)
 
         t1 = time.time()
         n_prev = n_old
         for _ in range(cfg.n_skim):
-            skimmed = iterated_elimination_strictly_dominated_rows_fast(payoff)
+            skimmed = iterated_elimination_strictly_dominated_rows_fast(payoff.matrix)
             if cfg.skim_fraction < 1.0:
                 dominated = np.setdiff1d(np.arange(len(pop)), skimmed)
                 n_keep = int(len(dominated) * (1 - cfg.skim_fraction))
@@ -45,14 +60,14 @@ def main(cfg: RandomSkimmedConfig):
             n_removed = n_old - int((skimmed < n_old).sum())
             n_new = int((skimmed >= n_old).sum())
             pop = [pop[i] for i in skimmed.tolist()]
-            payoff = payoff[skimmed, :][:, skimmed]
+            payoff.compact(skimmed)
             n_old = n_old - n_removed
             if cfg.n_accepted and len(pop) < cfg.n_accepted:
                 break
         if cfg.max_pop and len(pop) > cfg.max_pop:
             keep = np.sort(np.random.choice(len(pop), size=cfg.max_pop, replace=False))
             pop = [pop[i] for i in keep]
-            payoff = payoff[keep, :][:, keep]
+            payoff.compact(keep)
             n_old = int((keep < n_old).sum())
         t2 = time.time()
         n_removed_total = n_prev - n_old
@@ -68,16 +83,27 @@ def main(cfg: RandomSkimmedConfig):
                 "n_added": cfg.n_pop,
                 "n_removed": n_removed_total,
                 "n_survived_new": n_survived_new,
-                "payoff_mean": round(float(payoff.mean()), 4),
-                "payoff_std": round(float(payoff.std()), 4),
-                "payoff_min": int(payoff.min()),
-                "payoff_max": int(payoff.max()),
+                "payoff_mean": round(float(payoff.matrix.mean()), 4),
+                "payoff_std": round(float(payoff.matrix.std()), 4),
+                "payoff_min": int(payoff.matrix.min()),
+                "payoff_max": int(payoff.matrix.max()),
             },
             work_pop=pop,
         )
+        if cfg.checkpoint_every and (i + 1) % cfg.checkpoint_every == 0:
+            _save(cfg, logger, i, pop, payoff)
+    logger.close()
 
 
 if __name__ == "__main__":
-    cfg = RandomSkimmedConfig()
-    Path(cfg.out_dir).mkdir(parents=True, exist_ok=True)
-    main(cfg)
+    parser = argparse.ArgumentParser(description="Random generation with dominance skimming")
+    parser.add_argument("--resume", metavar="OUT_DIR", help="continue the run checkpointed in OUT_DIR")
+    args = parser.parse_args()
+    if args.resume:
+        cfg = load_config(args.resume)
+        cfg.out_dir = args.resume
+        main(cfg, resume=True)
+    else:
+        cfg = RandomSkimmedConfig()
+        Path(cfg.out_dir).mkdir(parents=True, exist_ok=True)
+        main(cfg)
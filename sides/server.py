@@ -0,0 +1,322 @@
+import asyncio
+import contextlib
+import http.client
+import json
+import signal
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import ServerConfig
+from creation.population import Population
+from loggers import ExperimentLogger
+from rewards.distributed import parse_address
+from rewards.payoff import PayoffEngine
+from rewards.wrapper import make_reward
+from sides.homoiconic import load_population
+
+# Long-running evaluation service: scores programs against reference
+# populations held in memory, on a warm PayoffEngine. Concurrent requests are
+# queued and coalesced into batches (one payoff call per reference and batch).
+#
+# HTTP/1.1 + JSON, one request per connection:
+#   POST /score          {"programs": [[...], ...], "ref": "default", "payoffs": false}
+#                        -> {"scores": [...], "payoffs": [[...], ...]}
+#   PUT  /refs/<name>    {"programs": [[...], ...]} or {"path": "pop.json"} -> {"name": .., "n": ..}
+#   GET  /refs           -> {name: size}
+#   GET  /metrics        -> see EvaluationServer.metrics
+# A program's score is the sum of its payoff column against the reference
+# (as in sides.homoiconic.score_candidate); "payoffs" adds the column itself.
+
+
+class _Request:
+    def __init__(self, ref: str, programs: List[List[int]], future: asyncio.Future):
+        self.ref = ref
+        self.programs = programs
+        self.future = future
+        self.t0 = time.perf_counter()
+
+
+class EvaluationServer:
+    """
+    Scoring service state: reference populations, the payoff engine, the
+    (reference, program fingerprint) -> payoff column cache and the
+    micro-batcher. Use score() from the event loop, or serve() for HTTP.
+    """
+
+    def __init__(self, cfg: ServerConfig):
+        self.cfg = cfg
+        exp = cfg.experiment
+        self.engine = PayoffEngine(exp, make_reward(exp))
+        self.refs: Dict[str, List[List[int]]] = {}
+        if cfg.ref_path:
+            self.refs["default"] = load_population(cfg.ref_path)
+        # The in-process engine (n_workers == 1) is not thread-safe: one batch at a time
+        n_threads = 1 if exp.payoff.n_workers == 1 else cfg.max_inflight
+        self._compute = ThreadPoolExecutor(max_workers=n_threads, thread_name_prefix="server-batch")
+        self._inflight = asyncio.Semaphore(n_threads)
+        self._queue: Optional[asyncio.Queue] = None
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()  # cache and stats, shared with the batch threads
+        self._latencies: deque = deque(maxlen=cfg.latency_window)
+        self._queued = 0        # programs waiting for a batch
+        self._max_queued = 0    # since the last metrics record
+        self._stats = {"requests": 0, "programs": 0, "batches": 0, "computed": 0, "cache_hits": 0, "errors": 0}
+
+    # --- Scoring ---
+
+    async def score(self, programs: List[List[int]], ref: str = "default") -> np.ndarray:
+        """Payoff columns of programs against reference ref: shape (len(ref), len(programs))."""
+        if ref not in self.refs:
+            raise ValueError(f"Unknown reference population: {ref!r}")
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            asyncio.get_running_loop().create_task(self._batcher())
+        request = _Request(ref, programs, asyncio.get_running_loop().create_future())
+        self._queued += len(programs)
+        self._max_queued = max(self._max_queued, self._queued)
+        self._stats["requests"] += 1
+        self._stats["programs"] += len(programs)
+        await self._queue.put(request)
+        columns = await request.future
+        self._latencies.append(time.perf_counter() - request.t0)
+        return columns
+
+    async def _batcher(self) -> None:
+        """Close a batch at max_batch programs or max_wait_ms after its first request."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            n = len(batch[0].programs)
+            deadline = loop.time() + self.cfg.max_wait_ms / 1e3
+            while n < self.cfg.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                n += len(request.programs)
+            self._queued -= n
+            await self._inflight.acquire()
+            loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[_Request]) -> None:
+        loop = asyncio.get_running_loop()
+        self._stats["batches"] += 1
+        try:
+            by_ref: Dict[str, List[_Request]] = {}
+            for request in batch:
+                by_ref.setdefault(request.ref, []).append(request)
+            for ref, requests in by_ref.items():
+                programs = [p for r in requests for p in r.programs]
+                columns = await loop.run_in_executor(self._compute, self._columns, ref, programs)
+                k = 0
+                for r in requests:
+                    if not r.future.done():
+                        r.future.set_result(columns[:, k:k + len(r.programs)])
+                    k += len(r.programs)
+        except Exception as e:
+            self._stats["errors"] += 1
+            for r in batch:
+                if not r.future.done():
+                    r.future.set_exception(e)
+        finally:
+            self._inflight.release()
+
+    def _columns(self, ref: str, programs: List[List[int]]) -> np.ndarray:
+        """Payoff columns of programs against ref: cached ones, then one engine call for the distinct rest."""
+        ref_pop = self.refs[ref]
+        fingerprints = Population.from_programs(programs).fingerprints.tolist()
+        columns = np.zeros((len(ref_pop), len(programs)), dtype=int)
+        missing: Dict[int, List[int]] = {}  # fingerprint -> positions in programs
+        with self._lock:
+            for k, fp in enumerate(fingerprints):
+                column = self._cache.get((ref, fp))
+                if column is not None:
+                    self._cache.move_to_end((ref, fp))
+                    columns[:, k] = column
+                    self._stats["cache_hits"] += 1
+                else:
+                    missing.setdefault(fp, []).append(k)
+        if not missing:
+            return columns
+        computed = self.engine.compute(ref_pop, [programs[ks[0]] for ks in missing.values()])
+        with self._lock:
+            self._stats["computed"] += len(missing)
+            for (fp, ks), column in zip(missing.items(), computed.T):
+                columns[:, ks] = column[:, None]
+                if self.cfg.score_cache_size > 0 and self.refs.get(ref) is ref_pop:  # not replaced meanwhile
+                    self._cache[(ref, fp)] = column
+            while len(self._cache) > self.cfg.score_cache_size:
+                self._cache.popitem(last=False)
+        return columns
+
+    def set_ref(self, name: str, programs: List[List[int]]) -> None:
+        """Add or replace a reference population (dropping its cached columns)."""
+        self.refs[name] = [[int(x) for x in p] for p in programs]
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == name]:
+                del self._cache[key]
+
+    # --- Metrics ---
+
+    def metrics(self, reset_peak: bool = False) -> Dict[str, Any]:
+        """
+        Totals since start, current queue depth (programs waiting for a
+        batch), peak queue depth since the last reset_peak, and latency
+        percentiles over the last latency_window requests.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["mean_batch_programs"] = round(stats["programs"] / stats["batches"], 2) if stats["batches"] else 0.0
+        lookups = stats["cache_hits"] + stats["computed"]
+        stats["cache_hit_rate"] = round(stats["cache_hits"] / lookups, 4) if lookups else 0.0
+        stats["queue_depth"] = self._queued
+        stats["max_queue_depth"] = self._max_queued
+        if self._latencies:
+            latencies = np.array(self._latencies) * 1e3
+            stats["latency_p50_ms"] = round(float(np.percentile(latencies, 50)), 3)
+            stats["latency_p99_ms"] = round(float(np.percentile(latencies, 99)), 3)
+            stats["latency_max_ms"] = round(float(latencies.max()), 3)
+        if reset_peak:
+            self._max_queued = self._queued
+        return stats
+
+    # --- HTTP ---
+
+    async def _route(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        if method == "POST" and path == "/score":
+            columns = await self.score(body["programs"], body.get("ref", "default"))
+            response: Dict[str, Any] = {"scores": columns.sum(axis=0).tolist()}
+            if body.get("payoffs"):
+                response["payoffs"] = columns.T.tolist()
+            return 200, response
+        if method == "PUT" and path.startswith("/refs/"):
+            name = path[len("/refs/"):]
+            programs = body["programs"] if "programs" in body else load_population(body["path"])
+            self.set_ref(name, programs)
+            return 200, {"name": name, "n": len(programs)}
+        if method == "GET" and path == "/refs":
+            return 200, {name: len(pop) for name, pop in self.refs.items()}
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics()
+        return 404, {"error": f"No route for {method} {path}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, _ = (await reader.readline()).decode().split(" ", 2)
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            raw = await reader.readexactly(int(headers.get("content-length", 0)))
+            status, payload = await self._route(method, path, json.loads(raw) if raw else {})
+        except Exception as e:
+            status, payload = 400, {"error": f"{type(e).__name__}: {e}"}
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {http.client.responses.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode()
+            + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """Serve HTTP on cfg.address until cancelled, logging metrics every metrics_every seconds."""
+        if self.cfg.address.startswith("unix:"):
+            server = await asyncio.start_unix_server(self._handle, path=self.cfg.address[len("unix:"):])
+        else:
+            host, port = parse_address(self.cfg.address)
+            server = await asyncio.start_server(self._handle, host, port)
+        # SIGTERM stops serving like Ctrl-C, so main() still shuts the worker pool down
+        with contextlib.suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        print(f"Serving on {self.cfg.address} (refs: {', '.join(self.refs) or 'none'})")
+        logger = ExperimentLogger(self.cfg.out_dir, self.cfg)
+        try:
+            async with server:
+                while True:
+                    await asyncio.sleep(self.cfg.metrics_every)
+                    logger.log(self.metrics(reset_peak=True))
+                    logger.flush()
+        finally:
+            logger.close()
+
+    def close(self) -> None:
+        self._compute.shutdown()
+        self.engine.close()
+
+
+def main(cfg: ServerConfig) -> None:
+    server = EvaluationServer(cfg)
+    try:
+        asyncio.run(server.serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        server.close()
+
+
+# --- Client ---
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class EvaluationClient:
+    """Blocking client of an EvaluationServer, e.g. for notebooks and side scripts."""
+
+    def __init__(self, address: str = "127.0.0.1:8765", timeout: float = 600.0):
+        self.address = address
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        if self.address.startswith("unix:"):
+            conn = _UnixHTTPConnection(self.address[len("unix:"):], self.timeout)
+        else:
+            host, port = parse_address(self.address)
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        try:
+            body = json.dumps(payload).encode() if payload is not None else None
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            data = json.loads(response.read())
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path} failed ({response.status}): {data.get('error')}")
+        return data
+
+    def score(self, programs: List[List[int]], ref: str = "default", payoffs: bool = False) -> Dict[str, Any]:
+        return self._request("POST", "/score", {"programs": programs, "ref": ref, "payoffs": payoffs})
+
+    def set_ref(self, name: str, programs: List[List[int]]) -> Dict[str, Any]:
+        return self._request("PUT", f"/refs/{name}", {"programs": programs})
+
+    def refs(self) -> Dict[str, int]:
+        return self._request("GET", "/refs")
+
+    def metrics(self) -> Dict[str, Any]:
+        return self._request("GET", "/metrics")
+
+
+if __name__ == "__main__":
+    main(ServerConfig())
@@ -0,0 +1,147 @@
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from config import SweepConfig
+from main import SIDES, apply_override, set_field, run_side
+from rewards.shared_pool import SharedPoolClient, SharedPoolServer
+
+# Sides a sweep can run: their payoffs all go through compute_payoff_matrix /
+# PayoffEngine, so backend="shared" puts them on the sweep's pool.
+SWEEPABLE = ("evolution", "random_skimmed", "random_baseline")
+MANIFEST = "sweep.json"
+
+
+def grid_points(space: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every combination of the listed values."""
+    for path, values in space.items():
+        if not isinstance(values, (list, tuple)):
+            raise ValueError(f"Grid search needs a list of values for {path!r}")
+    paths = list(space)
+    return [dict(zip(paths, combo)) for combo in itertools.product(*(space[p] for p in paths))]
+
+
+def _draw(spec, rng: random.Random):
+    if isinstance(spec, (list, tuple)):
+        return rng.choice(list(spec))
+    low, high = spec["low"], spec["high"]
+    if isinstance(low, int) and isinstance(high, int):
+        return rng.randint(low, high)
+    if spec.get("log"):
+        return math.exp(rng.uniform(math.log(low), math.log(high)))
+    return rng.uniform(low, high)
+
+
+def random_points(space: Dict[str, Any], n_samples: int, seed=None) -> List[Dict[str, Any]]:
+    """n_samples points, each field drawn from its list of values or {"low", "high", "log"} range."""
+    rng = random.Random(seed)
+    return [{path: _draw(spec, rng) for path, spec in space.items()} for _ in range(n_samples)]
+
+
+def sweep_points(cfg: SweepConfig) -> List[Dict[str, Any]]:
+    if cfg.search == "grid":
+        return grid_points(cfg.space)
+    if cfg.search == "random":
+        return random_points(cfg.space, cfg.n_samples, cfg.seed)
+    raise ValueError(f"Unknown search: {cfg.search!r}")
+
+
+def run_config(cfg: SweepConfig, run_dir: Path, point: Dict[str, Any]):
+    """Config of one run: side defaults, then cfg.base, then the point; payoffs on the shared pool."""
+    config_cls, out_field, _ = SIDES[cfg.side]
+    run_cfg = config_cls()
+    for override in cfg.base:
+        apply_override(run_cfg, override)
+    for path, value in point.items():
+        set_field(run_cfg, path, value)
+    setattr(run_cfg, out_field, str(run_dir))
+    run_cfg.experiment.payoff.backend = "shared"
+    run_cfg.experiment.payoff.n_workers = cfg.n_workers
+    if cfg.side == "random_baseline" and run_cfg.mode != "pool":
+        raise ValueError("A sweep runs random_baseline in pool mode only")
+    return run_cfg
+
+
+def _run_process(side: str, run_cfg, pool, n_workers: int, payoff_cache_size: int) -> None:
+    """Body of a run's own process: the run, with the sweep's pool as its shared pool."""
+    with SharedPoolClient(pool, n_workers, payoff_cache_size):
+        run_side(side, run_cfg)
+
+
+def main(cfg: SweepConfig) -> List[Dict[str, Any]]:
+    """
+    Run cfg.side once per point of the search space, n_concurrent runs at a
+    time, every run's payoffs (and Nash LPs) on one SharedPool of n_workers
+    processes.
+
+    Runs write to out_dir/run_XXX. out_dir/sweep.json records each run's
+    point and status; rerunning a sweep on the same out_dir reuses its
+    points and skips the runs already done. Each run gets a fresh (spawned)
+    process, so module-level state such as `random` and the hot-path
+    counters is its own; the pool and its payoff caches live in a manager
+    process that every run talks to.
+    """
+    if cfg.side not in SWEEPABLE:
+        raise ValueError(f"Cannot sweep {cfg.side!r} (one of {SWEEPABLE})")
+    out_dir = Path(cfg.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            runs = json.load(f)["runs"]
+    else:
+        runs = [
+            {"run": f"run_{k:03d}", "point": point, "status": "pending"}
+            for k, point in enumerate(sweep_points(cfg))
+        ]
+    # Build every config up front so a bad point fails before anything runs
+    configs = {r["run"]: run_config(cfg, out_dir / r["run"], r["point"]) for r in runs}
+    lock = threading.Lock()
+
+    def save() -> None:
+        with lock:
+            tmp_path = manifest_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"side": cfg.side, "base": cfg.base, "runs": runs}, f, indent=2)
+            os.replace(tmp_path, manifest_path)
+
+    def execute(record: Dict[str, Any]) -> None:
+        record["status"] = "running"
+        save()
+        t0 = time.time()
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as proc:
+                args = (cfg.side, configs[record["run"]], pool, cfg.n_workers, cfg.payoff_cache_size)
+                proc.submit(_run_process, *args).result()
+            record["status"] = "done"
+        except Exception as e:
+            traceback.print_exc()
+            record["status"] = "failed"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["seconds"] = round(time.time() - t0, 3)
+        print(f"{record['run']} {record['status']} in {record['seconds']}s: {record['point']}")
+        save()
+
+    todo = [r for r in runs if r["status"] != "done"]
+    print(f"Sweep of {len(runs)} {cfg.side} runs ({len(todo)} to do) in {out_dir}")
+    save()
+    if not todo:
+        return runs
+    first = configs[todo[0]["run"]]
+    with SharedPoolServer(cfg.n_workers, cfg.payoff_cache_size, first.experiment.logging) as pool:
+        with ThreadPoolExecutor(max_workers=cfg.n_concurrent) as runner:
+            list(runner.map(execute, todo))
+    return runs
+
+
+if __name__ == "__main__":
+    main(SweepConfig())